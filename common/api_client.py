@@ -0,0 +1,107 @@
+# common/api_client.py
+
+import functools
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+import requests
+from requests.adapters import HTTPAdapter
+
+from common.config import Config
+
+# Roster and payroll bodies can be large; they are streamed (ApiClient.stream) rather than prefetched
+FAN_OUT_ENDPOINTS = ["/wapi/term-ee", "/wapi/voe-match", "/wapi/voi-match"]
+
+
+class ApiClient:
+    """Keep-alive session against the vault API shared by the whole run.
+
+    ``prefetch`` requests several endpoints concurrently; a later ``get`` of
+    a prefetched path returns the stored response so each test still makes
+    its own assertions. Every response's latency is attached to the Allure
+    report of the test that consumes it.
+    """
+
+    def __init__(self, base_url, token=None, pool_size=None):
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size or Config.API_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept"] = "application/json"
+        if token:
+            self.set_token(token)
+        self._prefetched = {}
+        self.latencies = {}  # path -> list of seconds
+
+    def set_token(self, token):
+        self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _request(self, method, path, **kwargs):
+        start = time.perf_counter()
+        response = self.session.request(method, self.base_url + path, **kwargs)
+        response.latency = time.perf_counter() - start
+        self.latencies.setdefault(path, []).append(response.latency)
+        return response
+
+    def _attach_latency(self, method, path, response, prefetched=False):
+        allure.attach(
+            json.dumps({"method": method, "path": path, "status": response.status_code,
+                        "latency_ms": round(response.latency * 1000, 2), "prefetched": prefetched}),
+            name=f"Latency {method} {path}", attachment_type=allure.attachment_type.JSON,
+        )
+
+    def get(self, path, **kwargs):
+        if not kwargs and path in self._prefetched:
+            response = self._prefetched.pop(path)
+            self._attach_latency("GET", path, response, prefetched=True)
+            return response
+        response = self._request("GET", path, **kwargs)
+        self._attach_latency("GET", path, response)
+        return response
+
+    def stream(self, path, **kwargs):
+        """GET with ``stream=True``: the body is read by the caller in chunks
+        (see common.stream_validation), and the latency covers the headers only."""
+        response = self._request("GET", path, stream=True, **kwargs)
+        self._attach_latency("GET", path, response)
+        return response
+
+    def post(self, path, **kwargs):
+        response = self._request("POST", path, **kwargs)
+        self._attach_latency("POST", path, response)
+        return response
+
+    def fetch_all(self, paths):
+        """GET every path concurrently and return ``{path: response}``.
+
+        Requests run on the session's pooled connections from a worker
+        thread per in-flight call, bounded by the pool size. No event loop
+        is involved, so this also works when called from inside one.
+        """
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, len(paths)) or 1) as executor:
+            responses = executor.map(functools.partial(self._request, "GET"), paths)
+            return dict(zip(paths, responses))
+
+    def prefetch(self, paths=FAN_OUT_ENDPOINTS):
+        self._prefetched.update(self.fetch_all(paths))
+
+    def close(self):
+        self.session.close()
+
+
+def extract_token(response):
+    """Pull the bearer token out of an ``api_login`` response."""
+    try:
+        body = response.json()
+    except ValueError:
+        body = None
+    if isinstance(body, dict):
+        for key in ("token", "access_token", "accessToken"):
+            if body.get(key):
+                return body[key]
+    raise ValueError(f"No auth token in login response: {response.text[:200]}")
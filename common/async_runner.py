@@ -0,0 +1,212 @@
+# common/async_runner.py
+#
+# Async execution mode for the React portal smoke tests. The sync suites
+# drive one page per worker, which then sits idle in wait_for_selector and on
+# the network. With ASYNC_MODE=true the smoke tests that have an async twin
+# (registered with @scenario in test_react_async.py) run as concurrent pages
+# on an event loop instead: up to ASYNC_CONCURRENCY pages at once, spread
+# over ASYNC_BROWSERS shared browsers, each in its own context. The sync
+# twins are deselected, and each test_async_smoke item reports one
+# scenario's outcome.
+#
+#   ASYNC_MODE=true ASYNC_CONCURRENCY=16 pytest test_react_async.py
+#
+# A twin is registered against the sync test function itself, so its node
+# id and portal role (the module's target mark) cannot drift from the test
+# it replaces. Logins go through the session's AuthStateCache in the main
+# thread before the loop starts; scenarios whose stored session is rejected
+# run once more after it has logged in again. The loop runs in its own
+# thread, so it never shares an event loop with the sync API
+# pytest-playwright drives in the main thread.
+
+import asyncio
+import inspect
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright.async_api import async_playwright
+
+from common.auth_state import portal_for
+from common.config import Config
+from common.network import block_resources_async
+from common.stand_in import route_to_stand_in_async
+
+logger = logging.getLogger(__name__)
+
+SCENARIOS = {}  # sync test node id -> Scenario
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # node ids are relative to it
+
+
+class Scenario:
+    def __init__(self, nodeid, role, func):
+        self.nodeid = nodeid
+        self.role = role
+        self.func = func
+
+
+def node_id(test):
+    """pytest node id of the test function ``test``."""
+    return f"{os.path.relpath(inspect.getfile(test), ROOT).replace(os.sep, '/')}::{test.__name__}"
+
+
+def target_role(test):
+    """Portal role of ``test``: the name in its own or its module's ``target`` mark."""
+    for owner in (test, sys.modules[test.__module__]):
+        marks = getattr(owner, "pytestmark", [])
+        for mark in marks if isinstance(marks, list) else [marks]:
+            if mark.name == "target":
+                return mark.args[0]
+    raise ValueError(f"{node_id(test)} has no target mark to pick a portal role from")
+
+
+def scenario(test):
+    """Register an ``async def (page)`` as the async twin of the sync test function
+    ``test``, run on a page already signed in to the dashboard of its target role."""
+    def register(func):
+        nodeid = node_id(test)
+        SCENARIOS[nodeid] = Scenario(nodeid, target_role(test), func)
+        return func
+    return register
+
+
+def is_async_smoke(item):
+    return getattr(item, "originalname", None) == "test_async_smoke"
+
+
+def deselect_sync_twins(config, items):
+    """Drop the sync tests whose async twin was collected; they run in test_react_async.py instead."""
+    twins = {item.callspec.params["nodeid"] for item in items if is_async_smoke(item)}
+    duplicates = [item for item in items if item.nodeid in twins]
+    if duplicates:
+        config.hook.pytest_deselected(items=duplicates)
+        items[:] = [item for item in items if item.nodeid not in twins]
+
+
+class SessionRejected(RuntimeError):
+    """The portal showed its login form for a stored session."""
+
+    def __init__(self, role):
+        super().__init__(f"Stored {role} session rejected")
+        self.role = role
+
+
+class Outcome:
+    def __init__(self, nodeid, error=None, value=None, duration=0.0, screenshot=None):
+        self.nodeid = nodeid
+        self.error = error
+        self.value = value
+        self.duration = duration
+        self.screenshot = screenshot
+
+    @property
+    def passed(self):
+        return self.error is None
+
+
+class AsyncRunner:
+    def __init__(self, auth, browser_name="chromium", launch_args=None, context_args=None, concurrency=None,
+                 browsers=None, stand_in=None):
+        self.browser_name = browser_name
+        self.launch_args = launch_args or {}
+        self.context_args = context_args or {}
+        self.concurrency = concurrency or Config.ASYNC_CONCURRENCY
+        self.browser_count = browsers or Config.ASYNC_BROWSERS
+        self.stand_in = stand_in
+        self.auth = auth  # the session's AuthStateCache; only used from the calling thread
+        self._browsers = []
+        self._next_browser = 0
+
+    def _browser(self):
+        browser = self._browsers[self._next_browser % len(self._browsers)]
+        self._next_browser += 1
+        return browser
+
+    async def _new_context(self, **context_args):
+        context = await self._browser().new_context(**{**self.context_args, **context_args})
+        if self.stand_in is not None:
+            await route_to_stand_in_async(context, self.stand_in)
+        if Config.BLOCK_RESOURCES or Config.STUB_HOSTS:
+            await block_resources_async(context)
+        return context
+
+    async def open_page(self, role):
+        """``(context, page)`` on the role's dashboard, signed in from AuthStateCache's state file."""
+        portal_url, locators = portal_for(role)
+        context = await self._new_context(storage_state=self.auth.path(role))
+        try:
+            page = await context.new_page()
+            await page.goto(portal_url)
+            await page.wait_for_selector(f"{locators.DASHBOARD}, {locators.USERNAME_INPUT}")
+            if await page.query_selector(locators.DASHBOARD) is None:
+                raise SessionRejected(role)
+        except BaseException:
+            await context.close()
+            raise
+        return context, page
+
+    async def _run_one(self, semaphore, item):
+        async with semaphore:
+            start = time.perf_counter()
+            context = page = None
+            try:
+                context, page = await self.open_page(item.role)
+                value = await item.func(page)
+                return Outcome(item.nodeid, value=value, duration=time.perf_counter() - start)
+            except Exception as error:
+                screenshot = None
+                if page is not None:
+                    try:
+                        screenshot = await page.screenshot(type="jpeg", quality=Config.SCREENSHOT_QUALITY)
+                    except Exception:  # page already gone
+                        pass
+                return Outcome(item.nodeid, error=error, duration=time.perf_counter() - start,
+                               screenshot=screenshot)
+            finally:
+                if context is not None:
+                    await context.close()
+
+    async def run(self, nodeids):
+        """Run the scenarios for ``nodeids`` concurrently; returns ``{nodeid: Outcome}``."""
+        items = [SCENARIOS[nodeid] for nodeid in nodeids]
+        if not items:
+            return {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with async_playwright() as playwright:
+            browser_type = getattr(playwright, self.browser_name)
+            self._browsers = [await browser_type.launch(**self.launch_args)
+                              for _ in range(min(self.browser_count, len(items)))]
+            try:
+                start = time.perf_counter()
+                outcomes = await asyncio.gather(*(self._run_one(semaphore, item) for item in items))
+                logger.info("Ran %d async scenarios in %.1fs (concurrency %d, %d browsers)",
+                            len(items), time.perf_counter() - start, self.concurrency, len(self._browsers))
+            finally:
+                for browser in self._browsers:
+                    await browser.close()
+        return {outcome.nodeid: outcome for outcome in outcomes}
+
+    def _run_in_thread(self, nodeids):
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="async-runner") as executor:
+            return executor.submit(asyncio.run, self.run(nodeids)).result()
+
+    def run_in_thread(self, nodeids):
+        """Log in every role the scenarios need, then run them on a loop in another thread.
+
+        Scenarios whose stored session was rejected run once more after a fresh
+        login, like AuthStateCache.open_page.
+        """
+        nodeids = list(nodeids)
+        for role in {SCENARIOS[nodeid].role for nodeid in nodeids}:
+            self.auth.storage_state(role)
+        outcomes = self._run_in_thread(nodeids)
+        rejected = [nodeid for nodeid, outcome in outcomes.items() if isinstance(outcome.error, SessionRejected)]
+        for role in {outcomes[nodeid].error.role for nodeid in rejected}:
+            logger.info("Stored %s session rejected, logging in again", role)
+            self.auth.invalidate(role)
+            self.auth.storage_state(role)
+        if rejected:
+            outcomes.update(self._run_in_thread(rejected))
+        return outcomes
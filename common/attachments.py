@@ -0,0 +1,166 @@
+# common/attachments.py
+#
+# Screenshot pipeline that keeps image work off the test thread.
+#
+#   SCREENSHOT_POLICY=always      capture every requested screenshot
+#   SCREENSHOT_POLICY=on-failure  capture only if the test fails (default)
+#   SCREENSHOT_POLICY=sampled     capture SCREENSHOT_SAMPLE_RATE of requests,
+#                                 plus everything on failure
+#
+# Captures use Playwright's own JPEG encoder where possible; re-encoding to
+# WebP or downscaling (SCREENSHOT_SCALE < 1) needs Pillow and runs on a
+# background pool together with hashing and the disk write. Identical images
+# are written once. Attachments are added to Allure from the test thread once
+# the call phase ends, so they land on the test result as before.
+#
+# A screenshot that waits for the outcome (on-failure, or not sampled) costs
+# nothing while the test runs: its page is only remembered, and a failing test
+# gets one capture per page when it finishes. SCREENSHOT_KEEP_STEPS=true
+# instead takes a raw PNG at each request, so a failure shows every step as it
+# was; only encoding, spooling and attaching are then skipped for passing
+# tests (without Pillow those are attached as PNG).
+
+import hashlib
+import io
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import allure
+
+from common.config import Config
+from common.visual import get_visual
+
+try:
+    from PIL import Image
+except ImportError:  # WebP output and downscaling are optional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+ATTACHMENT_TYPES = {"png": allure.attachment_type.PNG, "jpeg": allure.attachment_type.JPG}
+
+
+class ScreenshotPipeline:
+    def __init__(self, policy=None, sample_rate=None, image_format=None, quality=None, scale=None,
+                 spool_dir=None, workers=None, keep_steps=None):
+        self.policy = policy or Config.SCREENSHOT_POLICY
+        self.sample_rate = Config.SCREENSHOT_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.image_format = image_format or Config.SCREENSHOT_FORMAT
+        self.quality = quality or Config.SCREENSHOT_QUALITY
+        self.scale = scale or Config.SCREENSHOT_SCALE
+        self.spool_dir = spool_dir or Config.SCREENSHOT_SPOOL_DIR
+        self.keep_steps = Config.SCREENSHOT_KEEP_STEPS if keep_steps is None else keep_steps
+        if self.image_format == "webp" or self.scale < 1:
+            if Image is None:
+                logger.warning("Pillow is not installed; using JPEG screenshots at full scale")
+                self.image_format, self.scale = "jpeg", 1.0
+        self._executor = ThreadPoolExecutor(max_workers=workers or Config.SCREENSHOT_WORKERS,
+                                            thread_name_prefix="screenshots")
+        self._random = random.Random()
+        self._digests = {}  # content hash -> spooled file
+        self._digests_lock = threading.Lock()
+        self._pages = []
+        self._deferred = []  # (name, raw PNG bytes) kept until the outcome is known, with keep_steps
+        self._pending = []
+
+    def start_test(self):
+        self._pages, self._deferred, self._pending = [], [], []
+
+    def track(self, page):
+        """Register a page to capture if the test fails before asking for a screenshot."""
+        if not any(tracked is page for tracked in self._pages):
+            self._pages.append(page)
+
+    def capture(self, page, name):
+        """Replacement for ``allure.attach(page.screenshot(), name=name, ...)``."""
+        if self.policy == "always" or (self.policy == "sampled" and self._random.random() < self.sample_rate):
+            self._submit(page, name)
+        elif self.keep_steps:
+            raw = self._screenshot(page, name, "png")
+            if raw is not None:
+                self._deferred.append((name, raw))
+        else:
+            self.track(page)
+
+    def _screenshot(self, page, name, image_format):
+        try:
+            if image_format == "png":
+                return page.screenshot(type="png", scale="css")
+            # Let the browser encode JPEG directly; Pillow only re-encodes for WebP/downscaling
+            return page.screenshot(type="jpeg", quality=self.quality, scale="css")
+        except Exception as error:  # page already closed or crashed
+            logger.warning("Screenshot %r failed: %s", name, error)
+            return None
+
+    def _submit(self, page, name):
+        image_format = "png" if self.image_format == "png" else "jpeg"
+        raw = self._screenshot(page, name, image_format)
+        if raw is not None:
+            self._spool(name, raw, image_format)
+
+    def _spool(self, name, raw, image_format):
+        self._pending.append((name, self._executor.submit(self._encode_and_spool, raw, image_format)))
+
+    def _encode_and_spool(self, raw, image_format):
+        """Re-encode ``raw`` to the configured format if needed and spool it; returns ``(path, format)``."""
+        if Image is not None and (self.image_format != image_format or self.scale < 1):
+            image = Image.open(io.BytesIO(raw))
+            if self.scale < 1:
+                image = image.resize((max(1, int(image.width * self.scale)), max(1, int(image.height * self.scale))))
+            out = io.BytesIO()
+            if self.image_format == "png":
+                image.save(out, format="PNG")
+            else:
+                image.convert("RGB").save(out, format=self.image_format.upper(), quality=self.quality)
+            raw, image_format = out.getvalue(), self.image_format
+        digest = hashlib.sha1(raw).hexdigest()
+        extension = "jpg" if image_format == "jpeg" else image_format
+        with self._digests_lock:
+            path = self._digests.get(digest)
+            if path is not None:
+                return path, image_format
+            path = os.path.join(self.spool_dir, f"{digest}.{extension}")
+            self._digests[digest] = path
+        if not os.path.exists(path):
+            os.makedirs(self.spool_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(raw)
+        return path, image_format
+
+    def finish_test(self, failed):
+        """On failure, capture each tracked page once (or encode the kept step
+        images), then attach everything to Allure."""
+        if failed:
+            if self._deferred:
+                for name, raw in self._deferred:
+                    self._spool(name, raw, "png")
+            else:
+                for index, page in enumerate(self._pages):
+                    self._submit(page, "Failure Screenshot" if index == 0 else f"Failure Screenshot {index + 1}")
+        for name, future in self._pending:
+            path, image_format = future.result()
+            allure.attach.file(path, name=name, attachment_type=ATTACHMENT_TYPES.get(image_format),
+                               extension=None if image_format in ATTACHMENT_TYPES else image_format)
+        self.start_test()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_pipeline = None
+
+
+def get_pipeline():
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = ScreenshotPipeline()
+    return _pipeline
+
+
+def attach_screenshot(page, name):
+    get_pipeline().capture(page, name)
+    # VISUAL_MODE=report/fail also compares the page with its baseline (common.visual)
+    get_visual().check(page, name)
@@ -0,0 +1,122 @@
+# common/auth_state.py
+
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+
+from common.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Role -> (portal URL, locator class). Both are looked up on first use: conftest
+# imports this module, and the unit tests must still run where the portal
+# helpers and locators are not importable.
+ROLES = {
+    "client": (lambda: Config.CLIENT_PORTAL_URL, ("locators.react_client_page", "ReactClientPageLocators")),
+    "employee": (lambda: Config.EMPLOYEE_PORTAL_URL, ("locators.react_employee_page", "ReactEmployeePageLocators")),
+    "verifier": (lambda: Config.VERIFIER_PORTAL_URL, ("locators.react_verifier_page", "ReactVerifierPageLocators")),
+}
+
+
+class AuthStateCache:
+    """Logs each portal role in once and reuses its saved storage state.
+
+    State files live in ``state_dir`` as ``<role>.json``. A file is reused
+    until it is older than ``ttl`` seconds or one of its cookies expires;
+    ``open_page`` also refreshes it when the portal shows the login form
+    instead of the dashboard.
+    """
+
+    def __init__(self, pool, context_args=None, state_dir=None, ttl=None, username=None, password=None):
+        self.pool = pool
+        self.context_args = context_args or {}
+        self.state_dir = state_dir or Config.AUTH_STATE_DIR
+        self.ttl = Config.AUTH_STATE_TTL if ttl is None else ttl
+        self.username = username or Config.PORTAL_USERNAME
+        self.password = password or Config.PORTAL_PASSWORD
+        self._lock = threading.Lock()
+
+    def path(self, role):
+        return os.path.join(self.state_dir, f"{role}.json")
+
+    def is_fresh(self, role):
+        path = self.path(role)
+        try:
+            age = time.time() - os.path.getmtime(path)
+            with open(path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if self.ttl and age > self.ttl:
+            return False
+        now = time.time()
+        # Session cookies report expires == -1 and never go stale on their own
+        return all(c.get("expires", -1) < 0 or c["expires"] > now for c in state.get("cookies", []))
+
+    def invalidate(self, role):
+        try:
+            os.remove(self.path(role))
+        except FileNotFoundError:
+            pass
+
+    def refresh(self, role):
+        from common.functions import login
+
+        portal_url, locators = portal_for(role)
+        logger.info("Logging in as %s to refresh storage state", role)
+        os.makedirs(self.state_dir, exist_ok=True)
+        context = self.pool.new_context(**self.context_args)
+        try:
+            page = context.new_page()
+            page.goto(portal_url)
+            login(page, self.username, self.password)
+            page.wait_for_selector(locators.DASHBOARD)
+            # Write-then-rename so parallel workers never read a partial file
+            tmp_path = f"{self.path(role)}.{os.getpid()}.tmp"
+            context.storage_state(path=tmp_path)
+            os.replace(tmp_path, self.path(role))
+        finally:
+            self.pool.release(context)
+        return self.path(role)
+
+    def storage_state(self, role):
+        with self._lock:
+            if not self.is_fresh(role):
+                self.refresh(role)
+            return self.path(role)
+
+    def new_context(self, role, **context_args):
+        return self.pool.new_context(**{**self.context_args, **context_args}, storage_state=self.storage_state(role))
+
+    def open_page(self, role, **context_args):
+        """Return ``(context, page)`` with ``page`` on the role's dashboard."""
+        portal_url, locators = portal_for(role)
+        for _ in range(2):
+            context = self.new_context(role, **context_args)
+            try:
+                page = context.new_page()
+                page.goto(portal_url)
+                page.wait_for_selector(f"{locators.DASHBOARD}, {locators.USERNAME_INPUT}")
+                if page.query_selector(locators.DASHBOARD) is not None:
+                    return context, page
+            except BaseException:
+                # Timeouts and aborted navigations must not keep the pool's browser pinned
+                self.pool.release(context)
+                raise
+            # Redirected to the login form: the saved session is no longer valid
+            logger.info("Stored %s session rejected, logging in again", role)
+            self.pool.release(context)
+            self.invalidate(role)
+        raise RuntimeError(f"Could not open an authenticated {role} session at {portal_url}")
+
+
+def portal_for(role):
+    """``(portal URL, locator class)`` for ``role``."""
+    try:
+        portal_url, (module_name, class_name) = ROLES[role]
+    except KeyError:
+        raise ValueError(f"Unknown portal role: {role!r}") from None
+    return portal_url(), getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,271 @@
+# common/benchmark.py
+#
+# Benchmarks for the framework's own overhead, so framework changes can be
+# shown to speed the suite up (or caught slowing it down).
+#
+#   python -m common.benchmark                    # run and compare to baseline
+#   python -m common.benchmark --save-baseline    # record a new baseline
+#   python -m common.benchmark --only data,save   # run a subset of groups
+#
+# Timings only compare on the same machine, so the baseline
+# (benchmarks/baseline.json) is recorded and committed from the CI runner
+# that runs the comparison. Without one the comparison fails rather than
+# passing on nothing.
+#
+# Groups: fixtures (playwright start, browser launch, context/page creation
+# and teardown, per-module setup_teardown vs pooled context), data
+# (read_test_data), save (save_data), attach (allure.attach), selectors
+# (wait_for_selector latency against a local static page, per locator and
+# batched through wait_for_locators).
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from allure_commons.logger import AllureFileLogger
+from playwright.sync_api import sync_playwright
+
+from common import data_provider
+from common import results_store
+from common.browser_pool import BrowserPool
+from common.config import Config
+from common.locator_batch import locator_attributes, wait_for_locators
+from common.stand_in import vvapp_login_page
+
+BASELINE_FILE = os.path.join("benchmarks", "baseline.json")
+DATA_FILES = ["test_data.csv", "registration_data.csv", "onboarding_data.csv"]
+
+
+def measure(fn, repeat, setup=None, teardown=None):
+    """Run ``fn`` ``repeat`` times; ``setup``'s return value is passed to ``fn``/``teardown``."""
+    samples = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = time.perf_counter()
+        fn(state) if setup else fn()
+        samples.append((time.perf_counter() - start) * 1000)
+        if teardown:
+            teardown(state)
+    samples.sort()
+    return {"median_ms": statistics.median(samples), "p95_ms": samples[max(0, int(len(samples) * 0.95) - 1)],
+            "min_ms": samples[0], "runs": repeat}
+
+
+def bench_fixtures(repeat):
+    results = {}
+    results["playwright_start_stop"] = measure(lambda: sync_playwright().start().stop(), repeat)
+
+    with sync_playwright() as p:
+        chromium = p.chromium
+        results["browser_launch_close"] = measure(lambda: chromium.launch(headless=True).close(), repeat)
+
+        browser = chromium.launch(headless=True)
+        contexts = []
+        results["context_create"] = measure(lambda: contexts.append(browser.new_context()), repeat)
+        results["context_close"] = measure(lambda context: context.close(), repeat, setup=contexts.pop)
+        context = browser.new_context()
+        pages = []
+        results["page_create"] = measure(lambda: pages.append(context.new_page()), repeat)
+        results["page_close"] = measure(lambda page: page.close(), repeat, setup=pages.pop)
+        context.close()
+        browser.close()
+
+        def legacy_setup_teardown():
+            # What every test module's own setup_teardown fixture used to do
+            with sync_playwright() as legacy:
+                legacy_browser = legacy.chromium.launch(headless=True)
+                legacy_context = legacy_browser.new_context()
+                legacy_context.new_page()
+                legacy_context.close()
+                legacy_browser.close()
+
+        pool = BrowserPool(chromium, {"headless": True}, max_contexts=Config.POOL_MAX_CONTEXTS)
+
+        def pooled_setup_teardown():
+            pooled_context = pool.new_context()
+            pooled_context.new_page()
+            pool.release(pooled_context)
+
+        pool.browser  # launch outside the timed region, as the session fixture does
+        results["pooled_setup_teardown"] = measure(pooled_setup_teardown, repeat)
+        pool.close()
+    # sync_playwright() cannot nest, so the legacy fixture is timed on its own
+    results["legacy_setup_teardown"] = measure(legacy_setup_teardown, repeat)
+    return results
+
+
+def bench_data(repeat, data_dir):
+    from common.functions import read_test_data as legacy_read_test_data
+
+    results = {}
+    cache_dir = tempfile.mkdtemp(prefix="bench-data-")
+    original_cache_dir = Config.DATA_CACHE_DIR
+    Config.DATA_CACHE_DIR = cache_dir
+    try:
+        for name in DATA_FILES:
+            path = os.path.join(data_dir, name)
+            if not os.path.exists(path):
+                continue
+            results[f"legacy_read_test_data[{name}]"] = measure(lambda: legacy_read_test_data(path), repeat)
+            results[f"parse[{name}]"] = measure(lambda: data_provider._parse(path), repeat)
+
+            def cold_process():
+                data_provider._datasets.clear()  # new collection, warm on-disk cache
+                data_provider.read_test_data(path)
+
+            results[f"read_test_data_disk_cache[{name}]"] = measure(cold_process, repeat)
+            results[f"read_test_data_memory[{name}]"] = measure(lambda: data_provider.read_test_data(path), repeat)
+    finally:
+        Config.DATA_CACHE_DIR = original_cache_dir
+        data_provider._datasets.clear()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def bench_save(repeat, stored_data):
+    from common.functions import save_data as legacy_save_data
+
+    tmp = tempfile.mkdtemp(prefix="bench-save-")
+    try:
+        path = os.path.join(tmp, "stored_data.json")
+        if os.path.exists(stored_data):
+            shutil.copy(stored_data, path)
+        else:
+            with open(path, "w") as f:
+                f.write("{}")
+        record = {"login_status": "success", "username": "valid_username"}
+        results = {"legacy_save_data": measure(lambda: legacy_save_data(path, record), repeat)}
+        journal = results_store.ResultJournal(path)
+        results["journal_append"] = measure(lambda: journal.append(record), repeat)
+        journal.flush()
+        results["journal_compact"] = measure(lambda: results_store.compact(path), max(1, repeat // 10))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return results
+
+
+def bench_attach(repeat):
+    tmp = tempfile.mkdtemp(prefix="bench-allure-")
+    try:
+        # allure.attach() ends in the file logger's write; time that with screenshot-sized bodies
+        file_logger = AllureFileLogger(tmp)
+        body = os.urandom(300 * 1024)
+        results = {"allure_attach_300kb": measure(
+            lambda: file_logger.report_attached_data(body=body, file_name=f"{uuid.uuid4()}-attachment.png"),
+            repeat,
+        )}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(vvapp_login_page())
+        results["screenshot_png"] = measure(lambda: page.screenshot(type="png"), repeat)
+        results["screenshot_jpeg"] = measure(
+            lambda: page.screenshot(type="jpeg", quality=Config.SCREENSHOT_QUALITY, scale="css"), repeat)
+        browser.close()
+    return results
+
+
+def bench_selectors(repeat):
+    from locators.login_page import LoginPageLocators
+
+    results = {}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(vvapp_login_page())
+        for name, selector in vars(LoginPageLocators).items():
+            if name.startswith("_") or not isinstance(selector, str):
+                continue
+            if page.query_selector(selector) is None:
+                continue  # not on the static login page (e.g. the registration header)
+            results[f"wait_for_selector[{name}]"] = measure(lambda: page.wait_for_selector(selector), repeat)
+        present = [name for name, selector in locator_attributes(LoginPageLocators).items()
+                   if page.query_selector(selector) is not None]
+        results["wait_for_locators[batched]"] = measure(
+            lambda: wait_for_locators(page, LoginPageLocators, present), repeat)
+        browser.close()
+    return results
+
+
+def run(groups, repeat, data_dir, stored_data):
+    benches = {
+        "fixtures": lambda: bench_fixtures(max(1, repeat // 5)),
+        "data": lambda: bench_data(repeat, data_dir),
+        "save": lambda: bench_save(repeat, stored_data),
+        "attach": lambda: bench_attach(repeat),
+        "selectors": lambda: bench_selectors(repeat),
+    }
+    results = {}
+    for group in groups:
+        print(f"Running {group} benchmarks...", flush=True)
+        for name, result in benches[group]().items():
+            results[f"{group}.{name}"] = result
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return ``(name, baseline_ms, current_ms)`` for medians slower than the threshold allows."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)  # new benchmarks have nothing to regress from
+        if previous and result["median_ms"] > previous["median_ms"] * (1 + threshold):
+            regressions.append((name, previous["median_ms"], result["median_ms"]))
+    return regressions
+
+
+def main(argv=None):
+    groups = ["fixtures", "data", "save", "attach", "selectors"]
+    parser = argparse.ArgumentParser(description="Benchmark the test framework's own overhead")
+    parser.add_argument("--only", default=",".join(groups), help=f"comma-separated subset of {groups}")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--stored-data", default=os.path.join("data", "stored_data.json"))
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    selected = [group for group in args.only.split(",") if group]
+    unknown = [group for group in selected if group not in groups]
+    if unknown:
+        parser.error(f"unknown groups: {', '.join(unknown)}")
+
+    results = run(selected, args.repeat, args.data_dir, args.stored_data)
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    for name, result in results.items():
+        previous = baseline.get(name, {}).get("median_ms")
+        delta = f"  ({(result['median_ms'] / previous - 1):+.0%} vs baseline)" if previous else ""
+        print(f"{name:60} median {result['median_ms']:9.3f}ms  p95 {result['p95_ms']:9.3f}ms{delta}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; record one with --save-baseline on this machine and commit it")
+        return 2
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before:.3f}ms -> {after:.3f}ms")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
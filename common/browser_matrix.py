@@ -0,0 +1,195 @@
+# common/browser_matrix.py
+#
+# Runs the same test selection on several browser engines at once: one
+# pytest lane per engine (pytest-playwright's --browser), all started
+# together. Setup that does not depend on the engine is done once here and
+# handed to the lanes through the environment:
+#
+#   * the stand-in server (STAND_IN=true) is started once; lanes get its URL
+#   * the API bearer token is fetched once (API_TOKEN)
+#   * every CSV under data/ is parsed into the shared data cache
+#
+# Each lane keeps its own adaptive-timeout history (TEST_ENV=<env>-<engine>)
+# and writes a JUnit report, and the results are summarised per engine with a
+# per-test timing comparison. State named after the test alone would be
+# overwritten by the other lanes running the same tests, so each lane gets its
+# own directory under the results dir (<results>/<engine>/) for the Allure
+# results, checkpoints and failure traces. The rest is safe to share:
+#
+#   * the results journal: every process appends to its own segment, and
+#     compaction claims segments by renaming them under the file lock;
+#   * the download digest cache and HAR index: merged under their file lock,
+#     and a document's digest does not depend on the engine;
+#   * visual captures (kept per engine) and spooled screenshots (named by
+#     content hash).
+#
+#   python -m common.browser_matrix -m smoke
+#   python -m common.browser_matrix --browsers chromium,firefox test_login.py
+
+import argparse
+import glob
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from common.api_client import extract_token
+from common.config import Config
+from common.data_provider import load_dataset
+from common.stand_in import StandInServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARGS = ["-m", "gui"]
+# Per-lane state directories, relative to <results>/<engine>/
+LANE_STATE = {"CHECKPOINT_DIR": "checkpoints", "TRACE_DIR": "traces"}
+
+
+def shared_setup():
+    """Engine-independent setup; returns ``(env, cleanup)`` for the lanes."""
+    env, stand_in = {}, None
+    if Config.STAND_IN and not Config.STAND_IN_URL:
+        stand_in = StandInServer(latency=Config.STAND_IN_LATENCY_MS / 1000,
+                                 error_rate=Config.STAND_IN_ERROR_RATE).start()
+        env["STAND_IN_URL"] = stand_in.url
+        Config.API_BASE_URL = stand_in.url
+    if not Config.API_TOKEN:
+        from common.functions import api_login
+        try:
+            response = api_login(Config.API_BASE_URL, Config.PORTAL_USERNAME, Config.PORTAL_PASSWORD)
+            env["API_TOKEN"] = extract_token(response)
+        except Exception as error:  # the lanes log in themselves
+            logger.warning("Could not fetch a shared API token: %s", error)
+    for path in glob.glob(os.path.join("data", "*.csv")):
+        load_dataset(path)
+
+    def cleanup():
+        if stand_in is not None:
+            stand_in.stop()
+    return env, cleanup
+
+
+def _junit_cases(path, engine):
+    """``{test id without the engine: (outcome, seconds)}`` from a lane's JUnit report."""
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError):
+        return {}
+    cases = {}
+    for case in root.iter("testcase"):
+        name = case.get("name", "")
+        if "[" in name:
+            # pytest joins parameter ids with "-"; drop the one naming the engine
+            base, _, params = name.partition("[")
+            params = "-".join(part for part in params.removesuffix("]").split("-") if part != engine)
+            name = f"{base}[{params}]" if params else base
+        outcome = "passed"
+        for tag in ("failure", "error", "skipped"):
+            if case.find(tag) is not None:
+                outcome = {"failure": "failed"}.get(tag, tag)
+                break
+        cases[f"{case.get('classname', '')}::{name}"] = (outcome, float(case.get("time", 0)))
+    return cases
+
+
+def lane(engine, results_dir, pytest_args, env=None):
+    """``(command, env)`` for one engine's pytest lane."""
+    lane_dir = os.path.join(results_dir, engine)
+    lane_env = dict(os.environ, **(env or {}), TEST_ENV=f"{Config.TEST_ENV}-{engine}",
+                    **{name: os.path.join(lane_dir, directory) for name, directory in LANE_STATE.items()})
+    # Given after pytest.ini's addopts, so this --alluredir is the one used
+    command = [sys.executable, "-m", "pytest", "--browser", engine, f"--junitxml={_junit_path(results_dir, engine)}",
+               f"--alluredir={os.path.join(lane_dir, 'allure-results')}", *pytest_args]
+    return command, lane_env
+
+
+def _junit_path(results_dir, engine):
+    return os.path.join(results_dir, f"{engine}.xml")
+
+
+def run(engines, pytest_args, results_dir=None):
+    results_dir = results_dir or Config.MATRIX_RESULTS_DIR
+    os.makedirs(results_dir, exist_ok=True)
+    env, cleanup = shared_setup()
+    lanes = {}
+    try:
+        start = time.monotonic()
+        for engine in engines:
+            command, lane_env = lane(engine, results_dir, pytest_args, env)
+            lanes[engine] = {"process": subprocess.Popen(command, env=lane_env),
+                             "junit": _junit_path(results_dir, engine)}
+        print(f"Started {len(lanes)} lanes: {', '.join(engines)}")
+        while any(lane.get("exit") is None for lane in lanes.values()):
+            for lane in lanes.values():
+                if lane.get("exit") is None and lane["process"].poll() is not None:
+                    lane["exit"], lane["wall"] = lane["process"].returncode, time.monotonic() - start
+            time.sleep(0.1)
+        wall = time.monotonic() - start
+    finally:
+        for lane in lanes.values():
+            if lane["process"].poll() is None:
+                lane["process"].terminate()
+        cleanup()
+
+    summary = summarize({engine: _junit_cases(lane["junit"], engine) for engine, lane in lanes.items()},
+                        {engine: lane["wall"] for engine, lane in lanes.items()})
+    summary["wall_seconds"] = round(wall, 2)
+    with open(os.path.join(results_dir, "summary.json"), "w") as f:
+        json.dump(summary, f, indent=2)
+    report(summary)
+    codes = [lane["exit"] for lane in lanes.values()]
+    return max(codes) if any(codes) else 0
+
+
+def summarize(cases_by_engine, wall_by_engine):
+    engines = {}
+    for engine, cases in cases_by_engine.items():
+        counts = {"passed": 0, "failed": 0, "error": 0, "skipped": 0}
+        for outcome, _ in cases.values():
+            counts[outcome] += 1
+        engines[engine] = {**counts, "test_seconds": round(sum(seconds for _, seconds in cases.values()), 2),
+                           "wall_seconds": round(wall_by_engine[engine], 2)}
+    tests = {}
+    for engine, cases in cases_by_engine.items():
+        for test, (outcome, seconds) in cases.items():
+            tests.setdefault(test, {})[engine] = {"outcome": outcome, "seconds": round(seconds, 3)}
+    # Engine-specific failures and the largest slowdowns are what people look for first
+    differing = sorted(test for test, results in tests.items()
+                       if len({result["outcome"] for result in results.values()}) > 1)
+    spreads = []
+    for test, results in tests.items():
+        times = {engine: result["seconds"] for engine, result in results.items() if result["outcome"] == "passed"}
+        if len(times) > 1 and min(times.values()) > 0:
+            fastest, slowest = min(times, key=times.get), max(times, key=times.get)
+            spreads.append({"test": test, "fastest": fastest, "slowest": slowest,
+                            "ratio": round(times[slowest] / times[fastest], 2)})
+    spreads.sort(key=lambda spread: -spread["ratio"])
+    return {"engines": engines, "tests": tests, "differing_outcomes": differing, "slowest_relative": spreads[:10]}
+
+
+def report(summary):
+    print(f"\nBrowser matrix, wall time {summary['wall_seconds']:.1f}s")
+    for engine, stats in summary["engines"].items():
+        print(f"  {engine:9} passed {stats['passed']:<4} failed {stats['failed']:<4} error {stats['error']:<3} "
+              f"skipped {stats['skipped']:<4} tests {stats['test_seconds']:7.1f}s  lane {stats['wall_seconds']:6.1f}s")
+    for test in summary["differing_outcomes"]:
+        outcomes = ", ".join(f"{engine}: {result['outcome']}" for engine, result in summary["tests"][test].items())
+        print(f"  differs: {test} ({outcomes})")
+    for spread in summary["slowest_relative"]:
+        print(f"  {spread['ratio']:5.2f}x  {spread['test']} ({spread['slowest']} vs {spread['fastest']})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a test selection on several browser engines concurrently")
+    parser.add_argument("--browsers", default=",".join(Config.MATRIX_BROWSERS))
+    parser.add_argument("--results-dir", default=Config.MATRIX_RESULTS_DIR)
+    args, pytest_args = parser.parse_known_args(argv)
+    engines = [engine for engine in args.browsers.split(",") if engine]
+    return run(engines, pytest_args or DEFAULT_ARGS, args.results_dir)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# common/browser_pool.py
+
+import logging
+
+try:
+    import psutil
+except ImportError:  # memory-based recycling is optional
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """Hands out isolated BrowserContexts from one long-lived browser.
+
+    The browser is launched on first use and replaced once it has served
+    ``max_contexts`` contexts or its process tree exceeds ``max_rss_mb``.
+    A retired browser is closed as soon as its last context is released.
+    Callables in ``context_hooks`` run on every new context (e.g. routing).
+    ``proxy`` stands in for the browser where a Browser object is expected.
+    """
+
+    def __init__(self, browser_type, launch_args=None, max_contexts=50, max_rss_mb=0):
+        self.browser_type = browser_type
+        self.launch_args = launch_args or {}
+        self.max_contexts = max_contexts
+        self.max_rss_mb = max_rss_mb
+        self._browser = None
+        self._served = 0
+        self._open = {}  # browser -> number of contexts still open
+        self._owners = {}  # context -> browser that created it
+        self._processes = []  # root processes of the current browser's tree
+        self.launches = 0
+        self.context_hooks = []
+        self.proxy = PooledBrowser(self)
+
+    @property
+    def browser(self):
+        if self._browser is None or not self._browser.is_connected():
+            self._launch()
+        return self._browser
+
+    def _launch(self):
+        logger.info("Launching %s", self.browser_type.name)
+        before = {process.pid for process in _children()}
+        self._browser = self.browser_type.launch(**self.launch_args)
+        # The processes that appeared with this launch; the roots among them
+        # are the browser itself, renderers and helpers are their descendants
+        launched = [process for process in _children() if process.pid not in before]
+        pids = {process.pid for process in launched}
+        self._processes = [process for process in launched if process.ppid() not in pids]
+        self._open[self._browser] = 0
+        self._served = 0
+        self.launches += 1
+
+    def _rss_mb(self):
+        """Resident memory of the current browser's process tree (not the driver or retired browsers)."""
+        if psutil is None:
+            return 0
+        total = 0
+        for root in self._processes:
+            try:
+                tree = [root, *root.children(recursive=True)]
+            except psutil.Error:  # the browser process is gone
+                continue
+            for process in tree:
+                try:
+                    total += process.memory_info().rss
+                except psutil.Error:
+                    continue
+        return total / (1024 * 1024)
+
+    def _needs_recycle(self):
+        if self.max_contexts and self._served >= self.max_contexts:
+            return True
+        return bool(self.max_rss_mb) and self._rss_mb() > self.max_rss_mb
+
+    def _retire(self):
+        browser, self._browser = self._browser, None
+        logger.info("Recycling browser after %d contexts", self._served)
+        if self._open.get(browser, 0) == 0:
+            self._close(browser)
+
+    def _close(self, browser):
+        self._open.pop(browser, None)
+        if browser.is_connected():
+            browser.close()
+
+    def new_context(self, **context_args):
+        if self._browser is not None and self._needs_recycle():
+            self._retire()
+        browser = self.browser
+        context = browser.new_context(**context_args)
+        for hook in self.context_hooks:
+            hook(context)
+        self._served += 1
+        self._open[browser] += 1
+        self._owners[context] = browser
+        return context
+
+    def release(self, context):
+        browser = self._owners.pop(context, None)
+        context.close()
+        self._released(browser)
+
+    def _released(self, browser):
+        if browser not in self._open:
+            return
+        self._open[browser] -= 1
+        if browser is not self._browser and self._open[browser] == 0:
+            self._close(browser)
+
+    def close(self):
+        for browser in list(self._open):
+            self._close(browser)
+        self._browser = None
+
+
+class PooledBrowser:
+    """The pool's current browser, for code that wants a Browser object
+    (pytest-playwright's ``browser`` fixture and the ``context``/``page``
+    fixtures built on it). It is resolved on every use, so it never points at
+    a browser the pool has recycled. Contexts created through it count
+    towards recycling and are released when they close.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+
+    def new_context(self, **context_args):
+        pool = self._pool
+        context = pool.new_context(**context_args)
+        # Closed by its creator rather than through release(); release() pops
+        # the owner first, so a context is never counted out twice
+        context.on("close", lambda _: pool._released(pool._owners.pop(context, None)))
+        return context
+
+    def __getattr__(self, name):
+        return getattr(self._pool.browser, name)
+
+
+def _children():
+    return psutil.Process().children(recursive=True) if psutil is not None else []
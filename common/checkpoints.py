@@ -0,0 +1,179 @@
+# common/checkpoints.py
+#
+# Flow checkpoints: after a named step of a multi-step flow, snapshot the
+# context's storage state (cookies + localStorage) and the page URL under
+# Config.CHECKPOINT_DIR. A test whose last attempt failed - a retry by
+# pytest-rerunfailures in the same run, or the next run of a test listed in
+# failed.json - restores the furthest valid checkpoint that test saved into
+# its context, reopens the URL and skips the steps before it.
+#
+#   CHECKPOINTS=true pytest --reruns 1      # retries resume in the same run
+#   CHECKPOINTS=true pytest --last-failed   # failed tests resume in a new run
+#
+#   flow = checkpoint_flow(page, "login_page_header", STEPS, LoginPageLocators, data)
+#   if flow.pending("Find and click the login link"):
+#       with perf_step(page, "Find and click the login link"):
+#           ...
+#       flow.checkpoint("Find and click the login link")
+#
+# A checkpoint is keyed by the flow, its steps up to that point and a
+# fingerprint of everything passed as depends_on (locator classes, data
+# rows), so editing a locator class or a CSV row invalidates it, and expires
+# after CHECKPOINT_TTL seconds. Tests never resume from each other's
+# checkpoints, so results do not depend on test order. Off unless
+# CHECKPOINTS=true. sessionStorage and in-page state are not restored; steps
+# must only rely on cookies, localStorage and the URL. failed.json lists the
+# tests whose last attempt failed, merged across workers at session end.
+
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Mapping
+
+import allure
+
+from common.config import Config
+from common.json_files import load_json, update_json
+from common.locator_batch import locator_attributes
+
+logger = logging.getLogger(__name__)
+
+# Restores localStorage for one origin without clobbering values the app sets later
+RESTORE_SCRIPT = """
+(origins => {
+  const items = origins[location.origin];
+  if (!items) return;
+  for (const {name, value} of items) {
+    if (localStorage.getItem(name) === null) localStorage.setItem(name, value);
+  }
+})(%s);
+"""
+
+
+def fingerprint(*depends_on):
+    """Stable hash of locator classes (their selectors), data rows and plain values."""
+    parts = []
+    for item in depends_on:
+        if isinstance(item, type):
+            parts.append([item.__name__, sorted(locator_attributes(item).items())])
+        elif isinstance(item, Mapping):
+            parts.append(sorted((str(key), str(value)) for key, value in item.items()))
+        else:
+            parts.append(repr(item))
+    return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+
+
+class CheckpointStore:
+    """Checkpoint files plus the tests whose last attempt failed."""
+
+    def __init__(self, directory=None, ttl=None):
+        self.directory = directory or Config.CHECKPOINT_DIR
+        self.ttl = Config.CHECKPOINT_TTL if ttl is None else ttl
+        self.failed = set()
+        self.passed = set()
+        self.last_failed = set(load_json(self._failed_path(), list))  # as of the previous run
+
+    def path(self, flow, key):
+        return os.path.join(self.directory, flow, f"{key}.json")
+
+    def save(self, flow, key, step, context, url, nodeid):
+        path = self.path(flow, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        checkpoint = {"step": step, "url": url, "storage_state": context.storage_state(),
+                      "nodeid": nodeid, "created": time.time()}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, path)
+
+    def load(self, flow, key):
+        path = self.path(flow, key)
+        try:
+            with open(path) as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl and time.time() - checkpoint["created"] > self.ttl:
+            os.remove(path)
+            return None
+        return checkpoint
+
+    def record_outcome(self, nodeid, failed):
+        (self.failed if failed else self.passed).add(nodeid)
+        (self.passed if failed else self.failed).discard(nodeid)
+
+    def failed_last(self, nodeid):
+        """True if the last attempt of ``nodeid``, in this run or the previous one, failed."""
+        return nodeid in self.failed or (nodeid in self.last_failed and nodeid not in self.passed)
+
+    def _failed_path(self):
+        return os.path.join(self.directory, "failed.json")
+
+    def save_outcomes(self):
+        """Merge this worker's outcomes into failed.json, keeping other workers' entries."""
+        update_json(self._failed_path(), lambda failed: sorted((set(failed) - self.passed) | self.failed), list)
+
+
+class Flow:
+    def __init__(self, page, name, steps, depends_on=(), store=None, nodeid=None, enabled=None):
+        self.page = page
+        self.enabled = Config.CHECKPOINTS if enabled is None else enabled
+        self.name = name
+        self.steps = list(steps)
+        self.store = store or get_store()
+        self.nodeid = nodeid or os.getenv("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0]
+        self.fingerprint = fingerprint(*depends_on)
+        self.resumed_at = None
+
+    def _key(self, step):
+        index = self.steps.index(step)
+        return hashlib.sha1(json.dumps([self.fingerprint, self.steps[:index + 1]]).encode()).hexdigest()[:20]
+
+    def resume(self, until=None):
+        """Restore the furthest usable checkpoint (up to ``until``); returns its step or None."""
+        if not self.enabled:
+            return None
+        if not self.store.failed_last(self.nodeid):
+            return None  # only a test whose last attempt failed resumes
+        last = self.steps.index(until) if until else len(self.steps) - 1
+        for step in reversed(self.steps[:last + 1]):
+            checkpoint = self.store.load(self.name, self._key(step))
+            if checkpoint is None or checkpoint["nodeid"] != self.nodeid:
+                continue
+            self._restore(checkpoint)
+            self.resumed_at = step
+            logger.info("%s: resumed flow %r after step %r", self.nodeid, self.name, step)
+            return step
+        return None
+
+    def _restore(self, checkpoint):
+        with allure.step(f"Resume from checkpoint: {checkpoint['step']}"):
+            state = checkpoint["storage_state"]
+            context = self.page.context
+            if state.get("cookies"):
+                context.add_cookies(state["cookies"])
+            origins = {origin["origin"]: origin["localStorage"] for origin in state.get("origins", [])}
+            if origins:
+                context.add_init_script(RESTORE_SCRIPT % json.dumps(origins))
+            self.page.goto(checkpoint["url"])
+
+    def pending(self, step):
+        """True if ``step`` still has to run (it is after the restored checkpoint)."""
+        return self.resumed_at is None or self.steps.index(step) > self.steps.index(self.resumed_at)
+
+    def checkpoint(self, step):
+        if not self.enabled:
+            return
+        self.store.save(self.name, self._key(step), step, self.page.context, self.page.url, self.nodeid)
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = CheckpointStore()
+    return _store
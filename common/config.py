@@ -0,0 +1,168 @@
+# common/config.py
+
+import os
+
+
+class Config:
+    # Browser pool: recycle the engine after this many contexts or once the
+    # browser processes grow past this many MB of resident memory (0 disables).
+    POOL_MAX_CONTEXTS = int(os.getenv('POOL_MAX_CONTEXTS', '50'))
+    POOL_MAX_RSS_MB = int(os.getenv('POOL_MAX_RSS_MB', '1500'))
+
+    # React portals and the account used for each role
+    CLIENT_PORTAL_URL = os.getenv('CLIENT_PORTAL_URL', 'http://your-react-client-portal-url')
+    EMPLOYEE_PORTAL_URL = os.getenv('EMPLOYEE_PORTAL_URL', 'http://your-react-employee-portal-url')
+    VERIFIER_PORTAL_URL = os.getenv('VERIFIER_PORTAL_URL', 'http://your-react-verifier-portal-url')
+    PORTAL_USERNAME = os.getenv('PORTAL_USERNAME', 'valid_username')
+    PORTAL_PASSWORD = os.getenv('PORTAL_PASSWORD', 'valid_password')
+
+    # Saved storage state per role, reused until it is older than the TTL
+    AUTH_STATE_DIR = os.getenv('AUTH_STATE_DIR', '.auth')
+    AUTH_STATE_TTL = int(os.getenv('AUTH_STATE_TTL', '1800'))
+
+    # save_data() journal: records buffered per process before each append
+    RESULTS_BATCH_SIZE = int(os.getenv('RESULTS_BATCH_SIZE', '20'))
+
+    # Parsed CSV test data, reused until the source file changes
+    DATA_CACHE_DIR = os.getenv('DATA_CACHE_DIR', '.data_cache')
+
+    # Vault API: one pooled, authenticated session per run
+    API_BASE_URL = os.getenv('API_BASE_URL', 'http://your-vault-system-api-url')
+    API_POOL_SIZE = int(os.getenv('API_POOL_SIZE', '10'))
+    # Bearer token fetched once by common.browser_matrix; empty means log in via api_login
+    API_TOKEN = os.getenv('API_TOKEN', '')
+    # Request the WAPI endpoints concurrently at session start
+    API_FAN_OUT = os.getenv('API_FAN_OUT', 'false').lower() == 'true'
+
+    # Serve every portal and the API from the in-process stand-in (common.stand_in)
+    STAND_IN = os.getenv('STAND_IN', 'false').lower() == 'true'
+    STAND_IN_LATENCY_MS = int(os.getenv('STAND_IN_LATENCY_MS', '0'))
+    STAND_IN_ERROR_RATE = float(os.getenv('STAND_IN_ERROR_RATE', '0'))
+    # Set by common.browser_matrix: use its already running stand-in instead of starting one
+    STAND_IN_URL = os.getenv('STAND_IN_URL', '')
+
+    # Network shaping (common.network): Playwright resource types to abort, third-party
+    # hosts to stub, and HAR mode: live, record or replay
+    BLOCK_RESOURCES = [kind for kind in os.getenv('BLOCK_RESOURCES', 'image,font,media').split(',') if kind]
+    STUB_HOSTS = [host for host in os.getenv(
+        'STUB_HOSTS',
+        'google-analytics.com,googletagmanager.com,doubleclick.net,facebook.net,hotjar.com,'
+        'clarity.ms,hubspot.com,intercom.io,newrelic.com,nr-data.net',
+    ).split(',') if host]
+    NETWORK_MODE = os.getenv('NETWORK_MODE', 'live')
+    HAR_DIR = os.getenv('HAR_DIR', '.har')
+
+    # Screenshots (common.attachments): always, on-failure or sampled
+    SCREENSHOT_POLICY = os.getenv('SCREENSHOT_POLICY', 'on-failure')
+    SCREENSHOT_SAMPLE_RATE = float(os.getenv('SCREENSHOT_SAMPLE_RATE', '0.1'))
+    SCREENSHOT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'jpeg')  # png, jpeg or webp (webp needs Pillow)
+    SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '70'))
+    SCREENSHOT_SCALE = float(os.getenv('SCREENSHOT_SCALE', '1.0'))  # < 1 downscales (needs Pillow)
+    SCREENSHOT_WORKERS = int(os.getenv('SCREENSHOT_WORKERS', '2'))
+    SCREENSHOT_SPOOL_DIR = os.getenv('SCREENSHOT_SPOOL_DIR', '.screenshots')
+    # Take deferred screenshots when requested rather than once at failure
+    SCREENSHOT_KEEP_STEPS = os.getenv('SCREENSHOT_KEEP_STEPS', 'false').lower() == 'true'
+
+    # Visual regression (common.visual): off, report or fail; baselines are
+    # kept per engine and viewport, dynamic regions masked via VISUAL_MASKS_FILE
+    VISUAL_MODE = os.getenv('VISUAL_MODE', 'off')
+    VISUAL_UPDATE = os.getenv('VISUAL_UPDATE', 'false').lower() == 'true'
+    VISUAL_BASELINE_DIR = os.getenv('VISUAL_BASELINE_DIR', 'visual-baselines')
+    VISUAL_RUN_DIR = os.getenv('VISUAL_RUN_DIR', '.visual')
+    VISUAL_MASKS_FILE = os.getenv('VISUAL_MASKS_FILE', 'visual_masks.json')
+    VISUAL_TILE = int(os.getenv('VISUAL_TILE', '32'))
+    VISUAL_PIXEL_THRESHOLD = int(os.getenv('VISUAL_PIXEL_THRESHOLD', '16'))
+    VISUAL_MAX_DIFF_RATIO = float(os.getenv('VISUAL_MAX_DIFF_RATIO', '0.001'))
+    VISUAL_WORKERS = int(os.getenv('VISUAL_WORKERS', '0'))  # 0: one per core
+
+    # Failure-triggered tracing (common.tracing): on-failure or off; each
+    # context keeps a ring buffer bounded by age and size, written on failure
+    TRACE_MODE = os.getenv('TRACE_MODE', 'on-failure')
+    TRACE_DIR = os.getenv('TRACE_DIR', '.traces')
+    TRACE_BUFFER_SECONDS = float(os.getenv('TRACE_BUFFER_SECONDS', '60'))
+    TRACE_BUFFER_MB = float(os.getenv('TRACE_BUFFER_MB', '8'))
+    TRACE_DOM_SNAPSHOTS = os.getenv('TRACE_DOM_SNAPSHOTS', 'true').lower() == 'true'
+
+    # Per-step page metrics (common.perf); budgets either warn or fail the test
+    PERF_METRICS = os.getenv('PERF_METRICS', 'true').lower() == 'true'
+    PERF_BUDGETS_FILE = os.getenv('PERF_BUDGETS_FILE', 'perf_budgets.json')
+    PERF_BUDGET_MODE = os.getenv('PERF_BUDGET_MODE', 'warn')
+    PERF_SUMMARY_PATH = os.getenv('PERF_SUMMARY_PATH', 'perf-results/summary-{pid}.json')
+
+    # Swap costly XPath locators for equivalent cheaper engines at session start
+    # (common.locator_registry); opt-in, since the rewrites use Playwright's
+    # internal has-text engine
+    LOCATOR_REWRITE = os.getenv('LOCATOR_REWRITE', 'false').lower() == 'true'
+
+    # Health gate (common.health): session-start probe timeout in seconds, what
+    # to do with tests against an unreachable target (skip or fail), and the
+    # per-host circuit breaker (consecutive failures to open, seconds to retry)
+    HEALTH_CHECK = os.getenv('HEALTH_CHECK', 'true').lower() == 'true'
+    HEALTH_TIMEOUT = float(os.getenv('HEALTH_TIMEOUT', '3'))
+    HEALTH_ACTION = os.getenv('HEALTH_ACTION', 'skip')
+    BREAKER_THRESHOLD = int(os.getenv('BREAKER_THRESHOLD', '3'))
+    BREAKER_COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '30'))
+
+    # Adaptive wait_for_selector timeouts (common.timeouts), learned per
+    # environment from recorded waits: clamp(p99 * factor, floor, ceiling)
+    TEST_ENV = os.getenv('TEST_ENV', 'default')
+    ADAPTIVE_TIMEOUTS = os.getenv('ADAPTIVE_TIMEOUTS', 'true').lower() == 'true'
+    TIMEOUT_HISTORY_FILE = os.getenv('TIMEOUT_HISTORY_FILE', '.timeout_history.json')
+    TIMEOUT_OVERRIDES_FILE = os.getenv('TIMEOUT_OVERRIDES_FILE', 'timeout_overrides.json')
+    TIMEOUT_FACTOR = float(os.getenv('TIMEOUT_FACTOR', '3'))
+    TIMEOUT_FLOOR_MS = int(os.getenv('TIMEOUT_FLOOR_MS', '1000'))
+    TIMEOUT_CEILING_MS = int(os.getenv('TIMEOUT_CEILING_MS', '30000'))
+    TIMEOUT_MIN_SAMPLES = int(os.getenv('TIMEOUT_MIN_SAMPLES', '5'))
+
+    # Flow checkpoints (common.checkpoints): saved storage state + URL per step,
+    # resumed only by a test whose last attempt failed (see pytest-rerunfailures)
+    CHECKPOINTS = os.getenv('CHECKPOINTS', 'false').lower() == 'true'
+    CHECKPOINT_DIR = os.getenv('CHECKPOINT_DIR', '.checkpoints')
+    CHECKPOINT_TTL = int(os.getenv('CHECKPOINT_TTL', '1800'))
+
+    # Synthetic datasets (common.synthetic_data): SYNTH_ROWS > 0 replaces the
+    # registration/onboarding/login CSVs; SYNTH_SHARD=k/n collects one shard
+    SYNTH_ROWS = int(os.getenv('SYNTH_ROWS', '0'))
+    SYNTH_SEED = int(os.getenv('SYNTH_SEED', '0'))
+    SYNTH_SHARD = os.getenv('SYNTH_SHARD', '')
+    SYNTH_REGISTRATION_MIX = os.getenv('SYNTH_REGISTRATION_MIX',
+                                       'valid=0.7,duplicate=0.1,mismatch=0.1,malformed_email=0.1')
+    SYNTH_ONBOARDING_MIX = os.getenv('SYNTH_ONBOARDING_MIX', 'valid=0.9,missing_name=0.1')
+    SYNTH_LOGIN_MIX = os.getenv('SYNTH_LOGIN_MIX', 'valid=0.8,wrong_password=0.1,unknown_user=0.1')
+    SYNTH_EXISTING_USERS = [user for user in os.getenv('SYNTH_EXISTING_USERS', 'existing_user').split(',') if user]
+
+    # Change-impact selection (common.impact): with IMPACT_BASE set to a git
+    # ref, run only the tests whose locators, helpers or CSV rows changed since
+    IMPACT_BASE = os.getenv('IMPACT_BASE', '')
+    IMPACT_INDEX_FILE = os.getenv('IMPACT_INDEX_FILE', '.impact_index.json')
+
+    # Async mode (common.async_runner): the React smoke tests with an async
+    # twin run as concurrent pages on one event loop in shared browsers
+    ASYNC_MODE = os.getenv('ASYNC_MODE', 'false').lower() == 'true'
+    ASYNC_CONCURRENCY = int(os.getenv('ASYNC_CONCURRENCY', '8'))
+    ASYNC_BROWSERS = int(os.getenv('ASYNC_BROWSERS', '1'))
+
+    # Load mode (common.load): UI virtual users share this many browsers
+    LOAD_BROWSERS = int(os.getenv('LOAD_BROWSERS', '2'))
+
+    # Parallel runner (common.parallel_runner): test durations from earlier
+    # runs, used to balance the shards
+    DURATIONS_FILE = os.getenv('DURATIONS_FILE', '.test_durations.json')
+
+    # Browser matrix (common.browser_matrix): engines run as concurrent lanes
+    MATRIX_BROWSERS = [engine for engine in os.getenv('MATRIX_BROWSERS', 'chromium,firefox,webkit').split(',') if engine]
+    MATRIX_RESULTS_DIR = os.getenv('MATRIX_RESULTS_DIR', 'matrix-results')
+
+    # Order document downloads (common.downloads): digest cache of verified
+    # documents, and whether to keep a copy of each download in DOWNLOAD_DIR
+    DOWNLOAD_CACHE_FILE = os.getenv('DOWNLOAD_CACHE_FILE', '.download_cache.json')
+    DOWNLOAD_DIR = os.getenv('DOWNLOAD_DIR', '.downloads')
+    DOWNLOAD_KEEP = os.getenv('DOWNLOAD_KEEP', 'false').lower() == 'true'
+    DOWNLOAD_TIMEOUT_MS = int(os.getenv('DOWNLOAD_TIMEOUT_MS', '60000'))
+
+    # Public site with the portal login link (test_login starts here)
+    LANDING_URL = os.getenv('LANDING_URL', 'https://www.vaultverify.com/')
+
+    # Registration and onboarding pages
+    REGISTRATION_URL = os.getenv('REGISTRATION_URL', 'http://your-vault-system-registration-url')
+    ONBOARDING_URL = os.getenv('ONBOARDING_URL', 'http://your-vault-system-onboarding-url')
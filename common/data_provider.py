@@ -0,0 +1,157 @@
+# common/data_provider.py
+#
+# Cached, lazily materialised replacement for common.functions.read_test_data.
+# Each CSV is parsed once into a column store and pickled under
+# Config.DATA_CACHE_DIR, keyed by the file's mtime/size and content hash.
+# Parametrization receives lightweight Row views that only build values on
+# access, so collecting a large dataset does not create a dict per row.
+
+import csv
+import hashlib
+import os
+import pickle
+import sys
+from collections.abc import Mapping
+
+from common.config import Config
+
+_CACHE_VERSION = 1
+_datasets = {}
+
+
+class Row(Mapping):
+    """Read-only view of one row of a DataSet; behaves like the old dict rows."""
+
+    __slots__ = ("dataset", "index")
+
+    def __init__(self, dataset, index):
+        self.dataset = dataset
+        self.index = index
+
+    def __getitem__(self, column):
+        return self.dataset.columns[column][self.index]
+
+    def __iter__(self):
+        return iter(self.dataset.columns)
+
+    def __len__(self):
+        return len(self.dataset.columns)
+
+    def __repr__(self):
+        return f"Row({self.dataset.name}[{self.index}])"
+
+
+class DataSet:
+    def __init__(self, name, columns, length, stamp=None):
+        self.name = name
+        self.columns = columns  # column name -> tuple of values
+        self.length = length
+        self.stamp = stamp  # (mtime_ns, size) of the parsed file
+
+    def __len__(self):
+        return self.length
+
+    def row(self, index):
+        return Row(self, index)
+
+    def indices(self, **filters):
+        """Indices of rows whose columns equal the given values.
+
+        CSV values are strings, so other filter values are compared as
+        strings (``id=1`` matches ``"1"``). A filter value may also be a
+        callable taking the column value.
+        """
+        selected = range(self.length)
+        for column, expected in filters.items():
+            values = self.columns[column]
+            match = expected if callable(expected) else str(expected).__eq__
+            selected = [i for i in selected if match(values[i])]
+        return list(selected)
+
+    def rows(self, **filters):
+        return [Row(self, i) for i in self.indices(**filters)]
+
+
+def _parse(path):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        values = [[] for _ in header]
+        for record in reader:
+            if not any(record):
+                continue
+            for column, value in zip(values, record):
+                # Interning collapses repeated values such as expected_result
+                column.append(sys.intern(value))
+            for column in values[len(record):]:
+                column.append("")
+    length = len(values[0]) if values else 0
+    return {name: tuple(column) for name, column in zip(header, values)}, length
+
+
+def _digest(path):
+    sha = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _cache_path(path):
+    key = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:16]
+    return os.path.join(Config.DATA_CACHE_DIR, f"{os.path.basename(path)}-{key}.pickle")
+
+
+def _load_cached(path, stat):
+    try:
+        with open(_cache_path(path), "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None, None
+    if cached.get("version") != _CACHE_VERSION:
+        return None, None
+    if (cached["mtime_ns"], cached["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return cached, cached["sha"]
+    # Touched but possibly unchanged: fall back to comparing content hashes
+    sha = _digest(path)
+    return (cached if cached["sha"] == sha else None), sha
+
+
+def _store_cached(path, stat, sha, columns, length):
+    os.makedirs(Config.DATA_CACHE_DIR, exist_ok=True)
+    cache_path = _cache_path(path)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": _CACHE_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                     "sha": sha, "columns": columns, "length": length}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+
+
+def load_dataset(path):
+    """Return the DataSet for a CSV file, parsing it at most once per change."""
+    stat = os.stat(path)
+    dataset = _datasets.get(path)
+    if dataset is not None and dataset.stamp == (stat.st_mtime_ns, stat.st_size):
+        return dataset
+
+    cached, sha = _load_cached(path, stat)
+    if cached is not None:
+        columns, length = cached["columns"], cached["length"]
+        if (cached["mtime_ns"], cached["size"]) != (stat.st_mtime_ns, stat.st_size):
+            _store_cached(path, stat, sha, columns, length)
+    else:
+        columns, length = _parse(path)
+        _store_cached(path, stat, sha or _digest(path), columns, length)
+
+    dataset = DataSet(path, columns, length, stamp=(stat.st_mtime_ns, stat.st_size))
+    _datasets[path] = dataset
+    return dataset
+
+
+def read_test_data(path, **filters):
+    """Drop-in for common.functions.read_test_data returning lazy Row views.
+
+    Keyword arguments filter rows by column, e.g.
+    ``read_test_data("data/test_data.csv", expected_result="success")``.
+    """
+    return load_dataset(path).rows(**filters)
@@ -0,0 +1,238 @@
+# common/downloads.py
+#
+# Download verification for order documents. The browser writes a download
+# straight to disk; here it is read back in fixed-size chunks, so memory use
+# does not depend on the document size:
+#
+#   1. SHA-256 and MD5 are computed incrementally, along with the size and
+#      the download throughput (trigger to last byte on disk).
+#   2. If the SHA-256 is already in the digest cache (DOWNLOAD_CACHE_FILE),
+#      the document was verified before and its cached result is reused.
+#   3. Otherwise a streaming structural check runs: %PDF- header, startxref
+#      pointing at an xref table or stream, %%EOF trailer and the page count.
+#
+#   report = download_and_verify(page, lambda: page.click(DOWNLOAD_BUTTON))
+#   assert report["valid"], report["errors"]
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+import allure
+
+from common.config import Config
+from common.json_files import load_json, update_json
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+_CARRY = 64  # longer than any token matched below
+_PAGE = re.compile(rb"/Type\s{0,8}/Page(?![A-Za-z0-9])")
+_OBJECT_STREAM = re.compile(rb"/Type\s{0,8}/ObjStm")
+_HEADER = re.compile(rb"%PDF-(\d\.\d)")
+_STARTXREF = re.compile(rb"startxref\s+(\d+)\s+%%EOF\s*$")
+_XREF_TARGET = re.compile(rb"\s*(?:xref|\d+\s+\d+\s+obj)")
+
+
+class PdfScanner:
+    """Streaming structural check of a PDF: feed() chunks, then finish()."""
+
+    def __init__(self):
+        self.size = 0
+        self.head = b""
+        self.tail = b""
+        self.pages = 0
+        self.object_streams = False
+        self._carry = b""
+
+    def feed(self, chunk):
+        if len(self.head) < 1024:
+            self.head += chunk[:1024 - len(self.head)]
+        self.size += len(chunk)
+        data = self._carry + chunk
+        limit = max(0, len(data) - _CARRY)
+        self._scan(data, limit)
+        self._carry = data[limit:]
+        self.tail = (self.tail + chunk)[-2048:]
+
+    def _scan(self, data, limit):
+        # Matches starting before ``limit`` are complete; the rest are rescanned with the next chunk
+        for match in _PAGE.finditer(data):
+            if match.start() < limit:
+                self.pages += 1
+        if not self.object_streams and _OBJECT_STREAM.search(data):
+            self.object_streams = True
+
+    def finish(self):
+        """Result dict; ``xref_offset`` still has to be checked against the file (see check_xref)."""
+        self._scan(self._carry, len(self._carry))
+        self._carry = b""
+        errors = []
+        header = _HEADER.search(self.head)
+        if header is None:
+            errors.append("no %PDF- header in the first 1024 bytes")
+        trailer = _STARTXREF.search(self.tail)
+        xref_offset = int(trailer.group(1)) if trailer else None
+        if trailer is None:
+            errors.append("no startxref / %%EOF trailer at the end of the file")
+        elif xref_offset >= self.size:
+            errors.append(f"startxref {xref_offset} is past the end of the file ({self.size} bytes)")
+        pages = self.pages or None
+        if not self.pages and not self.object_streams:
+            errors.append("no page objects")
+        return {
+            "version": header.group(1).decode() if header else None,
+            "pages": pages,  # None when page objects are compressed into object streams
+            "xref_offset": xref_offset,
+            "errors": errors,
+        }
+
+
+def check_xref(f, offset):
+    """True if ``offset`` in the open file points at an xref table or an xref stream object."""
+    f.seek(offset)
+    return bool(_XREF_TARGET.match(f.read(32)))
+
+
+def digest_file(path, chunk_size=CHUNK_SIZE):
+    """``(size, sha256, md5)`` of a file, read in chunks."""
+    sha256, md5, size = hashlib.sha256(), hashlib.md5(), 0
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+            md5.update(chunk)
+            size += len(chunk)
+    return size, sha256.hexdigest(), md5.hexdigest()
+
+
+def check_pdf(path, chunk_size=CHUNK_SIZE):
+    scanner = PdfScanner()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            scanner.feed(chunk)
+        result = scanner.finish()
+        if result["xref_offset"] is not None and result["xref_offset"] < scanner.size:
+            if not check_xref(f, result["xref_offset"]):
+                result["errors"].append(f"startxref {result['xref_offset']} does not point at an xref section")
+    return result
+
+
+class DigestCache:
+    """SHA-256 -> verification result for documents already checked."""
+
+    def __init__(self, path=None):
+        self.path = path or Config.DOWNLOAD_CACHE_FILE
+        self.entries = load_json(self.path)
+        self._new = {}
+        self._lock = threading.Lock()
+
+    def get(self, sha256):
+        with self._lock:
+            return self._new.get(sha256) or self.entries.get(sha256)
+
+    def put(self, sha256, result):
+        with self._lock:
+            self._new[sha256] = result
+
+    def save(self):
+        """Merge new entries into the cache file, under its file lock."""
+        if not self._new:
+            return None
+        self.entries = update_json(self.path, lambda entries: {**entries, **self._new})
+        self._new = {}
+        return self.path
+
+
+def verify_file(path, cache=None, elapsed=None):
+    """Hash ``path`` and check its structure unless the digest cache already has it."""
+    cache = cache or get_cache()
+    start = time.perf_counter()
+    size, sha256, md5 = digest_file(path)
+    hashed = time.perf_counter() - start
+    cached = cache.get(sha256)
+    if cached is None:
+        pdf = check_pdf(path)
+        cache.put(sha256, {"bytes": size, "pdf": pdf, "verified": time.time()})
+    else:
+        pdf = cached["pdf"]
+    report = {
+        "bytes": size,
+        "sha256": sha256,
+        "md5": md5,
+        "pdf": pdf,
+        "cached": cached is not None,
+        "valid": not pdf["errors"],
+        "errors": pdf["errors"],
+        "hash_mb_per_s": round(size / hashed / 1e6, 1) if hashed else None,
+    }
+    if elapsed:
+        report["download_seconds"] = round(elapsed, 3)
+        report["download_mb_per_s"] = round(size / elapsed / 1e6, 2)
+    return report
+
+
+def download_and_verify(page, trigger, timeout=None, keep=None):
+    """Run ``trigger`` (e.g. a click), wait for the download it starts and verify it.
+
+    The file stays in Playwright's download directory (deleted with the
+    context) unless ``keep``/DOWNLOAD_KEEP is set, in which case it is copied
+    to DOWNLOAD_DIR under its SHA-256.
+    """
+    keep = Config.DOWNLOAD_KEEP if keep is None else keep
+    start = time.perf_counter()
+    with page.expect_download(timeout=timeout or Config.DOWNLOAD_TIMEOUT_MS) as download_info:
+        trigger()
+    download = download_info.value
+    path = download.path()  # blocks until the browser has written the last byte
+    elapsed = time.perf_counter() - start
+    failure = download.failure()
+    if failure:
+        raise AssertionError(f"Download of {download.url} failed: {failure}")
+
+    report = {"filename": download.suggested_filename, "url": download.url,
+              **verify_file(path, elapsed=elapsed)}
+    if keep:
+        os.makedirs(Config.DOWNLOAD_DIR, exist_ok=True)
+        extension = os.path.splitext(download.suggested_filename)[1]
+        report["saved_as"] = os.path.join(Config.DOWNLOAD_DIR, report["sha256"] + extension)
+        shutil.copyfile(path, report["saved_as"])
+    allure.attach(json.dumps(report, indent=2), name=f"Download {download.suggested_filename}",
+                  attachment_type=allure.attachment_type.JSON)
+    if report["cached"]:
+        logger.info("%s unchanged (sha256 %s), reused cached verification", report["filename"], report["sha256"][:12])
+    return report
+
+
+async def download_and_verify_async(page, trigger, timeout=None):
+    """download_and_verify for an async API page (common.async_runner).
+
+    Verification runs in a worker thread so the event loop keeps driving the
+    other pages; the report is returned for the caller to attach.
+    """
+    start = time.perf_counter()
+    async with page.expect_download(timeout=timeout or Config.DOWNLOAD_TIMEOUT_MS) as download_info:
+        await trigger()
+    download = await download_info.value
+    path = await download.path()
+    elapsed = time.perf_counter() - start
+    failure = await download.failure()
+    if failure:
+        raise AssertionError(f"Download of {download.url} failed: {failure}")
+    report = await asyncio.to_thread(verify_file, path, None, elapsed)
+    return {"filename": download.suggested_filename, "url": download.url, **report}
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = DigestCache()
+    return _cache
@@ -0,0 +1,37 @@
+# common/durations.py
+#
+# pytest plugin used by common.parallel_runner. Loaded with
+# ``-p common.durations``; it restricts a run to the node ids listed in
+# $SHARD_FILE (in that order) and writes the measured duration of every test
+# to $DURATIONS_OUT when the session ends.
+
+import json
+import os
+
+_durations = {}
+
+
+def pytest_collection_modifyitems(config, items):
+    shard_file = os.getenv("SHARD_FILE")
+    if not shard_file:
+        return
+    with open(shard_file) as f:
+        order = {nodeid: i for i, nodeid in enumerate(json.load(f))}
+    selected = [item for item in items if item.nodeid in order]
+    deselected = [item for item in items if item.nodeid not in order]
+    selected.sort(key=lambda item: order[item.nodeid])
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = selected
+
+
+def pytest_runtest_logreport(report):
+    # setup + call + teardown, so fixture cost counts towards the shard
+    _durations[report.nodeid] = _durations.get(report.nodeid, 0.0) + report.duration
+
+
+def pytest_sessionfinish(session):
+    out = os.getenv("DURATIONS_OUT")
+    if out:
+        with open(out, "w") as f:
+            json.dump(_durations, f)
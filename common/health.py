@@ -0,0 +1,188 @@
+# common/health.py
+#
+# Fast-fail for broken environments. At session start every base URL the
+# selected tests need (from their ``target`` marker) is probed once, in
+# parallel, with a short timeout; tests against a target that did not answer
+# are skipped (or failed, HEALTH_ACTION=fail) before they open a browser.
+#
+# Mid-run, a circuit breaker per host watches main-frame navigations on every
+# pooled context. After BREAKER_THRESHOLD consecutive failures the breaker
+# opens and further tests for that host are skipped immediately. Once
+# BREAKER_COOLDOWN seconds pass it goes half-open: the next test for the host
+# triggers one probe, which closes the breaker on success or re-opens it.
+#
+#   @pytest.mark.target("client")   # or a module-level pytestmark
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from common.config import Config
+
+logger = logging.getLogger(__name__)
+
+TARGETS = {
+    "landing": lambda: Config.LANDING_URL,
+    "client": lambda: Config.CLIENT_PORTAL_URL,
+    "employee": lambda: Config.EMPLOYEE_PORTAL_URL,
+    "verifier": lambda: Config.VERIFIER_PORTAL_URL,
+    "registration": lambda: Config.REGISTRATION_URL,
+    "onboarding": lambda: Config.ONBOARDING_URL,
+    "api": lambda: Config.API_BASE_URL,
+}
+
+# Navigation "failures" that say nothing about the host's health
+_IGNORED_FAILURES = ("net::ERR_ABORTED", "NS_BINDING_ABORTED", "cancelled")
+
+
+def target_url(target):
+    """URL for a target name from TARGETS, or ``target`` itself if it is a URL."""
+    if target in TARGETS:
+        return TARGETS[target]()
+    return target
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+def probe(url, timeout):
+    """``(healthy, detail)`` for one URL: any non-5xx answer within ``timeout`` is healthy."""
+    try:
+        with requests.get(url, timeout=timeout, allow_redirects=False, stream=True) as response:
+            return response.status_code < 500, f"HTTP {response.status_code}"
+    except requests.RequestException as error:
+        return False, f"{type(error).__name__}: {error}"
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, threshold, cooldown, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.reason = None
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.state, self.failures, self.opened_at, self.reason = self.CLOSED, 0, None, None
+
+    def record_failure(self, reason):
+        with self._lock:
+            self.failures += 1
+            self.reason = reason
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self._open()
+
+    def trip(self, reason):
+        """Open immediately, e.g. when the session-start probe fails."""
+        with self._lock:
+            self.reason = reason
+            self._open()
+
+    def _open(self):
+        if self.state != self.OPEN:
+            logger.warning("Circuit opened: %s", self.reason)
+        self.state = self.OPEN
+        self.opened_at = self.clock()
+
+    def poll(self):
+        """Current state, moving from open to half-open once the cooldown has passed."""
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+            return self.state
+
+
+class HealthGate:
+    """Session-start probes plus one CircuitBreaker per host.
+
+    ``redirects`` maps hostnames to the URL that actually serves them (the
+    stand-in server, when its routing is active) so probes hit the same
+    endpoint the browser would.
+    """
+
+    def __init__(self, timeout=None, threshold=None, cooldown=None, redirects=None, probe=probe):
+        self.timeout = Config.HEALTH_TIMEOUT if timeout is None else timeout
+        self.threshold = threshold or Config.BREAKER_THRESHOLD
+        self.cooldown = Config.BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.redirects = redirects or {}
+        self.probe = probe
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, url):
+        host = host_of(url)
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.threshold, self.cooldown)
+            return self.breakers[host]
+
+    def _probe(self, url):
+        hostname = urlsplit(url).hostname
+        return self.probe(self.redirects.get(hostname, url), self.timeout)
+
+    def check_targets(self, urls):
+        """Probe every distinct host once, in parallel; returns ``{url: (healthy, detail)}``."""
+        by_host = {}
+        for url in urls:
+            by_host.setdefault(host_of(url), url)
+        if not by_host:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(8, len(by_host))) as executor:
+            results = dict(zip(by_host.values(), executor.map(self._probe, by_host.values())))
+        for url, (healthy, detail) in results.items():
+            if healthy:
+                self.breaker(url).record_success()
+            else:
+                self.breaker(url).trip(f"{url} unreachable at session start ({detail})")
+        return results
+
+    def check(self, url):
+        """None if tests may run against ``url``, otherwise the reason they should not."""
+        breaker = self.breaker(url)
+        state = breaker.poll()
+        if state == CircuitBreaker.CLOSED:
+            return None
+        if state == CircuitBreaker.HALF_OPEN:
+            healthy, detail = self._probe(url)
+            if healthy:
+                logger.info("Circuit for %s closed again (%s)", host_of(url), detail)
+                breaker.record_success()
+                return None
+            breaker.record_failure(f"{url} still unreachable ({detail})")
+        return breaker.reason
+
+    def install(self, context):
+        """Context hook: feed main-frame navigation outcomes into the breakers."""
+        context.on("requestfailed", self._on_request_failed)
+        context.on("response", self._on_response)
+
+    @staticmethod
+    def _is_navigation(request):
+        try:
+            return request.is_navigation_request() and request.frame.parent_frame is None
+        except Exception:  # frame already detached
+            return False
+
+    def _on_request_failed(self, request):
+        failure = request.failure or ""
+        if self._is_navigation(request) and not any(ignored in failure for ignored in _IGNORED_FAILURES):
+            self.breaker(request.url).record_failure(f"navigation to {request.url} failed: {failure}")
+
+    def _on_response(self, response):
+        if not self._is_navigation(response.request):
+            return
+        if response.status >= 500:
+            self.breaker(response.url).record_failure(f"navigation to {response.url} returned {response.status}")
+        else:
+            self.breaker(response.url).record_success()
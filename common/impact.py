@@ -0,0 +1,391 @@
+# common/impact.py
+#
+# Change-impact test selection. At collection time every test item is mapped
+# to what it touches, by static analysis of its test module:
+#
+#   react_client_page.py::ReactClientPageLocators.DASHBOARD   locator attribute
+#   react_verifier_page.py::ReactVerifierPageLocators.*       whole class (passed as a value)
+#   common/functions.py::login                                helper from common.functions
+#   data/test_data.csv#3                                      parametrized CSV row
+#   test_login.py::test_login_page_header                     the test's own code
+#
+# With IMPACT_BASE set (a git ref, e.g. origin/main) only the items whose
+# dependencies changed between that ref and the working tree are run, tests
+# that failed last time first. Changes to anything the index cannot attribute
+# (conftest.py, other common/ modules, pytest.ini, ...) run everything.
+#
+# A CSV row is only tracked on its own when the parametrization is the whole
+# file in order: rows picked by keyword filters (read_test_data(path,
+# expected_result=...)) or generated instead (SYNTH_ROWS) depend on the file.
+#
+# The analysis per test module is cached in IMPACT_INDEX_FILE keyed by the
+# module's content hash, so only edited modules are re-parsed. The index is
+# only built when it is used: with IMPACT_BASE, or with --impact-index.
+#
+#   IMPACT_BASE=origin/main pytest
+#   pytest --collect-only -q --impact-index        # refresh the saved index
+#   python -m common.impact --base origin/main   # affected tests from the saved index
+
+import argparse
+import ast
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+
+from common.config import Config
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+HELPER_MODULES = ("common.functions",)
+MODULE_LEVEL = "<module>"
+# Files that never change test behaviour
+IGNORED_SUFFIXES = (".md", ".pdf", ".png", ".jpg", ".gitignore")
+
+
+# --- analysis of test modules -------------------------------------------------
+
+def _module_path(module, root):
+    """Repo-relative file for an imported module; ``locators.x`` falls back to ``x.py`` at the root."""
+    parts = module.split(".")
+    candidates = ["/".join(parts) + ".py"]
+    if parts[0] == "locators":
+        candidates.append("/".join(parts[1:]) + ".py")
+    for candidate in candidates:
+        if os.path.exists(os.path.join(root, candidate)):
+            return candidate
+    return candidates[0]
+
+
+def _csv_paths(node):
+    return sorted({child.value for child in ast.walk(node)
+                   if isinstance(child, ast.Constant) and isinstance(child.value, str) and child.value.endswith(".csv")})
+
+
+def analyze_module(source, path, root="."):
+    """``{function: {"deps": [...], "csv_params": {argname: csv}}}`` for every test function in a module."""
+    tree = ast.parse(source)
+    imported = {}  # local name -> (file, symbol, "class" or "helper")
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            if node.module.startswith("locators."):
+                for alias in node.names:
+                    imported[alias.asname or alias.name] = (_module_path(node.module, root), alias.name, "class")
+            elif node.module in HELPER_MODULES:
+                for alias in node.names:
+                    imported[alias.asname or alias.name] = (_module_path(node.module, root), alias.name, "helper")
+
+    functions, assignments = {}, {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            functions[node.name] = node
+        elif isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    functions.setdefault(child.name, child)
+        elif isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    assignments[target.id] = node.value
+
+    result = {}
+    for name, function in functions.items():
+        if not name.startswith("test"):
+            continue
+        deps = {f"{path}::{name}"}
+        seen, pending = set(), [function]
+        while pending:
+            node = pending.pop()
+            if node.name in seen:
+                continue
+            seen.add(node.name)
+            deps.add(f"{path}::{node.name}")
+            for child in ast.walk(node):
+                if isinstance(child, ast.Attribute) and isinstance(child.value, ast.Name) \
+                        and imported.get(child.value.id, (None, None, None))[2] == "class":
+                    file, cls, _ = imported[child.value.id]
+                    deps.add(f"{file}::{cls}.{child.attr}")
+                elif isinstance(child, ast.Name) and child.id in imported:
+                    file, symbol, kind = imported[child.id]
+                    if kind == "helper":
+                        deps.add(f"{file}::{symbol}")
+                elif isinstance(child, ast.Call) and isinstance(child.func, ast.Name) \
+                        and child.func.id in functions and child.func.id != node.name:
+                    pending.append(functions[child.func.id])
+                if isinstance(child, ast.Name) and child.id in assignments:
+                    deps.update(_csv_paths(assignments[child.id]))
+            # A locator class used as a value (not attribute access) depends on all of it
+            attribute_bases = {id(child.value) for child in ast.walk(node) if isinstance(child, ast.Attribute)}
+            for child in ast.walk(node):
+                if isinstance(child, ast.Name) and id(child) not in attribute_bases \
+                        and imported.get(child.id, (None, None, None))[2] == "class":
+                    file, cls, _ = imported[child.id]
+                    deps.add(f"{file}::{cls}.*")
+            deps.update(_csv_paths(node))
+        result[name] = {"deps": sorted(deps), "csv_params": _csv_params(function, assignments)}
+    return result
+
+
+def _csv_params(function, assignments):
+    """``{argname: csv}`` for ``@pytest.mark.parametrize("data", <rows of a CSV>)``."""
+    params = {}
+    for decorator in function.decorator_list:
+        if not (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)
+                and decorator.func.attr == "parametrize" and len(decorator.args) >= 2):
+            continue
+        argnames, values = decorator.args[:2]
+        if not (isinstance(argnames, ast.Constant) and isinstance(argnames.value, str)):
+            continue
+        if isinstance(values, ast.Name) and values.id in assignments:
+            values = assignments[values.id]
+        paths = _csv_paths(values)
+        if len(paths) == 1 and not _filtered(values):
+            params[argnames.value.split(",")[0].strip()] = paths[0]
+    return params
+
+
+def _filtered(node):
+    """True if ``node`` calls something with keyword arguments, e.g. read_test_data(path, role="admin")."""
+    return any(isinstance(child, ast.Call) and child.keywords for child in ast.walk(node))
+
+
+# --- the index ------------------------------------------------------------------
+
+class ImpactIndex:
+    """Cached per-module analysis plus the deps of every item seen at collection."""
+
+    def __init__(self, path=None, root="."):
+        self.path = path or Config.IMPACT_INDEX_FILE
+        self.root = root
+        data = _load_json(self.path)
+        if data.get("version") != INDEX_VERSION:
+            data = {}
+        self.modules = data.get("modules", {})
+        self.items = data.get("items", {})
+        self.dirty = False
+        self._checked = set()  # modules whose hash was checked this session
+
+    def module(self, path):
+        if path not in self._checked:
+            with open(os.path.join(self.root, path), "rb") as f:
+                source = f.read()
+            digest = hashlib.sha1(source).hexdigest()
+            entry = self.modules.get(path)
+            if entry is None or entry["sha1"] != digest:
+                self.modules[path] = {"sha1": digest, "functions": analyze_module(source, path, self.root)}
+                self.dirty = True
+            self._checked.add(path)
+        return self.modules[path]["functions"]
+
+    def item_deps(self, item):
+        """Dependencies of a collected pytest item (cached in ``items`` by node id)."""
+        path = os.path.relpath(str(item.fspath), self.root).replace(os.sep, "/")
+        function = self.module(path).get(getattr(item, "originalname", None) or item.name.split("[")[0])
+        deps = list(function["deps"]) if function else [path]
+        callspec = getattr(item, "callspec", None)
+        if function and callspec is not None and not Config.SYNTH_ROWS:
+            # A parametrized CSV row only depends on that row, not the whole file
+            for argname, csv_path in function["csv_params"].items():
+                if argname in callspec.indices:
+                    deps = [dep for dep in deps if dep != csv_path] + [f"{csv_path}#{callspec.indices[argname]}"]
+        if self.items.get(item.nodeid) != deps:
+            self.items[item.nodeid] = deps
+            self.dirty = True
+        return deps
+
+    def save(self):
+        if not self.dirty:
+            return None
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": INDEX_VERSION, "modules": self.modules, "items": self.items}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+        return self.path
+
+
+# --- what changed -----------------------------------------------------------------
+
+def _git(root, *args):
+    return subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True).stdout
+
+
+def changed_files(base, root="."):
+    files = set(_git(root, "diff", "--name-only", base, "--").split())
+    files.update(_git(root, "ls-files", "--others", "--exclude-standard").split())
+    return sorted(files)
+
+
+def _base_source(base, path, root):
+    try:
+        return _git(root, "show", f"{base}:{path}")
+    except subprocess.CalledProcessError:
+        return None  # added since base
+
+
+def _read(path, root):
+    try:
+        with open(os.path.join(root, path), encoding="utf-8", newline="") as f:
+            return f.read()
+    except OSError:
+        return None  # deleted
+
+
+def python_definitions(source):
+    """``{"Class.ATTR": src, "function": src, "<module>": rest}`` for comparing two versions."""
+    tree = ast.parse(source)
+    definitions, rest = {}, []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                names = _assigned_names(child) or [getattr(child, "name", None)]
+                for name in filter(None, names):
+                    definitions[f"{node.name}.{name}"] = ast.dump(child)
+            definitions[f"{node.name}.{MODULE_LEVEL}"] = ast.dump(ast.ClassDef(
+                node.name, node.bases, node.keywords, [], node.decorator_list))
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            definitions[node.name] = ast.dump(node)
+        else:
+            rest.append(ast.dump(node))
+    definitions[MODULE_LEVEL] = "\n".join(rest)
+    return definitions
+
+
+def _assigned_names(node):
+    if isinstance(node, ast.Assign):
+        return [target.id for target in node.targets if isinstance(target, ast.Name)]
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return [node.target.id]
+    return []
+
+
+def changed_symbols(old, new):
+    """Symbols that differ between two versions of a Python file, or None if either does not parse."""
+    try:
+        old_defs, new_defs = python_definitions(old), python_definitions(new)
+    except SyntaxError:
+        return None
+    return {name for name in old_defs.keys() | new_defs.keys() if old_defs.get(name) != new_defs.get(name)}
+
+
+def changed_rows(old, new):
+    """Indices of changed CSV data rows, or None if the header changed."""
+    old_rows, new_rows = list(csv.reader(io.StringIO(old))), list(csv.reader(io.StringIO(new)))
+    if old_rows[:1] != new_rows[:1]:
+        return None
+    old_rows, new_rows = old_rows[1:], new_rows[1:]
+    return {str(i) for i in range(max(len(old_rows), len(new_rows)))
+            if i >= len(old_rows) or i >= len(new_rows) or old_rows[i] != new_rows[i]}
+
+
+def changes(base, root=".", known=(), ignore=()):
+    """``({path: symbols or None}, global_change)`` for the diff between ``base`` and the working tree.
+
+    ``known`` are the files referenced by the index; a change to any other
+    file that could affect tests is a global change.
+    """
+    result, global_change = {}, []
+    for path in changed_files(base, root):
+        if path.endswith(IGNORED_SUFFIXES) or path in ignore:
+            continue
+        if path not in known:
+            global_change.append(path)
+            continue
+        old, new = _base_source(base, path, root), _read(path, root)
+        if old is None or new is None:
+            result[path] = None
+        elif path.endswith(".py"):
+            result[path] = changed_symbols(old, new)
+        elif path.endswith(".csv"):
+            result[path] = changed_rows(old, new)
+        else:
+            result[path] = None
+    return result, global_change
+
+
+def affected(deps, changed):
+    """True if any dependency is hit by ``changed`` (see changes())."""
+    for dep in deps:
+        if "#" in dep:
+            path, row = dep.split("#", 1)
+            if path in changed and (changed[path] is None or row in changed[path]):
+                return True
+            continue
+        path, _, symbol = dep.partition("::")
+        if path not in changed:
+            continue
+        symbols = changed[path]
+        if symbols is None or not symbol or MODULE_LEVEL in symbols or symbol in symbols:
+            return True
+        if symbol.endswith(".*") and any(name.startswith(symbol[:-1]) for name in symbols):
+            return True
+        if "." in symbol and f"{symbol.split('.')[0]}.{MODULE_LEVEL}" in symbols:
+            return True
+    return False
+
+
+def known_files(deps_lists):
+    files = set()
+    for deps in deps_lists:
+        for dep in deps:
+            files.add(dep.partition("::")[0].partition("#")[0])
+    return files
+
+
+def select(items, index, base, last_failed=(), root="."):
+    """``(selected, deselected, reason)``; items keep their order apart from failed-first."""
+    deps = {item.nodeid: index.item_deps(item) for item in items}
+    try:
+        ignore = {os.path.relpath(os.path.abspath(index.path), os.path.abspath(root)).replace(os.sep, "/")}
+        changed, global_change = changes(base, root, known_files(deps.values()), ignore)
+    except (OSError, subprocess.CalledProcessError) as error:
+        logger.warning("Impact selection disabled: git diff against %r failed (%s)", base, error)
+        return list(items), [], f"git diff against {base!r} failed; running everything"
+    if global_change:
+        selected, deselected = list(items), []
+        reason = f"{', '.join(global_change[:3])} changed; running everything"
+    else:
+        selected = [item for item in items if affected(deps[item.nodeid], changed)]
+        deselected = [item for item in items if not affected(deps[item.nodeid], changed)]
+        reason = f"{len(selected)} of {len(items)} tests affected by {len(changed)} changed files since {base}"
+    selected.sort(key=lambda item: item.nodeid not in last_failed)
+    return selected, deselected, reason
+
+
+def _load_json(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List tests affected by changes since a git ref")
+    parser.add_argument("--base", default=Config.IMPACT_BASE or "HEAD")
+    parser.add_argument("--index", default=Config.IMPACT_INDEX_FILE)
+    args = parser.parse_args(argv)
+
+    index = ImpactIndex(args.index)
+    if not index.items:
+        print(f"No index at {args.index}; run pytest --collect-only --impact-index once to build it")
+        return 1
+    changed, global_change = changes(args.base, ".", known_files(index.items.values()), {args.index})
+    if global_change:
+        print(f"Global change ({', '.join(global_change)}): every test is affected")
+        return 0
+    for path, symbols in sorted(changed.items()):
+        print(f"changed {path}: {'everything' if symbols is None else ', '.join(sorted(symbols))}")
+    for nodeid, deps in sorted(index.items.items()):
+        if affected(deps, changed):
+            print(nodeid)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
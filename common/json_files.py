@@ -0,0 +1,64 @@
+# common/json_files.py
+#
+# JSON state files shared by every process of a run (xdist workers,
+# parallel_runner shards, browser matrix lanes): the timeout history, the
+# download digest cache, the HAR replay index. update_json() holds an
+# exclusive lock on <path>.lock for the whole read -> merge -> replace, so
+# two processes saving at the same time both keep their entries. Readers
+# need no lock; the file is only ever swapped in whole by os.replace.
+
+import contextlib
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def load_json(path, default=dict):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default()
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive, cross-process lock on ``<path>.lock``."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def update_json(path, merge, default=dict, **dump_args):
+    """Replace ``path`` with ``merge(current contents)`` under the file lock; returns the new contents."""
+    with file_lock(path):
+        data = merge(load_json(path, default))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, **dump_args)
+        os.replace(tmp_path, path)
+    return data
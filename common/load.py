@@ -0,0 +1,371 @@
+# common/load.py
+#
+# Load mode: runs the existing business flows as concurrent virtual users.
+# API users are asyncio tasks whose blocking calls go to a thread pool. UI
+# users run the same sync helpers as the suites (login, register,
+# complete_onboarding), one thread per user, but they share LOAD_BROWSERS
+# browsers: those are launched once with a DevTools port, every user thread
+# connects its own Playwright client to one of them over CDP, and each
+# iteration is a fresh context. A run therefore launches a couple of browsers
+# however many users it has. Users start on a linear ramp-up and loop until
+# the run duration ends. The report gives throughput, error rate and
+# p50/p95/p99 latency per flow and per step, and counts failures per step by
+# exception type and message.
+#
+#   python -m common.load --users 20 --ramp-up 10 --duration 60 --stand-in
+#   python -m common.load --flows api_login,new_order_free_voi --users 8 --browsers 4
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright.sync_api import sync_playwright
+
+from common.config import Config
+from common.stand_in import StandInServer, route_to_stand_in
+
+MAX_ERROR_TEXT = 200
+NO_STEP = "(outside steps)"
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (~2% relative error, bounded memory)."""
+
+    GROWTH = 1.02
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        bucket = math.ceil(math.log(max(ms, 0.01) / 0.01, self.GROWTH))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, p):
+        if not self.count:
+            return None
+        target = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(0.01 * self.GROWTH ** bucket, self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "mean_ms": self.total / self.count if self.count else None,
+                "p50_ms": self.percentile(50), "p95_ms": self.percentile(95), "p99_ms": self.percentile(99),
+                "max_ms": self.max}
+
+
+class LoadStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # flow -> {"ok": n, "errors": n, "latency": hist, "steps": {step: hist},
+        #          "failures": {step: {"Type: message": n}}}
+        self.flows = {}
+
+    def _flow(self, flow):
+        return self.flows.setdefault(flow, {"ok": 0, "errors": 0, "latency": LatencyHistogram(), "steps": {},
+                                            "failures": {}})
+
+    def record_step(self, flow, step, ms):
+        with self._lock:
+            self._flow(flow)["steps"].setdefault(step, LatencyHistogram()).record(ms)
+
+    def record_iteration(self, flow, ms, error=None, step=None):
+        """Count one iteration; a failed one is filed under the step it failed in."""
+        with self._lock:
+            stats = self._flow(flow)
+            stats["ok" if error is None else "errors"] += 1
+            stats["latency"].record(ms)
+            if error is not None:
+                message = f"{type(error).__name__}: {error}".splitlines()[0][:MAX_ERROR_TEXT]
+                failures = stats["failures"].setdefault(step or NO_STEP, {})
+                failures[message] = failures.get(message, 0) + 1
+
+    def report(self, elapsed):
+        report = {}
+        for flow, stats in sorted(self.flows.items()):
+            iterations = stats["ok"] + stats["errors"]
+            report[flow] = {
+                "iterations": iterations,
+                "throughput_per_s": iterations / elapsed if elapsed else 0,
+                "error_rate": stats["errors"] / iterations if iterations else 0,
+                "latency": stats["latency"].summary(),
+                "steps": {step: hist.summary() for step, hist in stats["steps"].items()},
+                "failures": {step: dict(sorted(messages.items(), key=lambda item: -item[1]))
+                             for step, messages in stats["failures"].items()},
+            }
+        return report
+
+
+class VirtualUser:
+    """Per-user context handed to a flow; ``step`` times one named step and
+    remembers it as ``failed_step`` if the step raises."""
+
+    def __init__(self, stats, flow, index):
+        self.stats = stats
+        self.flow = flow
+        self.index = index
+        self.failed_step = None
+
+    @contextlib.contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.failed_step = self.failed_step or name
+            raise
+        finally:
+            self.stats.record_step(self.flow, name, (time.perf_counter() - start) * 1000)
+
+
+# --- flows -----------------------------------------------------------------
+# API flows take (vu,), UI flows take (vu, page). The portal helpers and
+# locators are imported on first use, like common.auth_state does.
+
+def flow_api_login(vu):
+    from common.functions import api_login
+
+    with vu.step("api_login"):
+        response = api_login(Config.API_BASE_URL, Config.PORTAL_USERNAME, Config.PORTAL_PASSWORD)
+    assert response.status_code == 200, f"api_login returned {response.status_code}"
+
+
+def flow_login(vu, page):
+    from common.functions import login
+    from locators.react_employee_page import ReactEmployeePageLocators
+
+    with vu.step("open portal"):
+        page.goto(Config.EMPLOYEE_PORTAL_URL)
+    with vu.step("login"):
+        login(page, Config.PORTAL_USERNAME, Config.PORTAL_PASSWORD)
+        page.wait_for_selector(ReactEmployeePageLocators.DASHBOARD)
+
+
+def flow_register(vu, page):
+    from common.functions import register
+    from locators.registration_page import RegistrationPageLocators
+
+    username = f"load_user_{vu.index}_{time.monotonic_ns()}"
+    with vu.step("open registration"):
+        page.goto(Config.REGISTRATION_URL)
+    with vu.step("register"):
+        register(page, username, "LoadPass123", "LoadPass123", f"{username}@example.com")
+        page.wait_for_selector(RegistrationPageLocators.SUCCESS_MESSAGE)
+
+
+def flow_complete_onboarding(vu, page):
+    from common.functions import complete_onboarding
+    from locators.onboarding_page import OnboardingPageLocators
+
+    with vu.step("open onboarding"):
+        page.goto(Config.ONBOARDING_URL)
+    with vu.step("complete_onboarding"):
+        complete_onboarding(page, "Load", f"User{vu.index}")
+        page.wait_for_selector(OnboardingPageLocators.SUCCESS_MESSAGE)
+
+
+def _new_order(vu, page, order_type):
+    from locators.react_employee_page import ReactEmployeePageLocators
+
+    flow_login(vu, page)
+    with vu.step("new order"):
+        page.wait_for_selector(ReactEmployeePageLocators.NEW_ORDER_BUTTON).click()
+        page.select_option("select[name='order_type']", order_type)
+        page.click("button[type='submit']")
+        page.wait_for_selector("#order-success-message")
+
+
+def flow_new_order_free_voi(vu, page):
+    _new_order(vu, page, "FREE_VOI")
+
+
+def flow_new_order_paid_voi(vu, page):
+    _new_order(vu, page, "PAID_VOI")
+
+
+API_FLOWS = {"api_login": flow_api_login}
+UI_FLOWS = {
+    "login": flow_login,
+    "register": flow_register,
+    "complete_onboarding": flow_complete_onboarding,
+    "new_order_free_voi": flow_new_order_free_voi,
+    "new_order_paid_voi": flow_new_order_paid_voi,
+}
+
+
+# --- runners -----------------------------------------------------------------
+
+def _record(stats, vu, start, error):
+    stats.record_iteration(vu.flow, (time.perf_counter() - start) * 1000, error, vu.failed_step)
+    vu.failed_step = None
+
+
+async def _user(stats, vu, start_at, deadline, run_once):
+    """Wait for ``start_at``, then await ``run_once(vu)`` in a loop until ``deadline``."""
+    await asyncio.sleep(max(0.0, start_at - time.monotonic()))
+    while time.monotonic() < deadline:
+        start, error = time.perf_counter(), None
+        try:
+            await run_once(vu)
+        except Exception as exc:
+            error = exc
+        _record(stats, vu, start, error)
+
+
+async def _run_api_users(stats, users, deadline):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=max(1, len(users))))
+
+    async def run_once(vu):
+        await loop.run_in_executor(None, API_FLOWS[vu.flow], vu)
+
+    await asyncio.gather(*(_user(stats, VirtualUser(stats, flow, index), start_at, deadline, run_once)
+                           for flow, index, start_at in users))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _launch_shared(playwright, count):
+    """Launch ``count`` headless browsers other threads can connect to; returns their CDP endpoints."""
+    endpoints = []
+    for _ in range(count):
+        port = _free_port()
+        playwright.chromium.launch(headless=True, args=[f"--remote-debugging-port={port}"])
+        endpoints.append(f"http://127.0.0.1:{port}")
+    return endpoints
+
+
+def _ui_user(stats, vu, start_at, deadline, endpoint, stand_in):
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    # Playwright objects belong to the thread that created them, so each user
+    # connects its own client to the shared browser rather than launching one
+    with sync_playwright() as p:
+        browser = p.chromium.connect_over_cdp(endpoint)
+        try:
+            while time.monotonic() < deadline:
+                start, error = time.perf_counter(), None
+                try:
+                    context = browser.new_context()
+                    try:
+                        if stand_in is not None:
+                            route_to_stand_in(context, stand_in)
+                        UI_FLOWS[vu.flow](vu, context.new_page())
+                    finally:
+                        context.close()
+                except Exception as exc:
+                    error = exc
+                _record(stats, vu, start, error)
+        finally:
+            browser.close()  # disconnects; the shared browser keeps running
+
+
+def schedule(flows, users, ramp_up, now):
+    """Assign users round-robin to flows with evenly spaced start times."""
+    return [(flows[i % len(flows)], i, now + (ramp_up * i / users if users else 0)) for i in range(users)]
+
+
+def run(flows, users, ramp_up, duration, stand_in=None, browsers=None):
+    stats = LoadStats()
+    start = time.monotonic()
+    deadline = start + ramp_up + duration
+    plan = schedule(flows, users, ramp_up, start)
+    api_users = [user for user in plan if user[0] in API_FLOWS]
+    ui_users = [user for user in plan if user[0] in UI_FLOWS]
+
+    with contextlib.ExitStack() as stack:
+        endpoints = []
+        if ui_users:
+            playwright = stack.enter_context(sync_playwright())
+            endpoints = _launch_shared(playwright, max(1, min(browsers or Config.LOAD_BROWSERS, len(ui_users))))
+        # UI users are spread round-robin over the shared browsers
+        threads = [threading.Thread(target=_ui_user, daemon=True,
+                                    args=(stats, VirtualUser(stats, flow, index), start_at, deadline,
+                                          endpoints[slot % len(endpoints)], stand_in))
+                   for slot, (flow, index, start_at) in enumerate(ui_users)]
+        for thread in threads:
+            thread.start()
+        if api_users:
+            # On its own thread, so the event loop never meets this thread's sync Playwright
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix="load-api") as executor:
+                executor.submit(asyncio.run, _run_api_users(stats, api_users, deadline)).result()
+        for thread in threads:
+            thread.join()
+    return stats.report(time.monotonic() - start)
+
+
+def print_report(report):
+    for flow, result in report.items():
+        latency = result["latency"]
+        print(f"{flow}: {result['iterations']} iterations, {result['throughput_per_s']:.2f}/s, "
+              f"errors {result['error_rate']:.1%}, p50 {_ms(latency['p50_ms'])}, "
+              f"p95 {_ms(latency['p95_ms'])}, p99 {_ms(latency['p99_ms'])}")
+        for step, summary in result["steps"].items():
+            print(f"    {step}: p50 {_ms(summary['p50_ms'])}, p95 {_ms(summary['p95_ms'])}, "
+                  f"p99 {_ms(summary['p99_ms'])} ({summary['count']} samples)")
+        for step, messages in result["failures"].items():
+            for message, count in messages.items():
+                print(f"    ! {step}: {count}x {message}")
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.0f}ms"
+
+
+def main(argv=None):
+    all_flows = [*API_FLOWS, *UI_FLOWS]
+    parser = argparse.ArgumentParser(description="Run business flows as concurrent virtual users")
+    parser.add_argument("--flows", default=",".join(all_flows), help=f"comma-separated subset of {all_flows}")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--ramp-up", type=float, default=10.0, help="seconds until all users are running")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds to run after ramp-up")
+    parser.add_argument("--browsers", type=int, default=Config.LOAD_BROWSERS,
+                        help="browsers shared by the UI virtual users")
+    parser.add_argument("--stand-in", action="store_true", help="run against the local stand-in server")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    flows = [flow for flow in args.flows.split(",") if flow]
+    unknown = [flow for flow in flows if flow not in all_flows]
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(unknown)}")
+
+    stand_in = None
+    if args.stand_in:
+        stand_in = StandInServer(latency=Config.STAND_IN_LATENCY_MS / 1000,
+                                 error_rate=Config.STAND_IN_ERROR_RATE).start()
+        Config.API_BASE_URL = stand_in.url
+    try:
+        report = run(flows, args.users, args.ramp_up, args.duration, stand_in, args.browsers)
+    finally:
+        if stand_in is not None:
+            stand_in.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(result["error_rate"] for result in report.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
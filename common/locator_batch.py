@@ -0,0 +1,139 @@
+# common/locator_batch.py
+#
+# Resolve many page-locator attributes in one browser round trip. Instead of
+# a wait_for_selector() + inner_text() pair per locator, a single in-page
+# evaluation polls all of them against one shared deadline and returns
+# presence, visibility and text for each.
+#
+#   found = wait_for_locators(page, LoginPageLocators,
+#                             ["COMMERCIAL_VERIFIER_HEADING", "EMPLOYER_HEADING"])
+#   assert found["EMPLOYER_HEADING"]["text"] == "Employer"
+
+import time
+
+from playwright.sync_api import Error as PlaywrightError
+
+# Playwright extensions to CSS that document.querySelector() rejects
+PLAYWRIGHT_PSEUDO_CLASSES = (":has-text(", ":text(", ":text-is(", ":text-matches(", ":visible", ":nth-match(",
+                             ":left-of(", ":right-of(", ":above(", ":below(", ":near(")
+
+# Polls until every selector resolves (and is visible, if required) or the
+# deadline passes, then returns what it found either way.
+PROBE_SCRIPT = """
+([specs, requireVisible, timeout]) => new Promise(resolve => {
+  const deadline = performance.now() + timeout;
+  const find = (kind, expr) => kind === 'xpath'
+    ? document.evaluate(expr, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : document.querySelector(expr);
+  const probe = () => {
+    const results = {};
+    let done = true;
+    for (const [name, kind, expr] of specs) {
+      let element = null;
+      try {
+        element = find(kind, expr);
+      } catch (error) {
+        results[name] = {present: false, visible: false, text: null, error: String(error)};
+        continue;
+      }
+      if (!element) {
+        results[name] = {present: false, visible: false, text: null};
+        done = false;
+        continue;
+      }
+      const style = getComputedStyle(element);
+      const rect = element.getBoundingClientRect();
+      const visible = style.visibility !== 'hidden' && rect.width > 0 && rect.height > 0;
+      if (requireVisible && !visible) done = false;
+      results[name] = {present: true, visible, text: (element.innerText ?? element.textContent ?? '').trim()};
+    }
+    if (done || performance.now() >= deadline) resolve(results);
+    else setTimeout(probe, 50);
+  };
+  probe();
+})
+"""
+
+
+def compile_locator(selector):
+    """Split a Playwright selector into an in-page ``(kind, expression)`` pair.
+
+    Returns None for what the DOM cannot evaluate directly (text=, role=,
+    chained ``>>`` selectors, Playwright pseudo-classes such as ``:has-text()``
+    or ``:visible``); those are resolved through Playwright instead.
+    """
+    if selector.startswith("xpath="):
+        return "xpath", selector[len("xpath="):]
+    if selector.startswith("//") or selector.startswith("(//"):
+        return "xpath", selector
+    if ">>" in selector or selector.split("=", 1)[0] in ("text", "role", "id", "data-testid", "internal:role"):
+        return None
+    if selector.startswith("css="):
+        selector = selector[len("css="):]
+    if any(pseudo in selector for pseudo in PLAYWRIGHT_PSEUDO_CLASSES):
+        return None
+    return "css", selector
+
+
+def locator_attributes(locators, names=None):
+    """``{name: selector}`` for a page-locator class, optionally limited to ``names``.
+
+    Selectors rewritten by common.locator_registry use Playwright-only engines,
+    so the original (DOM-evaluable) selector is returned for those.
+    """
+    if names is None:
+        names = [name for name, value in vars(locators).items() if name.isupper() and isinstance(value, str)]
+    originals = vars(locators).get("_original_selectors", {})
+    return {name: originals.get(name, getattr(locators, name)) for name in names}
+
+
+def _probe_with_playwright(page, selector, timeout, require_visible):
+    try:
+        element = page.wait_for_selector(selector, timeout=max(timeout, 1),
+                                         state="visible" if require_visible else "attached")
+    except PlaywrightError:
+        return {"present": False, "visible": False, "text": None}
+    return {"present": True, "visible": element.is_visible(), "text": element.inner_text().strip()}
+
+
+def wait_for_locators(page, locators, names=None, timeout=5000, require_visible=False):
+    """Wait once for several locators and return ``{name: {present, visible, text}}``.
+
+    ``locators`` is a page-locator class (e.g. LoginPageLocators) or a plain
+    ``{name: selector}`` dict; ``names`` picks a subset of its attributes.
+    Missing locators are reported with ``present: False`` rather than raising.
+    """
+    selectors = locators if isinstance(locators, dict) else locator_attributes(locators, names)
+    if isinstance(locators, dict) and names is not None:
+        selectors = {name: selectors[name] for name in names}
+
+    specs, fallback = [], {}
+    for name, selector in selectors.items():
+        compiled = compile_locator(selector)
+        if compiled is None:
+            fallback[name] = selector
+        else:
+            specs.append([name, *compiled])
+
+    deadline = time.monotonic() + timeout / 1000
+    results = {}
+    while specs:
+        remaining = max(0, (deadline - time.monotonic()) * 1000)
+        try:
+            results.update(page.evaluate(PROBE_SCRIPT, [specs, require_visible, remaining]))
+            break
+        except PlaywrightError as error:
+            # A navigation destroyed the evaluation context; retry on the new document
+            if "context was destroyed" not in str(error) or remaining == 0:
+                raise
+            page.wait_for_load_state("domcontentloaded")
+    for name, selector in fallback.items():
+        remaining = max(0, (deadline - time.monotonic()) * 1000)
+        results[name] = _probe_with_playwright(page, selector, remaining, require_visible)
+    return results
+
+
+def missing(results, require_visible=False):
+    """Names from a wait_for_locators() result that were not found (or not visible)."""
+    key = "visible" if require_visible else "present"
+    return [name for name, result in results.items() if not result[key]]
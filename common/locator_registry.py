@@ -0,0 +1,377 @@
+# common/locator_registry.py
+#
+# Locator registry: loads every page-locator class once, parses each selector
+# and rewrites costly XPath into Playwright's cheaper CSS/text engines where
+# the two are equivalent. The commonest case is the case-insensitive
+# ``translate(normalize-space(), "A..Z", "a..z")="login"`` pattern:
+#
+#   xpath=//h1[translate(normalize-space(), "ABC...", "abc...")="login"]
+#       -> h1 >> internal:has-text=/^\s*login\s*$/i
+#   xpath=//a[@id="lnk"]//span[normalize-space()="Register Now"]
+#       -> a#lnk span >> internal:has-text=/^\s*Register\s+Now\s*$/
+#
+# has-text (the engine behind locator.filter(has_text=...), and what
+# Playwright's own selector generator emits) tests a regex against the
+# element's full text including children, which is what normalize-space()
+# reads; the \s runs stand in for its whitespace collapsing. :text-is() would
+# not match a heading whose text sits in a child span.
+#
+# Anything it cannot translate exactly is left alone. With LOCATOR_REWRITE=true
+# (off by default: internal:has-text is not a public engine and may change
+# between Playwright releases) conftest applies the rewrites to the classes at
+# session start. The command line checks every rewrite against the stand-in
+# reference pages (same element as the original) and ranks locators by query
+# time:
+#
+#   python -m common.locator_registry                 # validate + time + report
+#   python -m common.locator_registry --dom-size 5000 # pad the DOM first
+#   python -m common.locator_registry --json locator-report.json
+
+import argparse
+import importlib
+import json
+import logging
+import re
+import statistics
+import string
+import sys
+import time
+
+from common import stand_in
+
+logger = logging.getLogger(__name__)
+
+LOCATOR_CLASSES = [
+    ("locators.login_page", "LoginPageLocators"),
+    ("locators.registration_page", "RegistrationPageLocators"),
+    ("locators.onboarding_page", "OnboardingPageLocators"),
+    ("locators.react_client_page", "ReactClientPageLocators"),
+    ("locators.react_employee_page", "ReactEmployeePageLocators"),
+    ("locators.react_verifier_page", "ReactVerifierPageLocators"),
+]
+
+
+def _reference_pages():
+    valid = {"username": "new_user", "password": "Passw0rd", "confirm_password": "Passw0rd",
+             "email": "new_user@example.com"}
+    portal = [stand_in.portal_login_page(), stand_in.order_page(1001)]
+    return {
+        "LoginPageLocators": [stand_in.landing_page(), stand_in.vvapp_login_page(),
+                              stand_in.employee_registration_page()],
+        "RegistrationPageLocators": [stand_in.registration_page(valid), stand_in.registration_page({})],
+        "OnboardingPageLocators": [stand_in.onboarding_page({"first_name": "A", "last_name": "B"}),
+                                   stand_in.onboarding_page({})],
+        "ReactClientPageLocators": [stand_in.portal_dashboard("client", "valid_username"), *portal],
+        "ReactEmployeePageLocators": [stand_in.portal_dashboard("employee", "valid_username"), *portal],
+        "ReactVerifierPageLocators": [stand_in.portal_dashboard("verifier", "valid_username"), *portal],
+    }
+
+
+# --- parsing and rewriting ---------------------------------------------------
+
+def parse(selector):
+    """Split a selector into ``(engine, body)``; plain selectors are ``css``."""
+    match = re.match(r"([a-z][a-z:-]*)=(.*)", selector, re.S)
+    if match and match.group(1) in ("xpath", "css", "text", "id", "role", "data-testid"):
+        return match.group(1), match.group(2)
+    if selector.startswith("//") or selector.startswith("(//"):
+        return "xpath", selector
+    return "css", selector
+
+
+def _css_string(value):
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _js_regex_escape(value):
+    return re.sub(r"([\\^$.*+?()\[\]{}|/])", r"\\\1", value)
+
+
+def _normalized_text_regex(value, flags=""):
+    """JS regex literal matching text whose normalize-space() equals ``value``."""
+    if not value or value != " ".join(value.split()):
+        return None  # normalize-space() never yields this, leave the XPath alone
+    return "/^\\s*" + "\\s+".join(_js_regex_escape(word) for word in value.split()) + "\\s*$/" + flags
+
+
+_QUOTED = r"""(?:"([^"]*)"|'([^']*)')"""
+_ATTRIBUTE = re.compile(rf"@([A-Za-z_][\w-]*)\s*=\s*{_QUOTED}")
+_TEXT = re.compile(rf"normalize-space\(\.?\)\s*=\s*{_QUOTED}")
+_FOLDED_TEXT = re.compile(
+    rf"translate\(\s*normalize-space\(\.?\)\s*,\s*{_QUOTED}\s*,\s*{_QUOTED}\s*\)\s*=\s*{_QUOTED}")
+_CSS_IDENTIFIER = re.compile(r"[A-Za-z_][\w-]*")
+
+
+def _quoted(match, group):
+    value = match.group(group)
+    return value if value is not None else match.group(group + 1)
+
+
+def _convert_predicate(predicate):
+    """``("css", fragment)``, ``("text", regex literal)`` or None if unsupported."""
+    predicate = predicate.strip()
+    match = _ATTRIBUTE.fullmatch(predicate)
+    if match:
+        name, value = match.group(1), _quoted(match, 2)
+        if name == "id" and _CSS_IDENTIFIER.fullmatch(value):
+            return "css", f"#{value}"
+        return "css", f"[{name}={_css_string(value)}]"
+    match = _TEXT.fullmatch(predicate)
+    if match:
+        regex = _normalized_text_regex(_quoted(match, 1))
+        return ("text", regex) if regex else None
+    match = _FOLDED_TEXT.fullmatch(predicate)
+    if match:
+        upper, lower, value = _quoted(match, 1), _quoted(match, 3), _quoted(match, 5)
+        # Only ASCII case folding is equivalent to the regex "i" flag, and a
+        # value with capitals could never match the lower-cased text anyway
+        if upper == string.ascii_uppercase and lower == string.ascii_lowercase and value.isascii() \
+                and value == value.lower():
+            regex = _normalized_text_regex(value, "i")
+            return ("text", regex) if regex else None
+    return None
+
+
+def _split_steps(xpath):
+    """``//a[...]/b`` -> ``[("//", "a[...]"), ("/", "b")]``; None for unsupported syntax."""
+    steps, index, quote, depth = [], 0, None, 0
+    current = None
+    while index < len(xpath):
+        char = xpath[index]
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == "/" and depth == 0:
+            axis = "//" if xpath.startswith("//", index) else "/"
+            current = [axis, ""]
+            steps.append(current)
+            index += len(axis)
+            continue
+        if current is None:
+            return None
+        current[1] += char
+        index += 1
+    return [tuple(step) for step in steps] if quote is None and depth == 0 else None
+
+
+def _xpath_to_css(xpath):
+    steps = _split_steps(xpath)
+    if not steps or steps[0][0] != "//":
+        return None
+    parts, text = [], None
+    for axis, step in steps:
+        match = re.fullmatch(r"([A-Za-z][\w-]*|\*)((?:\[.*?\])*)", step, re.S)
+        # A text filter can only apply to the final step of the chain
+        if not match or text is not None:
+            return None
+        css = "" if match.group(1) == "*" else match.group(1)
+        for predicate in _split_predicates(match.group(2)):
+            converted = _convert_predicate(predicate)
+            if converted is None or (converted[0] == "text" and text is not None):
+                return None
+            if converted[0] == "text":
+                text = converted[1]
+            else:
+                css += converted[1]
+        parts.append((" > " if axis == "/" and parts else " ") + (css or "*"))
+    css = "".join(parts).strip()
+    return css if text is None else f"{css} >> internal:has-text={text}"
+
+
+def _split_predicates(text):
+    predicates, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(text):
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "[":
+            if depth == 0:
+                start = index + 1
+            depth += 1
+        elif char == "]":
+            depth -= 1
+            if depth == 0:
+                predicates.append(text[start:index])
+    return predicates
+
+
+def rewrite(selector):
+    """Cheaper equivalent of ``selector``, or ``selector`` itself if there is none."""
+    engine, body = parse(selector)
+    if engine != "xpath":
+        return selector
+    return _xpath_to_css(body) or selector
+
+
+# --- registry ----------------------------------------------------------------
+
+class LocatorRegistry:
+    """Every page-locator class, loaded once, with its selectors and rewrites."""
+
+    def __init__(self, classes=None):
+        self.classes = {}
+        self.entries = {}  # (class name, attribute) -> {"original", "rewritten", "engine"}
+        for module_name, class_name in LOCATOR_CLASSES if classes is None else classes:
+            try:
+                locators = getattr(importlib.import_module(module_name), class_name)
+            except (ImportError, AttributeError) as error:
+                logger.warning("Locator class %s.%s not loaded: %s", module_name, class_name, error)
+                continue
+            self.add(locators)
+
+    def add(self, locators):
+        self.classes[locators.__name__] = locators
+        # Read originals if the class was already rewritten, so add() is idempotent
+        originals = {**vars(locators).get("_original_selectors", {})}
+        for name, value in vars(locators).items():
+            if not name.isupper() or not isinstance(value, str):
+                continue
+            original = originals.get(name, value)
+            self.entries[(locators.__name__, name)] = {
+                "original": original,
+                "rewritten": rewrite(original),
+                "engine": parse(original)[0],
+            }
+
+    def rewrites(self):
+        return {key: entry for key, entry in self.entries.items() if entry["rewritten"] != entry["original"]}
+
+    def apply(self, skip=()):
+        """Point the class attributes at the rewritten selectors.
+
+        The originals stay available as ``<class>._original_selectors`` (in-page
+        batching in common.locator_batch evaluates those, since the rewrites use
+        Playwright-only engines). ``skip`` holds ``(class, attribute)``
+        keys to keep as written, e.g. rewrites that failed validation.
+        """
+        for (class_name, name), entry in self.rewrites().items():
+            if (class_name, name) in skip:
+                continue
+            locators = self.classes[class_name]
+            if "_original_selectors" not in vars(locators):
+                locators._original_selectors = {}
+            locators._original_selectors[name] = entry["original"]
+            setattr(locators, name, entry["rewritten"])
+
+    def restore(self):
+        for locators in self.classes.values():
+            for name, original in vars(locators).get("_original_selectors", {}).items():
+                setattr(locators, name, original)
+            if "_original_selectors" in vars(locators):
+                del locators._original_selectors
+
+
+_registry = None
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        _registry = LocatorRegistry()
+    return _registry
+
+
+# --- validation and timing ---------------------------------------------------
+
+PAD_SCRIPT = """
+(count) => {
+  const filler = document.createElement('div');
+  filler.id = '__locator_padding';
+  filler.hidden = true;
+  for (let i = 0; i < count; i++) {
+    const item = document.createElement(['div', 'span', 'p', 'h2', 'a'][i % 5]);
+    item.textContent = 'filler ' + i;
+    filler.appendChild(item);
+  }
+  document.body.appendChild(filler);
+}
+"""
+
+
+def _time_query(page, selector, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        page.query_selector_all(selector)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def profile(registry, page, repeat=20, dom_size=0):
+    """Validate and time every locator on its reference pages.
+
+    Returns one row per locator: where it matched, whether the rewrite
+    resolved to the same element, and median query time before/after.
+    """
+    rows = []
+    for class_name, pages in _reference_pages().items():
+        keys = [key for key in registry.entries if key[0] == class_name]
+        for html in pages:
+            page.set_content(html)
+            if dom_size:
+                page.evaluate(PAD_SCRIPT, dom_size)
+            for key in list(keys):
+                entry = registry.entries[key]
+                original = page.query_selector(entry["original"])
+                if original is None:
+                    continue
+                keys.remove(key)
+                row = {"locator": f"{key[0]}.{key[1]}", "original": entry["original"],
+                       "original_ms": _time_query(page, entry["original"], repeat)}
+                if entry["rewritten"] != entry["original"]:
+                    rewritten = page.query_selector(entry["rewritten"])
+                    row["rewritten"] = entry["rewritten"]
+                    row["equivalent"] = rewritten is not None and page.evaluate("([a, b]) => a === b",
+                                                                                [original, rewritten])
+                    row["rewritten_ms"] = _time_query(page, entry["rewritten"], repeat)
+                rows.append(row)
+        rows.extend({"locator": f"{class_name}.{name}", "original": registry.entries[(class_name, name)]["original"],
+                     "unmatched": True} for _, name in keys)
+    rows.sort(key=lambda row: row.get("original_ms", -1), reverse=True)
+    return rows
+
+
+def print_report(rows, top=None):
+    print(f"{'locator':55} {'original':>10} {'rewritten':>10}")
+    for row in rows[:top]:
+        if row.get("unmatched"):
+            print(f"{row['locator']:55} {'-':>10} {'-':>10}  not on any reference page")
+            continue
+        after = f"{row['rewritten_ms']:.3f}ms" if "rewritten_ms" in row else "-"
+        note = ""
+        if "equivalent" in row:
+            note = f"  -> {row['rewritten']}" if row["equivalent"] else "  REWRITE MISMATCH, kept original"
+        print(f"{row['locator']:55} {row['original_ms']:8.3f}ms {after:>10}{note}")
+
+
+def main(argv=None):
+    from playwright.sync_api import sync_playwright
+
+    parser = argparse.ArgumentParser(description="Validate locator rewrites and rank selectors by cost")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--dom-size", type=int, default=0, help="hidden filler elements added to each page")
+    parser.add_argument("--top", type=int, default=None, help="only print the N slowest locators")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        rows = profile(registry, browser.new_page(), args.repeat, args.dom_size)
+        browser.close()
+
+    print_report(rows, args.top)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 1 if any(row.get("equivalent") is False for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# common/network.py
+#
+# Context-level network shaping for the GUI suites:
+#   * block_resources() aborts images/fonts/media (by the request's resource
+#     type, whatever its URL looks like) and stubs analytics and other
+#     third-party scripts the assertions never look at;
+#   * HarCache records one HAR per portal and process (NETWORK_MODE=record)
+#     and replays recorded responses from a local cache (NETWORK_MODE=replay),
+#     indexed by method, URL and request-body hash.
+# Third-party hosts are matched by regular expression in the Playwright
+# driver. The resource type is only known per request, so with
+# BLOCK_RESOURCES set each request makes one round trip to a handler that
+# aborts it or falls back to the other routes.
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+
+from common.config import Config
+from common.json_files import load_json, update_json
+
+logger = logging.getLogger(__name__)
+
+ABORT = "abort"  # respond() result that blocks the request
+STUB_BODIES = {"script": "", "stylesheet": "", "xhr": "{}", "fetch": "{}"}
+# Hop-by-hop or body-dependent headers that must not be replayed verbatim
+_SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def _host_pattern(hosts):
+    return "|".join(re.escape(host) for host in hosts)
+
+
+def _block_types(resource_types):
+    resource_types = frozenset(resource_types)
+
+    def respond(request):
+        return ABORT if request.resource_type in resource_types else None
+    return respond
+
+
+def _stub(request):
+    body = STUB_BODIES.get(request.resource_type)
+    return ABORT if body is None else {"status": 200, "body": body}
+
+
+def blocking_routes(resource_types=None, stub_hosts=None):
+    """``[(pattern, respond)]`` for block_resources(); ``respond(request)``
+    returns ``route.fulfill`` arguments, ABORT, or None to fall back to the
+    next route."""
+    resource_types = Config.BLOCK_RESOURCES if resource_types is None else resource_types
+    stub_hosts = Config.STUB_HOSTS if stub_hosts is None else stub_hosts
+    routes = []
+    if resource_types:
+        routes.append(("**/*", _block_types(resource_types)))
+    if stub_hosts:
+        routes.append((re.compile(rf"^https?://([^/]*\.)?({_host_pattern(stub_hosts)})(:\d+)?/"), _stub))
+    return routes
+
+
+def block_resources(context, resource_types=None, stub_hosts=None):
+    """Abort heavy static resources and stub third-party hosts in ``context``."""
+    for pattern, respond in blocking_routes(resource_types, stub_hosts):
+        def handle(route, respond=respond):
+            response = respond(route.request)
+            if response is None:
+                return route.fallback()
+            if response is ABORT:
+                return route.abort("blockedbyclient")
+            route.fulfill(**response)
+
+        context.route(pattern, handle)
+
+
+async def block_resources_async(context, resource_types=None, stub_hosts=None):
+    """block_resources for an async API context (common.async_runner)."""
+    for pattern, respond in blocking_routes(resource_types, stub_hosts):
+        async def handle(route, respond=respond):
+            response = respond(route.request)
+            if response is None:
+                return await route.fallback()
+            if response is ABORT:
+                return await route.abort("blockedbyclient")
+            await route.fulfill(**response)
+
+        await context.route(pattern, handle)
+
+
+def _merge_headers(headers):
+    merged = {}
+    for name, value in headers:
+        key = name.lower()
+        if key in merged:
+            # Playwright takes one value per header; Set-Cookie lines are newline-separated
+            merged[key] += ("\n" if key == "set-cookie" else ", ") + value
+        else:
+            merged[key] = value
+    return merged
+
+
+def request_key(method, url, body=b""):
+    body_hash = hashlib.sha1(body or b"").hexdigest()
+    return hashlib.sha1(f"{method.upper()} {url} {body_hash}".encode()).hexdigest()
+
+
+class HarCache:
+    """Per-portal HAR recordings plus a content-addressed replay index.
+
+    Layout of ``directory``::
+
+        <portal>-<pid>.har  last recording for the portal by process <pid>
+        index.json        request key -> {status, headers, body}
+        bodies/<sha1>     response bodies, shared between identical responses
+    """
+
+    def __init__(self, directory=None, hosts=None):
+        self.directory = directory or Config.HAR_DIR
+        self.hosts = hosts
+        self._index = None
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = load_json(self.index_path)
+        return self._index
+
+    def har_path(self, portal):
+        # Per process, so parallel workers recording the same portal never share a file
+        return os.path.join(self.directory, f"{portal}-{os.getpid()}.har")
+
+    def record_args(self, portal):
+        """Extra ``new_context`` arguments that record a HAR for ``portal``."""
+        os.makedirs(self.directory, exist_ok=True)
+        return {"record_har_path": self.har_path(portal), "record_har_content": "embed"}
+
+    def index_har(self, portal):
+        """Add every entry of this process's HAR for the portal (written on context close) to the index."""
+        try:
+            with open(self.har_path(portal)) as f:
+                entries = json.load(f)["log"]["entries"]
+        except (OSError, ValueError, KeyError):
+            return 0
+        bodies = os.path.join(self.directory, "bodies")
+        os.makedirs(bodies, exist_ok=True)
+        new = {}
+        for entry in entries:
+            request, response = entry["request"], entry["response"]
+            if response.get("status", 0) <= 0:
+                continue  # aborted or blocked
+            post_data = (request.get("postData") or {}).get("text", "").encode()
+            content = response.get("content", {})
+            body = content.get("text", "")
+            body = base64.b64decode(body) if content.get("encoding") == "base64" else body.encode()
+            digest = hashlib.sha1(body).hexdigest()
+            body_path = os.path.join(bodies, digest)
+            if not os.path.exists(body_path):
+                # Content-addressed, so a concurrent writer can only produce the same bytes
+                tmp_path = f"{body_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(body)
+                os.replace(tmp_path, body_path)
+            new[request_key(request["method"], request["url"], post_data)] = {
+                "status": response["status"],
+                "headers": [[h["name"], h["value"]] for h in response.get("headers", [])
+                            if h["name"].lower() not in _SKIP_HEADERS],
+                "body": digest,
+            }
+        # Merged under the index's file lock, so parallel workers and shards keep each other's entries
+        self._index = update_json(self.index_path, lambda index: {**index, **new})
+        return len(entries)
+
+    def replay(self, context, on_miss="fallback"):
+        """Serve cached responses in ``context``; misses go to the network or abort."""
+        def handle(route):
+            request = route.request
+            cached = self.index.get(request_key(request.method, request.url, request.post_data_buffer))
+            if cached is None:
+                logger.debug("HAR cache miss: %s %s", request.method, request.url)
+                return route.abort() if on_miss == "abort" else route.fallback()
+            with open(os.path.join(self.directory, "bodies", cached["body"]), "rb") as f:
+                body = f.read()
+            route.fulfill(status=cached["status"], headers=_merge_headers(cached["headers"]), body=body)
+
+        pattern = re.compile(rf"^https?://({_host_pattern(self.hosts)})(:\d+)?/") if self.hosts else "**/*"
+        context.route(pattern, handle)
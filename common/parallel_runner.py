@@ -0,0 +1,135 @@
+# common/parallel_runner.py
+#
+# Runs a marker selection (e.g. smoke, regression) across several pytest
+# worker processes, each with its own browser. Tests are assigned to workers
+# longest-first using durations recorded by earlier runs.
+#
+#   python -m common.parallel_runner -m smoke --workers 4
+
+import argparse
+import heapq
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common.config import Config
+
+DEFAULT_DURATION = 1.0
+
+
+def collect(pytest_args):
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "--collect-only", "-q", *pytest_args],
+        capture_output=True, text=True,
+    )
+    if result.returncode not in (0, 5):  # 5: nothing collected
+        sys.stderr.write(result.stdout + result.stderr)
+        raise SystemExit(result.returncode)
+    return [line for line in result.stdout.splitlines() if "::" in line]
+
+
+def load_durations(path=None):
+    try:
+        with open(path or Config.DURATIONS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_durations(durations, path=None):
+    path = path or Config.DURATIONS_FILE
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def plan(nodeids, durations, workers):
+    """Longest-processing-time-first bin packing.
+
+    Returns one ``(estimated_seconds, [nodeid, ...])`` pair per worker.
+    Tests without history are estimated at the median known duration.
+    """
+    known = [durations[n] for n in nodeids if n in durations]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION
+    estimates = {n: durations.get(n, fallback) for n in nodeids}
+
+    shards = [(0.0, i, []) for i in range(max(1, workers))]
+    heapq.heapify(shards)
+    for nodeid in sorted(nodeids, key=lambda n: (-estimates[n], n)):
+        load, i, tests = heapq.heappop(shards)
+        tests.append(nodeid)
+        heapq.heappush(shards, (load + estimates[nodeid], i, tests))
+    return [(load, tests) for load, _, tests in sorted(shards, key=lambda s: s[1]) if tests]
+
+
+def run(pytest_args, workers, durations_file=None):
+    nodeids = collect(pytest_args)
+    if not nodeids:
+        print("No tests collected")
+        return 5
+
+    durations = load_durations(durations_file)
+    shards = plan(nodeids, durations, workers)
+    print(f"Running {len(nodeids)} tests on {len(shards)} workers")
+    for i, (estimate, tests) in enumerate(shards):
+        print(f"  worker {i}: {len(tests)} tests, ~{estimate:.1f}s")
+
+    with tempfile.TemporaryDirectory(prefix="shards-") as tmp:
+        procs = []
+        start = time.monotonic()
+        for i, (_, tests) in enumerate(shards):
+            shard_file = os.path.join(tmp, f"shard-{i}.json")
+            with open(shard_file, "w") as f:
+                json.dump(tests, f)
+            env = dict(os.environ, SHARD_FILE=shard_file,
+                       DURATIONS_OUT=os.path.join(tmp, f"durations-{i}.json"))
+            procs.append(subprocess.Popen(
+                [sys.executable, "-m", "pytest", "-p", "common.durations", *pytest_args], env=env,
+            ))
+
+        finished = {}
+        while len(finished) < len(procs):
+            for i, proc in enumerate(procs):
+                if i not in finished and proc.poll() is not None:
+                    finished[i] = (proc.returncode, time.monotonic() - start)
+            time.sleep(0.1)
+        wall = time.monotonic() - start
+
+        busy = []
+        for i in range(len(shards)):
+            measured = load_durations(os.path.join(tmp, f"durations-{i}.json"))
+            durations.update(measured)
+            busy.append(sum(measured.values()))
+
+    save_durations(durations, durations_file)
+    report(wall, busy, finished)
+    codes = [code for code, _ in finished.values()]
+    return max(codes) if any(codes) else 0
+
+
+def report(wall, busy, finished):
+    serial = sum(busy)
+    print(f"\nWall time: {wall:.1f}s, serial test time: {serial:.1f}s, "
+          f"speedup: {serial / wall if wall else 0:.2f}x")
+    for i, seconds in enumerate(busy):
+        code, elapsed = finished[i]
+        utilisation = seconds / wall if wall else 0
+        print(f"  worker {i}: busy {seconds:.1f}s, finished at {elapsed:.1f}s, "
+              f"utilisation {utilisation:.0%}, exit {code}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run pytest in duration-balanced parallel shards")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--durations-file", default=Config.DURATIONS_FILE)
+    args, pytest_args = parser.parse_known_args(argv)
+    return run(pytest_args, args.workers, args.durations_file)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
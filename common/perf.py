@@ -0,0 +1,142 @@
+# common/perf.py
+#
+# Page performance per allure.step. perf_step() is a drop-in for
+# ``with allure.step(title):`` that also records, for that step:
+#   * wall time;
+#   * Navigation Timing and paint metrics of a document loaded during the
+#     step (TTFB, DOMContentLoaded, load, FCP, LCP);
+#   * request count and transferred bytes from Resource Timing.
+# Metrics are attached to the step as JSON, collected into a per-worker JSON
+# summary, and checked against per-page budgets (PERF_BUDGETS_FILE), which
+# either warn or fail the test (PERF_BUDGET_MODE).
+#
+# A step costs one page.evaluate, at exit, reading every metric at once; the
+# start time is taken locally. With PERF_METRICS=false (init script not
+# installed) or a closed page only the wall time is recorded, without a round
+# trip to the browser.
+
+import fnmatch
+import json
+import logging
+import os
+import time
+import warnings
+from contextlib import contextmanager
+
+import allure
+import pytest
+
+from common.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Installed on every context: keeps the last LCP candidate and enlarges the
+# resource timing buffer so long steps are not truncated at 250 entries.
+INIT_SCRIPT = """
+(() => {
+  try { performance.setResourceTimingBufferSize(10000); } catch (e) {}
+  try {
+    new PerformanceObserver(list => {
+      for (const entry of list.getEntries()) window.__perfLcp = entry.startTime;
+    }).observe({type: 'largest-contentful-paint', buffered: true});
+  } catch (e) {}
+})();
+"""
+
+COLLECT_SCRIPT = """
+(since) => {
+  const origin = performance.timeOrigin;
+  const metrics = {url: location.href, navigated: origin >= since};
+  const nav = performance.getEntriesByType('navigation')[0];
+  if (metrics.navigated && nav) {
+    metrics.ttfb = nav.responseStart - nav.requestStart;
+    metrics.dom_content_loaded = nav.domContentLoadedEventEnd || null;
+    metrics.load = nav.loadEventEnd || null;
+    const fcp = performance.getEntriesByName('first-contentful-paint')[0];
+    metrics.fcp = fcp ? fcp.startTime : null;
+    metrics.lcp = window.__perfLcp ?? null;
+  }
+  const resources = performance.getEntriesByType('resource')
+    .filter(entry => origin + entry.startTime >= since);
+  metrics.requests = resources.length + (metrics.navigated && nav ? 1 : 0);
+  metrics.transferred_bytes = resources.reduce((sum, entry) => sum + (entry.transferSize || 0),
+    metrics.navigated && nav ? nav.transferSize || 0 : 0);
+  return metrics;
+}
+"""
+
+_results = []
+_budgets = None
+
+
+def install(context):
+    context.add_init_script(INIT_SCRIPT)
+
+
+def load_budgets(path=None):
+    """Budgets file: ``{"<url glob>": {"ttfb": ms, "load": ms, "lcp": ms, "wall": ms, ...}}``."""
+    global _budgets
+    if _budgets is None or path is not None:
+        path = path or Config.PERF_BUDGETS_FILE
+        try:
+            with open(path) as f:
+                _budgets = json.load(f)
+        except FileNotFoundError:
+            _budgets = {}
+    return _budgets
+
+
+def check_budget(metrics, budgets=None):
+    """Return a list of human-readable budget violations for one step."""
+    budgets = load_budgets() if budgets is None else budgets
+    violations = []
+    for pattern, limits in budgets.items():
+        if not fnmatch.fnmatch(metrics.get("url", ""), pattern):
+            continue
+        for metric, limit in limits.items():
+            value = metrics.get(metric)
+            if value is not None and value > limit:
+                violations.append(f"{metrics['step']}: {metric} {value:.0f} > {limit} ({pattern})")
+    return violations
+
+
+def _collect(page, since_ms):
+    if not Config.PERF_METRICS or page.is_closed():
+        return {}
+    try:
+        return page.evaluate(COLLECT_SCRIPT, since_ms)
+    except Exception as error:  # page closed or navigating away mid-evaluate
+        logger.debug("Could not collect page metrics: %s", error)
+        return {}
+
+
+@contextmanager
+def perf_step(page, title):
+    """``with allure.step(title)`` plus page performance metrics for the step."""
+    since_ms = time.time() * 1000
+    start = time.perf_counter()
+    with allure.step(title):
+        yield
+        metrics = {"step": title, "wall": (time.perf_counter() - start) * 1000, **_collect(page, since_ms)}
+        allure.attach(json.dumps(metrics, indent=2), name=f"Performance: {title}",
+                      attachment_type=allure.attachment_type.JSON)
+    test = os.getenv("PYTEST_CURRENT_TEST", "").rsplit(" ", 1)[0]
+    _results.append({"test": test, **metrics})
+
+    violations = check_budget(metrics)
+    if violations:
+        message = "Performance budget exceeded: " + "; ".join(violations)
+        if Config.PERF_BUDGET_MODE == "fail":
+            pytest.fail(message)
+        warnings.warn(message)
+
+
+def write_summary(path=None):
+    """Write every recorded step of this process to a JSON summary file."""
+    if not _results:
+        return None
+    path = path or Config.PERF_SUMMARY_PATH.format(pid=os.getpid())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"steps": _results}, f, indent=2)
+    return path
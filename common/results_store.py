@@ -0,0 +1,227 @@
+# common/results_store.py
+#
+# Append-only replacement for rewriting data/stored_data.json on every
+# save_data() call. Each process appends batches of records to its own JSONL
+# segment next to the target file (data/stored_data.journal/<pid>-<id>.jsonl),
+# so workers never contend for a lock. compact() folds all segments into the
+# familiar stored_data.json view; with prune=True (the end-of-session default)
+# the folded segments are replaced by one compacted segment holding the latest
+# fields per username, so the journal stops growing with the run count.
+# Pruning only takes the segments of this process and of processes that have
+# exited; a live worker's segment waits for that worker's own compaction.
+
+import atexit
+import contextlib
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+
+from common.config import Config
+from common.json_files import update_json
+
+try:
+    import psutil
+except ImportError:  # falls back to os.kill(pid, 0) on POSIX
+    psutil = None
+
+
+def journal_dir(path):
+    root, _ = os.path.splitext(path)
+    return f"{root}.journal"
+
+
+class ResultJournal:
+    def __init__(self, path, batch_size=None):
+        self.path = path
+        self.batch_size = batch_size or Config.RESULTS_BATCH_SIZE
+        self.segment = os.path.join(journal_dir(path), f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl")
+        self._buffer = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def append(self, data):
+        with self._lock:
+            self._seq += 1
+            self._buffer.append({"ts": time.time(), "seq": self._seq, "data": data})
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        os.makedirs(os.path.dirname(self.segment), exist_ok=True)
+        lines = "".join(json.dumps(record) + "\n" for record in self._buffer).encode()
+        # A single O_APPEND write per batch keeps each batch contiguous
+        fd = os.open(self.segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines)
+        finally:
+            os.close(fd)
+        self._buffer.clear()
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(path):
+    with _journals_lock:
+        if path not in _journals:
+            _journals[path] = ResultJournal(path)
+        return _journals[path]
+
+
+def save_data(path, data):
+    """Drop-in for common.functions.save_data that appends instead of rewriting."""
+    get_journal(path).append(dict(data))
+
+
+def flush_all():
+    with _journals_lock:
+        journals = list(_journals.values())
+    for journal in journals:
+        journal.flush()
+
+
+atexit.register(flush_all)
+
+
+def _segments(path):
+    # Claimed (.done) segments stay readable until their compaction has finished
+    return glob.glob(os.path.join(journal_dir(path), "*.jsonl")) + \
+        glob.glob(os.path.join(journal_dir(path), "*.jsonl.*.done"))
+
+
+def _read(segments):
+    records = []
+    for segment in segments:
+        with open(segment) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn tail of a segment still being written
+    records.sort(key=lambda r: (r["ts"], r["seq"]))
+    return records
+
+
+def read_records(path):
+    """Return every journalled record for ``path`` in write order."""
+    return _read(_segments(path))
+
+
+def _alive(pid):
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if os.name == "nt":
+        return True  # os.kill would terminate it; leave the segment to its owner
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _claimable(segment):
+    """True for compacted segments and the segments of this or an exited process."""
+    owner = os.path.basename(segment).split("-", 1)[0]
+    if not owner.isdigit():
+        return True  # compacted segments are written whole by os.replace
+    pid = int(owner)
+    return pid == os.getpid() or not _alive(pid)
+
+
+def _claim(path):
+    """Rename the finished segments aside so this compaction alone folds and deletes them.
+
+    Segments of live processes are left alone: one of their flushes could
+    land after the read and be deleted with the segment. This process's own
+    segment is renamed under its journal's lock, so the next flush starts a
+    fresh file; a segment another compactor claimed first is skipped.
+    """
+    claimed = []
+    journal = _journals.get(path)
+    with journal._lock if journal is not None else contextlib.nullcontext():
+        for segment in glob.glob(os.path.join(journal_dir(path), "*.jsonl")):
+            if not _claimable(segment):
+                continue
+            done = f"{segment}.{os.getpid()}.done"
+            try:
+                os.rename(segment, done)
+            except OSError:
+                continue
+            claimed.append(done)
+    return claimed
+
+
+def _collapse(records):
+    """One record per username (plus one without) with the latest value of each field."""
+    collapsed = {}
+    for record in records:
+        entry = collapsed.setdefault(record["data"].get("username"), {"data": {}, "compacted": True})
+        entry["data"].update(record["data"])
+        entry["ts"], entry["seq"] = record["ts"], record["seq"]
+    return list(collapsed.values())
+
+
+def compact(path, prune=False):
+    """Write the merged view of all journalled records to ``path`` and return it.
+
+    ``prune`` folds the segments of this process and of exited processes into
+    one compacted segment instead of keeping every record; segments of
+    processes still running are neither read nor removed until they compact
+    themselves.
+    """
+    segments = _claim(path) if prune else _segments(path)
+    records = _read(segments)
+
+    def merge(stored):
+        for record in records:
+            # Already part of the stored view when its segment was compacted
+            if not record.get("compacted"):
+                stored.update(record["data"])
+        return stored
+
+    stored = update_json(path, merge, indent=4)
+    if prune and segments:
+        compacted = os.path.join(journal_dir(path), f"compacted-{uuid.uuid4().hex[:8]}.jsonl")
+        lines = "".join(json.dumps(record) + "\n" for record in _collapse(records))
+        tmp_path = f"{compacted}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(lines)
+        os.replace(tmp_path, compacted)
+        for segment in segments:
+            os.remove(segment)
+    return stored
+
+
+def compact_all():
+    """Flush and compact every file this process has journalled to."""
+    flush_all()
+    with _journals_lock:
+        paths = list(_journals)
+    for path in paths:
+        compact(path, prune=True)
+
+
+def latest_by_username(path):
+    """Return ``{username: {field: value, ...}}`` with the latest value of each field."""
+    latest = {}
+    for record in read_records(path):
+        username = record["data"].get("username")
+        if username:
+            latest.setdefault(username, {}).update(record["data"])
+    return latest
+
+
+def latest_status(path, username):
+    return latest_by_username(path).get(username, {})
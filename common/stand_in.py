@@ -0,0 +1,423 @@
+# common/stand_in.py
+#
+# In-process HTTP stand-in for the vault system so suites can run offline.
+# It serves the vault API plus pages carrying every locator in the page
+# classes (landing/login, registration, onboarding and the three React
+# portals). Browser contexts reach it through route_to_stand_in(), which
+# forwards requests for the real and placeholder hosts, so page.url and
+# wait_for_url() assertions see the original URLs.
+#
+#   with StandInServer(latency=0.05, error_rate=0.1) as server:
+#       api_client = ApiClient(server.url)
+#       route_to_stand_in(context, server)
+
+import html
+import json
+import os
+import random
+import re
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlsplit
+
+from common.config import Config
+
+VALID_USERNAME = "valid_username"
+VALID_PASSWORD = "valid_password"
+EXISTING_USERS = {"existing_user"}
+SITE_HEADER = "X-Stand-In-Site"
+SESSION_COOKIE = "vault_session"
+SAMPLE_ORDER_PDF = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "Create new order VOE.pdf")
+
+API_FIXTURES = {
+    "/wapi/term-ee": {"employees": [{"id": 1, "status": "terminated", "termination_date": "2024-01-31"}]},
+    "/wapi/voe-match": {"matches": [{"id": 1, "employer": "Acme Corp", "match": True}]},
+    "/wapi/voi-match": {"matches": [{"id": 1, "income_verified": True, "annual_income": 85000}]},
+    "/roster-data": {"records": [{"id": i, "first_name": f"First{i}", "last_name": f"Last{i}"} for i in range(1, 6)]},
+    "/payroll-data": {"records": [{"id": i, "employee_id": i, "gross_pay": 1000.0 * i} for i in range(1, 6)],
+                      "total": 15000.0},
+}
+
+
+def default_hosts():
+    """Hostnames served by the stand-in, mapped to the site they render."""
+    hosts = {
+        "www.vaultverify.com": "landing",
+        "app.vaultverify.com": "vvapp",
+        "your-vault-system-registration-url": "registration",
+        "your-vault-system-onboarding-url": "onboarding",
+        "your-vault-system-api-url": "api",
+    }
+    for site, url in (("client", Config.CLIENT_PORTAL_URL), ("employee", Config.EMPLOYEE_PORTAL_URL),
+                      ("verifier", Config.VERIFIER_PORTAL_URL)):
+        hosts[urlsplit(url).hostname] = site
+    return hosts
+
+
+def _page(title, body):
+    return (f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{title}</title></head>"
+            f"<body>{body}</body></html>")
+
+
+def _form(fields, message=""):
+    inputs = "".join(f"<label>{label}<input type='{kind}' name='{name}'></label>" for name, label, kind in fields)
+    return f"<form method='post'>{inputs}<button type='submit'>Submit</button></form>{message}"
+
+
+def landing_page():
+    return _page("Vault Verify", (
+        "<nav><a class='nav-link' title='Click here to access the Vault Verify portal.' "
+        "href='https://app.vaultverify.com/VVApp/'>Login</a></nav>"
+    ))
+
+
+def vvapp_login_page():
+    sections = "".join(f"<section><h2>{name}</h2></section>"
+                       for name in ("Commercial Verifier", "Government Verifier", "Employer", "Employee"))
+    return _page("Login", (
+        f"<h1>LOGIN</h1>{sections}"
+        "<a id='ctl00_ContentPlaceHolder1_lnkRegister_EP' href='/vvapp/Registration_EP.aspx'>"
+        "<span>Register Now</span></a>"
+    ))
+
+
+def employee_registration_page():
+    return _page("Employee Registration", "<h1>Employee Registration</h1>")
+
+
+REGISTRATION_FIELDS = [("username", "Username", "text"), ("password", "Password", "password"),
+                       ("confirm_password", "Confirm password", "password"), ("email", "Email", "text")]
+
+
+def registration_page(form=None):
+    message = ""
+    if form is not None:
+        email = form.get("email", "")
+        if (form.get("username", "") in EXISTING_USERS or not form.get("username")
+                or form.get("password") != form.get("confirm_password")
+                or not re.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+", email)):
+            message = "<div id='error-message-id'>Registration failed</div>"
+        else:
+            message = "<div id='success-message-id'>Registration successful</div>"
+    return _page("Registration", _form(REGISTRATION_FIELDS, message))
+
+
+def onboarding_page(form=None):
+    message = ""
+    if form is not None:
+        if form.get("first_name", "").strip() and form.get("last_name", "").strip():
+            message = "<div id='onboarding-success-id'>Onboarding complete</div>"
+        else:
+            message = "<div id='onboarding-error-id'>Onboarding failed</div>"
+    return _page("Onboarding", _form([("first_name", "First name", "text"), ("last_name", "Last name", "text")],
+                                     message))
+
+
+def portal_login_page(error=False):
+    message = "<div id='login-error'>Invalid username or password</div>" if error else ""
+    return _page("Sign in", (
+        "<form method='post' action='/login'>"
+        "<input type='text' name='username'><input type='password' name='password'>"
+        f"<button type='submit'>Sign in</button></form>{message}"
+    ))
+
+
+def portal_dashboard(site, username):
+    today = time.strftime("%Y-%m-%d")
+    extra = {
+        "client": (
+            "<form action='/search'><input id='dashboard-search' name='q'></form>"
+            "<div id='orders-by-category-chart'><svg width='200' height='100'></svg></div>"
+            "<a id='new-order-button' href='/orders/new'>New order</a>"
+        ),
+        "employee": (
+            "<a id='new-order-button' href='/orders/new'>New order</a>"
+            "<section id='account-section'><button id='change-password-button'>Change password</button></section>"
+        ),
+        "verifier": (
+            f"<div id='account-detail'>{html.escape(username)}</div>"
+            f"<table id='grid-view'><tr><th>Order</th><th>Requested</th></tr>"
+            f"<tr><td>1001</td><td class='requested-date'>{today}</td></tr></table>"
+            "<a id='add-cc' href='/credit-cards/new'>Add card</a>"
+            "<button id='edit-cc'>Edit card</button><button id='delete-cc'>Delete card</button>"
+        ),
+    }[site]
+    return _page(f"{site.title()} dashboard", (
+        f"<header><div id='avatar-menu'>{html.escape(username)}</div>"
+        "<a id='help-center' href='/help'>Help center</a><a id='contact-us' href='/contact'>Contact us</a>"
+        "<a id='logout-button' href='/logout'>Log out</a></header>"
+        f"<main id='dashboard'>{extra}<a class='order-id' href='/orders/1001'>1001</a></main>"
+        "<footer id='footer'>Vault Verify</footer>"
+    ))
+
+
+def order_page(order_id):
+    return _page(f"Order {order_id}", (
+        f"<div id='order-details'>Order {order_id}</div>"
+        f"<a id='download-button' href='/orders/{order_id}/document.pdf' download>Download</a>"
+    ))
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoints
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json", headers=()):
+        if isinstance(body, str):
+            body = body.encode()
+        elif not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _html(self, body, status=200, headers=()):
+        self._send(status, body, "text/html; charset=utf-8", headers)
+
+    def _redirect(self, location, headers=()):
+        self._send(303, b"", "text/plain", [("Location", location), *headers])
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length).decode() if length else ""
+        if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            return dict(parse_qsl(raw))
+        try:
+            return json.loads(raw or "{}")
+        except ValueError:
+            return {}
+
+    def _session_user(self):
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        morsel = cookie.get(SESSION_COOKIE)
+        return self.server.sessions.get(morsel.value) if morsel else None
+
+    def _inject(self):
+        """Apply configured latency and error injection; True if the request was answered."""
+        stand_in = self.server.stand_in
+        if stand_in.latency:
+            time.sleep(stand_in.latency)
+        path = urlsplit(self.path).path
+        for prefix, status in stand_in.failures.items():
+            if path.startswith(prefix):
+                self._send(status, {"error": "injected failure"})
+                return True
+        if stand_in.error_rate and stand_in.random.random() < stand_in.error_rate:
+            self._send(503, {"error": "injected failure"})
+            return True
+        return False
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        # Read the body first: an unread body on a kept-alive connection would
+        # be parsed as the next request, even when the answer is injected
+        form = self._read_body() if method == "POST" else None
+        if self._inject():
+            return
+        url = urlsplit(self.path)
+        site = self.headers.get(SITE_HEADER, "api")
+        handler = getattr(self, f"_site_{site}", None)
+        if handler is None:
+            return self._send(404, {"error": f"unknown site {site}"})
+        handler(method, url.path.lower(), url, form)
+
+    def _site_api(self, method, path, url, form):
+        if method == "POST" and path.rstrip("/").endswith("login"):
+            if (form.get("username"), form.get("password")) == (VALID_USERNAME, VALID_PASSWORD):
+                token = secrets.token_hex(16)
+                self.server.tokens.add(token)
+                return self._send(200, {"token": token})
+            return self._send(401, {"error": "invalid credentials"})
+        if method == "GET" and path in API_FIXTURES:
+            token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+            if token not in self.server.tokens:
+                return self._send(401, {"error": "unauthorized"})
+            return self._send(200, API_FIXTURES[path])
+        self._send(404, {"error": "not found"})
+
+    def _site_landing(self, method, path, url, form):
+        self._html(landing_page())
+
+    def _site_vvapp(self, method, path, url, form):
+        if path.startswith("/vvapp/registration_ep.aspx"):
+            return self._html(employee_registration_page())
+        if path.startswith("/vvapp"):
+            return self._html(vvapp_login_page())
+        self._html(_page("Not found", "Not found"), status=404)
+
+    def _site_registration(self, method, path, url, form):
+        self._html(registration_page(form))
+
+    def _site_onboarding(self, method, path, url, form):
+        self._html(onboarding_page(form))
+
+    def _portal(self, site, method, path, url, form):
+        if path == "/login" and method == "POST":
+            if (form.get("username"), form.get("password")) != (VALID_USERNAME, VALID_PASSWORD):
+                return self._html(portal_login_page(error=True), status=401)
+            token = secrets.token_hex(16)
+            self.server.sessions[token] = form["username"]
+            return self._redirect("/", [("Set-Cookie", f"{SESSION_COOKIE}={token}; Path=/; Max-Age=3600; HttpOnly")])
+        username = self._session_user()
+        if username is None:
+            if path == "/":
+                return self._html(portal_login_page())
+            return self._redirect("/")
+        if path == "/":
+            return self._html(portal_dashboard(site, username))
+        if path == "/logout":
+            return self._redirect("/", [("Set-Cookie", f"{SESSION_COOKIE}=; Path=/; Max-Age=0")])
+        if path == "/search":
+            term = html.escape(parse_qs(url.query).get("q", [""])[0])
+            return self._html(_page("Search", f"<div id='search-results'>Results for {term}</div>"))
+        if path == "/orders/new":
+            if method == "POST":
+                return self._html(_page("Order created", (
+                    f"<div id='order-success-message'>{html.escape(form.get('order_type', ''))} order created</div>"
+                )))
+            return self._html(_page("New order", (
+                "<form method='post'><select name='order_type'><option>FREE_VOI</option>"
+                "<option>PAID_VOI</option><option>VOE</option></select>"
+                "<button type='submit'>Create</button></form>"
+            )))
+        match = re.fullmatch(r"/orders/(\d+)(/document\.pdf)?", path)
+        if match and match.group(2):
+            return self._send(200, self.server.stand_in.order_document(), "application/pdf",
+                              [("Content-Disposition", f"attachment; filename=order-{match.group(1)}.pdf")])
+        if match:
+            return self._html(order_page(match.group(1)))
+        if path == "/credit-cards/new":
+            if method == "POST":
+                return self._html(_page("Card added", "<div id='cc-success-message'>Card added</div>"))
+            return self._html(_page("Add card", _form([("cc_number", "Card number", "text"),
+                                                      ("cc_expiry", "Expiry", "text"),
+                                                      ("cc_cvc", "CVC", "text")])))
+        self._html(_page("Not found", "Not found"), status=404)
+
+    def _site_client(self, *args):
+        self._portal("client", *args)
+
+    def _site_employee(self, *args):
+        self._portal("employee", *args)
+
+    def _site_verifier(self, *args):
+        self._portal("verifier", *args)
+
+
+class StandInServer:
+    """Threaded local server; ``latency`` is in seconds, ``error_rate`` in 0..1.
+
+    ``fail(prefix, status)`` makes every path starting with ``prefix``
+    return ``status`` until ``clear_failures()`` is called.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, seed=None):
+        self.httpd = ThreadingHTTPServer((host, port), StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.tokens = set()
+        self.httpd.sessions = {}
+        self.httpd.stand_in = self
+        self.latency = latency
+        self.error_rate = error_rate
+        self.failures = {}
+        self.random = random.Random(seed)
+        self._document = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def fail(self, prefix, status=500):
+        self.failures[prefix] = status
+
+    def clear_failures(self):
+        self.failures.clear()
+
+    def order_document(self):
+        if self._document is None:
+            try:
+                with open(SAMPLE_ORDER_PDF, "rb") as f:
+                    self._document = f.read()
+            except OSError:
+                self._document = (b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj\n"
+                                  b"2 0 obj<</Type/Pages/Kids[]/Count 0>>endobj\ntrailer<</Root 1 0 R>>\n%%EOF\n")
+        return self._document
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def stand_in_pattern(hosts):
+    """Route pattern matching every URL on ``hosts``."""
+    return re.compile(rf"^https?://({'|'.join(re.escape(host) for host in hosts)})(:\d+)?(/|$)")
+
+
+def stand_in_request(server, hosts, url, headers):
+    """``(url, headers)`` that fetch ``url`` from ``server`` as the site its host maps to."""
+    url = urlsplit(url)
+    target = server.url + (url.path or "/") + (f"?{url.query}" if url.query else "")
+    headers = {**headers, SITE_HEADER: hosts[url.hostname]}
+    headers.pop("host", None)
+    return target, headers
+
+
+def route_to_stand_in(context, server, hosts=None):
+    """Serve requests for the vault hosts in ``context`` from ``server``."""
+    hosts = hosts or default_hosts()
+
+    def handle(route):
+        target, headers = stand_in_request(server, hosts, route.request.url, route.request.all_headers())
+        route.fulfill(response=route.fetch(url=target, headers=headers, max_redirects=0))
+
+    context.route(stand_in_pattern(hosts), handle)
+
+
+class ExternalStandIn:
+    """A stand-in server started by another process (STAND_IN_URL, see
+    common.browser_matrix); routing only needs its URL."""
+
+    def __init__(self, url):
+        self.url = url.rstrip("/")
+
+    def stop(self):
+        pass
+
+
+async def route_to_stand_in_async(context, server, hosts=None):
+    """route_to_stand_in for an async API context (common.async_runner)."""
+    hosts = hosts or default_hosts()
+
+    async def handle(route):
+        target, headers = stand_in_request(server, hosts, route.request.url, await route.request.all_headers())
+        await route.fulfill(response=await route.fetch(url=target, headers=headers, max_redirects=0))
+
+    await context.route(stand_in_pattern(hosts), handle)
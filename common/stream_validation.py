@@ -0,0 +1,321 @@
+# common/stream_validation.py
+#
+# Memory-bounded validation of large JSON API responses (payroll, roster).
+# The body is read in chunks and the record array is parsed one record at a
+# time; each record is checked against the endpoint's schema (compiled once)
+# and folded into single-pass aggregates: record count, duplicate ids and
+# column sums (checked against a "total" field when the payload has one).
+# Only a summary and a bounded sample (reservoir of records + first errors)
+# are attached to Allure, so memory and report size stay flat whatever the
+# payload size.
+#
+#   response = api_client.stream("/payroll-data")
+#   report = validate_response(response, "/payroll-data")
+#   assert report["invalid"] == 0
+
+import codecs
+import json
+import math
+import random
+import re
+import time
+
+import allure
+
+# Per endpoint: where the records live, field -> type(s), optional fields,
+# the id used for duplicate detection and the numeric fields to total
+ENDPOINTS = {
+    "/roster-data": {
+        "records_key": "records",
+        "fields": {"id": int, "first_name": str, "last_name": str},
+        "optional": (),
+        "id_field": "id",
+        "sum_fields": (),
+    },
+    "/payroll-data": {
+        "records_key": "records",
+        "fields": {"id": int, "employee_id": int, "gross_pay": (int, float)},
+        "optional": (),
+        "id_field": "id",
+        "sum_fields": ("gross_pay",),
+    },
+}
+
+CHUNK_SIZE = 1 << 16
+SAMPLE_SIZE = 20
+ERROR_SAMPLE_SIZE = 20
+_WHITESPACE = " \t\n\r"
+_DELIMITER = re.compile(r"[\s,\]}]")
+_NUMBER_START = "-0123456789"
+# A decode error this close to the end of the buffer may just be a value cut
+# off by the chunk boundary ("tru", "\u00"); anything earlier is malformed
+_TRUNCATION_SLACK = 16
+_decoder = json.JSONDecoder()
+_compiled = {}
+
+
+class StreamError(ValueError):
+    pass
+
+
+# --- incremental parsing -----------------------------------------------------
+
+class _Reader:
+    """Text buffer over an iterable of byte chunks, trimmed as it is consumed."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self):
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.bytes_read += len(chunk)
+            if self.pos > CHUNK_SIZE:
+                self.buffer, self.pos = self.buffer[self.pos:], 0
+            self.buffer += self._utf8.decode(chunk)
+            return True
+        self.buffer += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    def peek(self):
+        """Next non-whitespace character (not consumed), or '' at the end."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars):
+        char = self.peek()
+        if char not in chars or not char:
+            raise StreamError(f"Expected one of {chars!r} at byte ~{self.bytes_read}, got {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode one complete JSON value, reading more chunks until it is whole."""
+        if self.peek() in _NUMBER_START:
+            # A number is only complete once a delimiter follows it ("3" of "3.25")
+            while not self.eof and not _DELIMITER.search(self.buffer, self.pos):
+                self._fill()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                truncated = error.msg.startswith("Unterminated string") \
+                    or error.pos >= len(self.buffer) - _TRUNCATION_SLACK
+                # Malformed input fails straight away instead of reading the rest of the body
+                if truncated and self._fill():
+                    continue
+                raise StreamError(f"Invalid JSON near byte ~{self.bytes_read}: {error.msg}") from None
+            self.pos = end
+            return value
+
+
+def iter_records(chunks, records_key="records", extras=None):
+    """Yield the items of ``body[records_key]`` (or of a top-level array) one at a time.
+
+    Other top-level fields are decoded whole and stored in ``extras``.
+    """
+    reader = _Reader(chunks)
+    if reader.peek() == "[":
+        yield from _iter_array(reader)
+    else:
+        reader.expect("{")
+        if reader.peek() == "}":
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.value()
+                reader.expect(":")
+                if key == records_key and reader.peek() == "[":
+                    yield from _iter_array(reader)
+                else:
+                    value = reader.value()
+                    if extras is not None:
+                        extras[key] = value
+                if reader.expect(",}") == "}":
+                    break
+    if reader.peek():
+        raise StreamError("Trailing data after the JSON document")
+    if extras is not None:
+        extras["_bytes"] = reader.bytes_read
+
+
+def _iter_array(reader):
+    reader.expect("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.expect(",]") == "]":
+            return
+
+
+# --- schemas and aggregates --------------------------------------------------
+
+def compile_schema(endpoint):
+    """Validator for one endpoint's records, built once and cached."""
+    if endpoint in _compiled:
+        return _compiled[endpoint]
+    spec = ENDPOINTS[endpoint]
+    optional = set(spec.get("optional", ()))
+    checks = []
+    for field, types in spec["fields"].items():
+        types = types if isinstance(types, tuple) else (types,)
+        # bool is an int subclass; only accept it where bool is asked for
+        reject_bool = bool not in types
+        checks.append((field, types, field in optional, reject_bool))
+
+    def validate(record):
+        if not isinstance(record, dict):
+            return [f"record is {type(record).__name__}, not an object"]
+        errors = []
+        for field, types, is_optional, reject_bool in checks:
+            if field not in record:
+                if not is_optional:
+                    errors.append(f"missing {field}")
+                continue
+            value = record[field]
+            if not isinstance(value, types) or (reject_bool and isinstance(value, bool)):
+                errors.append(f"{field} is {type(value).__name__}")
+        return errors
+
+    _compiled[endpoint] = validate
+    return validate
+
+
+class _IdTracker:
+    """Duplicate detection: a bitmap for small non-negative int ids (1 bit per
+    possible id), falling back to a set for anything else."""
+
+    BITMAP_LIMIT = 1 << 27  # 16 MB of bitmap at most
+
+    def __init__(self):
+        self.bitmap = bytearray()
+        self.other = set()
+
+    def seen(self, value):
+        if isinstance(value, int) and not isinstance(value, bool) and 0 <= value < self.BITMAP_LIMIT:
+            byte, bit = divmod(value, 8)
+            if byte >= len(self.bitmap):
+                self.bitmap.extend(bytes(max(byte + 1 - len(self.bitmap), len(self.bitmap))))
+            if self.bitmap[byte] >> bit & 1:
+                return True
+            self.bitmap[byte] |= 1 << bit
+            return False
+        key = (type(value).__name__, value) if isinstance(value, (int, float, str)) else repr(value)
+        if key in self.other:
+            return True
+        self.other.add(key)
+        return False
+
+
+def validate_stream(chunks, endpoint, sample_size=SAMPLE_SIZE, seed=0):
+    """Validate a streamed body in one pass; returns a summary dict."""
+    spec = ENDPOINTS[endpoint]
+    validate = compile_schema(endpoint)
+    id_field = spec.get("id_field")
+    ids = _IdTracker()
+    sums = {field: [] for field in spec.get("sum_fields", ())}  # math.fsum partials
+    rng = random.Random(seed)
+    sample, error_sample, duplicate_sample = [], [], []
+    count = invalid = duplicates = 0
+    extras = {}
+    start = time.perf_counter()
+
+    for record in iter_records(chunks, spec.get("records_key", "records"), extras):
+        count += 1
+        errors = validate(record)
+        if errors:
+            invalid += 1
+            if len(error_sample) < ERROR_SAMPLE_SIZE:
+                error_sample.append({"index": count - 1, "errors": errors, "record": record})
+        if id_field and isinstance(record, dict) and id_field in record:
+            if ids.seen(record[id_field]):
+                duplicates += 1
+                if len(duplicate_sample) < ERROR_SAMPLE_SIZE:
+                    duplicate_sample.append(record[id_field])
+        for field, partials in sums.items():
+            value = record.get(field) if isinstance(record, dict) else None
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                _add_partial(partials, value)
+        # Reservoir sampling keeps a uniform sample of sample_size records
+        if len(sample) < sample_size:
+            sample.append(record)
+        else:
+            slot = rng.randrange(count)
+            if slot < sample_size:
+                sample[slot] = record
+
+    totals = {field: math.fsum(partials) for field, partials in sums.items()}
+    body_bytes = extras.pop("_bytes", 0)
+    report = {
+        "endpoint": endpoint,
+        "records": count,
+        "invalid": invalid,
+        "duplicate_ids": duplicates,
+        "sums": totals,
+        "fields": {key: value for key, value in extras.items() if not isinstance(value, (list, dict))},
+        "bytes": body_bytes,
+        "seconds": round(time.perf_counter() - start, 3),
+        "error_sample": error_sample,
+        "duplicate_id_sample": duplicate_sample,
+        "sample": sample,
+    }
+    report["total_mismatch"] = _check_total(extras, totals)
+    if "count" in extras and extras["count"] != count:
+        report["count_mismatch"] = {"declared": extras["count"], "actual": count}
+    return report
+
+
+def _add_partial(partials, value):
+    # Shewchuk's algorithm (as in math.fsum), so sums over millions of rows stay exact
+    i = 0
+    for partial in partials:
+        if abs(value) < abs(partial):
+            value, partial = partial, value
+        high = value + partial
+        low = partial - (high - value)
+        if low:
+            partials[i] = low
+            i += 1
+        value = high
+    partials[i:] = [value]
+
+
+def _check_total(extras, totals):
+    declared = extras.get("total")
+    if declared is None or len(totals) != 1:
+        return None
+    actual = next(iter(totals.values()))
+    if isinstance(declared, (int, float)) and math.isclose(declared, actual, rel_tol=1e-9, abs_tol=0.005):
+        return None
+    return {"declared": declared, "actual": actual}
+
+
+def validate_response(response, endpoint, chunk_size=CHUNK_SIZE):
+    """Stream a ``requests`` response (opened with stream=True) through validate_stream
+    and attach the summary and bounded samples to Allure."""
+    try:
+        report = validate_stream(response.iter_content(chunk_size=chunk_size), endpoint)
+    finally:
+        response.close()
+    summary = {key: value for key, value in report.items() if key not in ("sample", "error_sample")}
+    allure.attach(json.dumps(summary, indent=2), name=f"Validation summary {endpoint}",
+                  attachment_type=allure.attachment_type.JSON)
+    allure.attach(json.dumps({"sample": report["sample"], "errors": report["error_sample"]}, indent=2),
+                  name=f"Sample records {endpoint}", attachment_type=allure.attachment_type.JSON)
+    return report
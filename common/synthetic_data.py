@@ -0,0 +1,255 @@
+# common/synthetic_data.py
+#
+# Seeded, deterministic generator for large synthetic datasets in the column
+# schemas of the CSVs under data/:
+#
+#   registration  username,password,confirm_password,email,expected_result
+#   onboarding    first_name,last_name,expected_result
+#   login         username,password,expected_result (test_api_login)
+#
+# Every row is a pure function of (seed, schema, index), so rows are produced
+# on demand in constant memory and any shard can generate its own slice
+# without the rest. With SYNTH_ROWS > 0 the suites parametrize from
+# rows_for() instead of the CSV; SYNTH_SHARD=k/n keeps collection to every
+# n-th row starting at k, and rows only build their values when a test reads
+# them.
+#
+#   python -m common.synthetic_data registration --rows 1000000 --seed 7 > big.csv
+#   SYNTH_ROWS=100000 SYNTH_SHARD=3/8 pytest test_registration.py
+
+import argparse
+import csv
+import sys
+import zlib
+from collections.abc import Mapping, Sequence
+
+from common.config import Config
+from common.data_provider import read_test_data
+
+SCHEMAS = {
+    "registration": ["username", "password", "confirm_password", "email", "expected_result"],
+    "onboarding": ["first_name", "last_name", "expected_result"],
+    "login": ["username", "password", "expected_result"],
+}
+
+FIRST_NAMES = ["John", "Jane", "Maria", "Wei", "Aisha", "Carlos", "Olga", "Kwame", "Priya", "Liam"]
+LAST_NAMES = ["Doe", "Smith", "Garcia", "Chen", "Okafor", "Novak", "Patel", "Kim", "Silva", "Brown"]
+MALFORMED_EMAILS = ["{user}example.com", "{user}@", "@example.com", "{user}@@example.com",
+                    "{user} @example.com", "{user}@example"]
+
+
+_MASK = (1 << 64) - 1
+
+
+class _SplitMix64:
+    """Tiny seeded PRNG: a fresh stream per row costs a few integer ops (a
+    random.Random would spend most of a row's time seeding its state)."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, seed):
+        self.state = seed & _MASK
+
+    def next(self):
+        self.state = (self.state + 0x9E3779B97F4A7C15) & _MASK
+        z = self.state
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+        return z ^ (z >> 31)
+
+    def random(self):
+        return (self.next() >> 11) / 9007199254740992.0
+
+    def choice(self, sequence):
+        return sequence[self.next() % len(sequence)]
+
+
+def parse_mix(text):
+    """``"valid=0.7,duplicate=0.1"`` -> ``{"valid": 0.7, "duplicate": 0.1}``."""
+    mix = {}
+    for part in filter(None, (part.strip() for part in text.split(","))):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    return mix
+
+
+_PASSWORD_LETTERS = "abcdefghjkmnpqrstuvwxyz"
+
+
+def _password(rng):
+    # Six letters and three digits out of a single 64-bit draw
+    bits, letters = rng.next(), []
+    for _ in range(6):
+        bits, letter = divmod(bits, len(_PASSWORD_LETTERS))
+        letters.append(_PASSWORD_LETTERS[letter])
+    return "".join(letters) + f"{100 + bits % 900}A!"
+
+
+def _registration(rng, category, index, seed):
+    username = f"synth_{seed}_{index}"
+    password = _password(rng)
+    confirm_password, email, expected = password, f"{username}@example.com", "success"
+    if category == "duplicate":
+        username = rng.choice(Config.SYNTH_EXISTING_USERS)
+        email, expected = f"{username}@example.com", "error"
+    elif category == "mismatch":
+        confirm_password, expected = password[::-1], "error"
+    elif category == "malformed_email":
+        email, expected = rng.choice(MALFORMED_EMAILS).format(user=username), "error"
+    return (username, password, confirm_password, email, expected)
+
+
+def _onboarding(rng, category, index, seed):
+    first_name, last_name = rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)}{index}"
+    if category == "missing_name":
+        if rng.random() < 0.5:
+            first_name = ""
+        else:
+            last_name = " "
+        return (first_name, last_name, "error")
+    return (first_name, last_name, "success")
+
+
+def _login(rng, category, index, seed):
+    if category == "wrong_password":
+        return (Config.PORTAL_USERNAME, _password(rng), "error")
+    if category == "unknown_user":
+        return (f"nobody_{seed}_{index}", _password(rng), "error")
+    return (Config.PORTAL_USERNAME, Config.PORTAL_PASSWORD, "success")
+
+
+BUILDERS = {"registration": _registration, "onboarding": _onboarding, "login": _login}
+
+
+def default_mix(schema):
+    return parse_mix({"registration": Config.SYNTH_REGISTRATION_MIX, "onboarding": Config.SYNTH_ONBOARDING_MIX,
+                      "login": Config.SYNTH_LOGIN_MIX}[schema])
+
+
+class SyntheticData:
+    """``rows`` deterministic rows of ``schema``; ``row(i)`` costs the same for any ``i``."""
+
+    def __init__(self, schema, rows, seed=0, mix=None):
+        if schema not in SCHEMAS:
+            raise ValueError(f"Unknown schema {schema!r}; expected one of {sorted(SCHEMAS)}")
+        self.schema = schema
+        self.columns = SCHEMAS[schema]
+        self.rows = rows
+        self.seed = seed
+        self._stream = zlib.crc32(f"{seed}:{schema}".encode()) << 32
+        mix = default_mix(schema) if mix is None else mix
+        total = sum(mix.values())
+        if total <= 0:
+            raise ValueError(f"Mix for {schema!r} has no positive weights: {mix}")
+        self._cumulative = []
+        running = 0.0
+        for category, weight in mix.items():
+            running += weight / total
+            self._cumulative.append((running, category))
+
+    def category(self, rng):
+        draw = rng.random()
+        for threshold, category in self._cumulative:
+            if draw < threshold:
+                return category
+        return self._cumulative[-1][1]
+
+    def row(self, index):
+        """Values of row ``index`` as a tuple in column order."""
+        if not 0 <= index < self.rows:
+            raise IndexError(index)
+        rng = _SplitMix64(self._stream ^ index)
+        return BUILDERS[self.schema](rng, self.category(rng), index, self.seed)
+
+    def __iter__(self):
+        return (self.row(index) for index in range(self.rows))
+
+    def shard(self, index, count):
+        return LazyRows(self, range(index, self.rows, count))
+
+
+class SyntheticRow(Mapping):
+    """Row view that generates its values on first access, like data_provider.Row."""
+
+    __slots__ = ("data", "index", "_values")
+
+    def __init__(self, data, index):
+        self.data = data
+        self.index = index
+        self._values = None
+
+    def __getitem__(self, column):
+        if self._values is None:
+            self._values = dict(zip(self.data.columns, self.data.row(self.index)))
+        return self._values[column]
+
+    def __iter__(self):
+        return iter(self.data.columns)
+
+    def __len__(self):
+        return len(self.data.columns)
+
+    def __repr__(self):
+        return f"SyntheticRow({self.data.schema}[{self.index}])"
+
+
+class LazyRows(Sequence):
+    """Indexable selection of a SyntheticData's rows; nothing is generated up front."""
+
+    def __init__(self, data, indices):
+        self.data = data
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return LazyRows(self.data, self.indices[position])
+        return SyntheticRow(self.data, self.indices[position])
+
+
+def parse_shard(text):
+    """``"k/n"`` -> ``(k, n)``; empty means the whole set."""
+    if not text:
+        return 0, 1
+    index, _, count = text.partition("/")
+    index, count = int(index), int(count)
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard {text!r}: expected k/n with 0 <= k < n")
+    return index, count
+
+
+def rows_for(schema, csv_path):
+    """Parametrization source: the CSV, or this shard of the synthetic set if SYNTH_ROWS is set."""
+    if not Config.SYNTH_ROWS:
+        return read_test_data(csv_path)
+    return SyntheticData(schema, Config.SYNTH_ROWS, seed=Config.SYNTH_SEED).shard(*parse_shard(Config.SYNTH_SHARD))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a synthetic dataset as CSV")
+    parser.add_argument("schema", choices=sorted(SCHEMAS))
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=Config.SYNTH_SEED)
+    parser.add_argument("--mix", help="e.g. valid=0.7,duplicate=0.1,mismatch=0.1,malformed_email=0.1")
+    parser.add_argument("--shard", default="", help="k/n: only every n-th row starting at k")
+    parser.add_argument("--out", help="file to write (default: stdout)")
+    args = parser.parse_args(argv)
+
+    data = SyntheticData(args.schema, args.rows, args.seed, parse_mix(args.mix) if args.mix else None)
+    index, count = parse_shard(args.shard)
+    out = open(args.out, "w", newline="") if args.out else sys.stdout
+    try:
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(data.columns)
+        for position in range(index, data.rows, count):
+            writer.writerow(data.row(position))
+    finally:
+        if args.out:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
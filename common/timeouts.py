@@ -0,0 +1,197 @@
+# common/timeouts.py
+#
+# Adaptive per-selector timeouts. Pages handed out by the conftest fixtures
+# have wait_for_selector() instrumented: every successful wait is recorded per
+# environment (TEST_ENV), host and selector in a small local history file,
+# and once a selector has TIMEOUT_MIN_SAMPLES samples its timeout becomes
+#
+#   clamp(p99 * TIMEOUT_FACTOR, TIMEOUT_FLOOR_MS, TIMEOUT_CEILING_MS)
+#
+# instead of Playwright's default; an explicit timeout= at the call site is
+# kept. Entries in TIMEOUT_OVERRIDES_FILE always win, keyed by locator attribute
+# ("ReactEmployeePageLocators.DASHBOARD") or by raw selector:
+#
+#   {"ReactEmployeePageLocators.DASHBOARD": 15000, "#order-success-message": 10000}
+#
+#   python -m common.timeouts            # report learned timeouts
+#   python -m common.timeouts --env ci   # for one environment
+
+import argparse
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from common.config import Config
+from common.json_files import load_json, update_json
+from common.locator_registry import get_registry
+
+logger = logging.getLogger(__name__)
+
+MAX_SAMPLES = 200  # per selector, newest kept
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(len(ordered) * p / 100) - 1)]
+
+
+def locator_names(registry=None):
+    """``{selector: ["Class.ATTR", ...]}`` for every registered locator, original and rewritten."""
+    registry = registry or get_registry()
+    names = {}
+    for (class_name, name), entry in registry.entries.items():
+        for selector in {entry["original"], entry["rewritten"]}:
+            names.setdefault(selector, []).append(f"{class_name}.{name}")
+    return names
+
+
+class TimeoutPolicy:
+    def __init__(self, history_file=None, environment=None, factor=None, floor_ms=None, ceiling_ms=None,
+                 min_samples=None, overrides_file=None):
+        self.history_file = history_file or Config.TIMEOUT_HISTORY_FILE
+        self.environment = environment or Config.TEST_ENV
+        self.factor = factor or Config.TIMEOUT_FACTOR
+        self.floor_ms = Config.TIMEOUT_FLOOR_MS if floor_ms is None else floor_ms
+        self.ceiling_ms = ceiling_ms or Config.TIMEOUT_CEILING_MS
+        self.min_samples = min_samples or Config.TIMEOUT_MIN_SAMPLES
+        self.history = load_json(self.history_file).get(self.environment, {})
+        self.overrides = self._resolve_overrides(load_json(overrides_file or Config.TIMEOUT_OVERRIDES_FILE))
+        self._new = {}  # host -> selector -> {"samples": [...], "timeouts": n} recorded this run
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resolve_overrides(overrides):
+        names = locator_names()
+        resolved = {}
+        for key, value in overrides.items():
+            resolved[key] = value
+            for selector, labels in names.items():
+                if key in labels:
+                    resolved[selector] = value
+        return resolved
+
+    def learned(self, host, selector):
+        """Learned timeout in ms, or None while there is too little history."""
+        entry = self.history.get(host, {}).get(selector)
+        if not entry or len(entry["samples"]) < self.min_samples:
+            return None
+        value = percentile(entry["samples"], 99) * self.factor
+        return round(min(self.ceiling_ms, max(self.floor_ms, value)))
+
+    def timeout_for(self, host, selector, default=None):
+        """Override, else the call-site ``default``, else the learned timeout (None: Playwright's)."""
+        if selector in self.overrides:
+            return self.overrides[selector]
+        if default is not None:
+            return default
+        return self.learned(host, selector)
+
+    def record(self, host, selector, elapsed_ms, found=True):
+        with self._lock:
+            entry = self._new.setdefault(host, {}).setdefault(selector, {"samples": [], "timeouts": 0})
+            if found:
+                entry["samples"].append(round(elapsed_ms, 1))
+            else:
+                entry["timeouts"] += 1
+
+    def instrument(self, page):
+        """Wrap ``page.wait_for_selector`` to apply and learn timeouts."""
+        original = page.wait_for_selector
+
+        def wait_for_selector(selector, *, timeout=None, **kwargs):
+            host = urlsplit(page.url).netloc
+            effective = self.timeout_for(host, selector, timeout)
+            start = time.perf_counter()
+            try:
+                element = original(selector, timeout=effective, **kwargs)
+            except PlaywrightTimeoutError:
+                self.record(host, selector, (time.perf_counter() - start) * 1000, found=False)
+                raise
+            self.record(host, selector, (time.perf_counter() - start) * 1000)
+            return element
+
+        page.wait_for_selector = wait_for_selector
+        return page
+
+    def save(self):
+        """Merge this run's samples into the history file, under its file lock."""
+        if not self._new:
+            return None
+
+        def merge(history):
+            environment = history.setdefault(self.environment, {})
+            for host, selectors in self._new.items():
+                for selector, new in selectors.items():
+                    entry = environment.setdefault(host, {}).setdefault(selector, {"samples": [], "timeouts": 0})
+                    entry["samples"] = (entry["samples"] + new["samples"])[-MAX_SAMPLES:]
+                    entry["timeouts"] += new["timeouts"]
+            return history
+
+        update_json(self.history_file, merge)
+        self._new = {}
+        return self.history_file
+
+    def report(self):
+        names = locator_names()
+        rows = []
+        for host, selectors in sorted(self.history.items()):
+            for selector, entry in sorted(selectors.items()):
+                samples = entry["samples"]
+                rows.append({
+                    "host": host,
+                    "selector": selector,
+                    "locators": names.get(selector, []),
+                    "samples": len(samples),
+                    "timeouts": entry["timeouts"],
+                    "p50_ms": percentile(samples, 50) if samples else None,
+                    "p99_ms": percentile(samples, 99) if samples else None,
+                    "learned_ms": self.learned(host, selector),
+                    "override_ms": self.overrides.get(selector),
+                })
+        return rows
+
+
+_policy = None
+
+
+def get_policy():
+    global _policy
+    if _policy is None:
+        _policy = TimeoutPolicy()
+    return _policy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report learned per-selector timeouts")
+    parser.add_argument("--env", default=Config.TEST_ENV)
+    parser.add_argument("--history", default=Config.TIMEOUT_HISTORY_FILE)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    rows = TimeoutPolicy(history_file=args.history, environment=args.env).report()
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    if not rows:
+        print(f"No history for environment {args.env!r} in {args.history}")
+        return 0
+    print(f"Environment {args.env!r}")
+    for row in rows:
+        label = ", ".join(row["locators"]) or row["selector"]
+        p50 = "-" if row["p50_ms"] is None else f"{row['p50_ms']:.0f}ms"
+        p99 = "-" if row["p99_ms"] is None else f"{row['p99_ms']:.0f}ms"
+        learned = "-" if row["learned_ms"] is None else f"{row['learned_ms']}ms"
+        override = f", override {row['override_ms']}ms" if row["override_ms"] is not None else ""
+        print(f"{row['host']:35} {label:55} n={row['samples']:<4} timeouts={row['timeouts']:<3} "
+              f"p50 {p50:>7} p99 {p99:>7} -> {learned}{override}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# common/tracing.py
+#
+# Failure-triggered tracing without recording every test. Each browser
+# context from the pool gets a small in-memory ring buffer of what happened
+# recently:
+#   * page actions (goto, click, fill, wait_for_selector, ...) with timings;
+#   * main-frame navigations, console messages and page errors;
+#   * responses and failed requests;
+#   * a DOM snapshot per loaded document, taken just before the next action.
+# Events older than TRACE_BUFFER_SECONDS, or beyond TRACE_BUFFER_MB per
+# context, fall off the front. Nothing is written for passing tests; when a
+# test fails or times out the buffers, plus the final DOM and a screenshot of
+# every open page, are written to TRACE_DIR/<test>.zip and attached to Allure.
+#
+# Bookkeeping time is measured per test and reported at the end of the run,
+# so the cost of TRACE_MODE=on-failure stays visible (TRACE_MODE=off
+# disables it).
+
+import functools
+import json
+import logging
+import os
+import re
+import time
+import zipfile
+from collections import deque
+
+import allure
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from common.config import Config
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("goto", "reload", "go_back", "click", "dblclick", "fill", "type", "press", "check", "uncheck",
+           "select_option", "set_input_files", "hover", "wait_for_selector", "wait_for_url", "wait_for_load_state")
+MODES = ("on-failure", "off")
+TIMELINE_EVENTS = 40  # events shown in the Allure timeline attachment
+MAX_TEXT = 500
+
+
+def _describe(args, kwargs):
+    parts = [repr(arg) for arg in args] + [f"{key}={value!r}" for key, value in kwargs.items()]
+    return ", ".join(parts)[:MAX_TEXT]
+
+
+class TraceRing:
+    """Recent events of one browser context, bounded by age and size."""
+
+    def __init__(self, max_age, max_bytes, dom_snapshots=True):
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.dom_snapshots = dom_snapshots
+        self.started = time.monotonic()
+        self.events = deque()  # (monotonic time, kind, data, size)
+        self.bytes = 0
+        self.dropped = 0
+        self.overhead = 0.0  # seconds spent on bookkeeping and snapshots
+        self.pages = []
+        self._loaded = set()  # pages with a document not yet snapshotted
+
+    def record(self, kind, **data):
+        start = time.perf_counter()
+        now = time.monotonic()
+        size = 32 + sum(len(value) if isinstance(value, str) else 8 for value in data.values())
+        self.events.append((now, kind, data, size))
+        self.bytes += size
+        while self.events and (self.bytes > self.max_bytes or now - self.events[0][0] > self.max_age):
+            self.bytes -= self.events.popleft()[3]
+            self.dropped += 1
+        self.overhead += time.perf_counter() - start
+
+    def install(self, context):
+        context.on("page", self.attach)
+        context.on("response", self._on_response)
+        context.on("requestfailed", self._on_request_failed)
+
+    def attach(self, page):
+        if page in self.pages:
+            return
+        self.pages.append(page)
+        index = len(self.pages) - 1
+        page.on("framenavigated", functools.partial(self._on_navigated, page, index))
+        page.on("load", lambda _: self._loaded.add(index))
+        page.on("console", lambda message: self.record("console", page=index, type=message.type,
+                                                         text=message.text[:MAX_TEXT]))
+        page.on("pageerror", lambda error: self.record("pageerror", page=index, error=str(error)[:MAX_TEXT]))
+        for name in ACTIONS:
+            setattr(page, name, self._wrap(page, index, name, getattr(page, name)))
+
+    def _on_navigated(self, page, index, frame):
+        if frame == page.main_frame:
+            self.record("navigation", page=index, url=frame.url)
+
+    def _on_response(self, response):
+        self.record("response", method=response.request.method, url=response.url, status=response.status)
+
+    def _on_request_failed(self, request):
+        self.record("requestfailed", method=request.method, url=request.url, failure=request.failure or "")
+
+    def _wrap(self, page, index, name, original):
+        @functools.wraps(original)
+        def action(*args, **kwargs):
+            if self.dom_snapshots and index in self._loaded:
+                self.snapshot(page, index)
+            start, error = time.perf_counter(), None
+            try:
+                return original(*args, **kwargs)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}"[:MAX_TEXT]
+                raise
+            finally:
+                self.record("action", page=index, name=name, args=_describe(args, kwargs),
+                            ms=round((time.perf_counter() - start) * 1000, 1), error=error)
+        return action
+
+    def snapshot(self, page, index):
+        self._loaded.discard(index)
+        start = time.perf_counter()
+        try:
+            html = page.content()
+        except Exception:  # navigating or closed
+            return
+        finally:
+            self.overhead += time.perf_counter() - start
+        self.record("dom", page=index, url=page.url, html=html)
+
+
+class FailureTracer:
+    def __init__(self, mode=None, directory=None, max_age=None, max_mb=None, dom_snapshots=None):
+        self.mode = mode or Config.TRACE_MODE
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown TRACE_MODE {self.mode!r}; expected one of {', '.join(MODES)}")
+        self.directory = directory or Config.TRACE_DIR
+        self.max_age = max_age or Config.TRACE_BUFFER_SECONDS
+        self.max_bytes = int((max_mb or Config.TRACE_BUFFER_MB) * 1024 * 1024)
+        self.dom_snapshots = Config.TRACE_DOM_SNAPSHOTS if dom_snapshots is None else dom_snapshots
+        self._rings = []
+        self.stats = {"tests": 0, "overhead_seconds": 0.0, "events": 0, "dropped": 0,
+                      "archives": 0, "archive_bytes": 0, "capture_seconds": 0.0}
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def install(self, context):
+        """Context hook (BrowserPool.context_hooks): give the context a ring buffer."""
+        ring = TraceRing(self.max_age, self.max_bytes, self.dom_snapshots)
+        ring.install(context)
+        self._rings.append(ring)
+
+    def start_test(self):
+        self._rings = []
+
+    def finish_test(self, nodeid, error=None):
+        """Account for the test's tracing cost; on failure write and attach its trace archive."""
+        rings, self._rings = self._rings, []
+        if not rings:
+            return None
+        self.stats["tests"] += 1
+        self.stats["overhead_seconds"] += sum(ring.overhead for ring in rings)
+        self.stats["events"] += sum(len(ring.events) + ring.dropped for ring in rings)
+        self.stats["dropped"] += sum(ring.dropped for ring in rings)
+        if error is None:
+            return None
+        start = time.perf_counter()
+        path = self.write_archive(nodeid, error, rings)
+        self.stats["capture_seconds"] += time.perf_counter() - start
+        self.stats["archives"] += 1
+        self.stats["archive_bytes"] += os.path.getsize(path)
+        allure.attach(self.timeline(rings), name="Trace timeline", attachment_type=allure.attachment_type.TEXT)
+        allure.attach.file(path, name="Failure trace", extension="zip")
+        return path
+
+    def write_archive(self, nodeid, error, rings):
+        os.makedirs(self.directory, exist_ok=True)
+        slug = re.sub(r"[^\w.-]+", "_", nodeid).strip("_")[:150]
+        path = os.path.join(self.directory, f"{slug}.zip")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        summary = {"test": nodeid, "error": f"{type(error).__name__}: {error}"[:MAX_TEXT * 4],
+                   "timed_out": isinstance(error, (PlaywrightTimeoutError, TimeoutError)),
+                   "buffer_seconds": self.max_age, "buffer_bytes": self.max_bytes, "contexts": []}
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for number, ring in enumerate(rings):
+                prefix = f"context-{number}/"
+                lines = []
+                for position, (at, kind, data, _) in enumerate(ring.events):
+                    data = dict(data)
+                    if "html" in data:
+                        data["file"] = f"{prefix}dom/{position:04d}.html"
+                        archive.writestr(data["file"], data.pop("html"))
+                    lines.append(json.dumps({"t": round(at - ring.started, 3), "kind": kind, **data}))
+                archive.writestr(f"{prefix}events.jsonl", "\n".join(lines))
+                for index, page in enumerate(ring.pages):
+                    if page.is_closed():
+                        continue
+                    try:
+                        archive.writestr(f"{prefix}page-{index}/final.html", page.content())
+                        archive.writestr(f"{prefix}page-{index}/final.png", page.screenshot(type="png"))
+                    except Exception as capture_error:  # crashed page: the buffer is still useful
+                        logger.warning("Final capture of page %d failed: %s", index, capture_error)
+                summary["contexts"].append({"events": len(ring.events), "dropped": ring.dropped,
+                                            "buffered_bytes": ring.bytes, "pages": len(ring.pages),
+                                            "overhead_ms": round(ring.overhead * 1000, 1)})
+            archive.writestr("summary.json", json.dumps(summary, indent=2))
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def timeline(rings):
+        events = sorted(((at, number, kind, data) for number, ring in enumerate(rings)
+                         for at, kind, data, _ in ring.events), key=lambda event: event[0])
+        start = min(ring.started for ring in rings)
+        lines = []
+        for at, number, kind, data in events[-TIMELINE_EVENTS:]:
+            detail = " ".join(f"{key}={value}" for key, value in data.items() if key != "html" and value is not None)
+            lines.append(f"{at - start:8.3f}s  ctx{number}  {kind:13} {detail}")
+        return "\n".join(lines)
+
+    def report(self):
+        stats = dict(self.stats)
+        stats["overhead_ms_per_test"] = round(stats["overhead_seconds"] * 1000 / max(1, stats["tests"]), 2)
+        return stats
+
+
+_tracer = None
+
+
+def get_tracer():
+    global _tracer
+    if _tracer is None:
+        _tracer = FailureTracer()
+    return _tracer
@@ -0,0 +1,366 @@
+# common/visual.py
+#
+# Visual regression for the screenshots the suites already take. With
+# VISUAL_MODE=report (or fail) every attach_screenshot() also captures a
+# lossless PNG and compares it with the stored baseline for the same test,
+# screenshot name, browser engine and viewport:
+#
+#   1. a pre-filter on the raw bytes: only tiles (VISUAL_TILE px) with at
+#      least one differing byte become candidates, so no change is missed;
+#   2. a batched pixel diff of the candidate tiles only, counting pixels whose
+#      largest channel delta exceeds VISUAL_PIXEL_THRESHOLD.
+#
+# Dynamic regions (dates, user names) are masked per screenshot through
+# VISUAL_MASKS_FILE: {"<fnmatch pattern on 'nodeid::name'>": {"selectors":
+# [...], "regions": [[x, y, w, h], ...]}}. Selectors are painted over by
+# Playwright and their boxes are excluded from the comparison as well.
+#
+# Comparisons run on a process pool (VISUAL_WORKERS, default one per core)
+# while the test continues; results and diff images are attached to Allure
+# once the call phase ends. A missing baseline is recorded from the current
+# run (VISUAL_UPDATE=true re-records all of them). A whole run can also be
+# compared, or accepted, in one batch:
+#
+#   python -m common.visual              # compare VISUAL_RUN_DIR with the baselines
+#   python -m common.visual --accept     # make the run's screenshots the new baselines
+#
+# Needs numpy and Pillow; without them the checks are skipped with a warning.
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import allure
+
+from common.config import Config
+
+try:
+    import numpy as np
+except ImportError:  # visual regression is optional
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MAX_REGIONS = 50  # changed tiles listed per result
+
+
+def options_from_config():
+    return {"tile": Config.VISUAL_TILE, "pixel_threshold": Config.VISUAL_PIXEL_THRESHOLD, "max_diff_ratio": Config.VISUAL_MAX_DIFF_RATIO}
+
+
+def _pad(image, tile):
+    # Zero padding is identical in both images, so it never counts as a difference
+    height, width = image.shape[:2]
+    return np.pad(image, ((0, -height % tile), (0, -width % tile), (0, 0)))
+
+
+def _tiles(image, tile):
+    """``(rows, cols, tile, tile, channels)`` view of an image padded to whole tiles."""
+    height, width, channels = image.shape
+    return image.reshape(height // tile, tile, width // tile, tile, channels).swapaxes(1, 2)
+
+
+def mask_regions(image, regions):
+    """Copy of ``image`` with every ``[x, y, w, h]`` region blacked out; also returns the masked pixel count."""
+    image = image.copy()
+    mask = np.zeros(image.shape[:2], dtype=bool)
+    for x, y, w, h in regions:
+        mask[max(0, int(y)):max(0, int(y + h)), max(0, int(x)):max(0, int(x + w))] = True
+    image[mask] = 0
+    return image, int(mask.sum())
+
+
+def compare_arrays(baseline, actual, regions=(), tile=32, pixel_threshold=16, max_diff_ratio=0.001):
+    """Compare two ``(height, width, 3)`` uint8 images; returns ``(result, changed-pixel mask or None)``."""
+    if baseline.shape != actual.shape:
+        return {"status": "size-mismatch", "passed": False, "baseline_size": list(baseline.shape[1::-1]),
+                "actual_size": list(actual.shape[1::-1])}, None
+    height, width = actual.shape[:2]
+    baseline, masked = mask_regions(baseline, regions)
+    actual, _ = mask_regions(actual, regions)
+    result = {"status": "identical", "passed": True, "size": [width, height], "masked_pixels": masked,
+              "candidate_tiles": 0, "changed_pixels": 0, "diff_ratio": 0.0, "changed_regions": []}
+    if np.array_equal(baseline, actual):
+        return result, None
+
+    padded_baseline, padded_actual = _pad(baseline, tile), _pad(actual, tile)
+    rows, cols = padded_actual.shape[0] // tile, padded_actual.shape[1] // tile
+    # Pre-filter: tiles with any differing byte. A plain uint8 comparison is
+    # cheap and, unlike downscaled means, cannot hide content that moved
+    # within a block (text shifted by a pixel)
+    candidates = _tiles(padded_baseline != padded_actual, tile).any(axis=(2, 3, 4))
+    tile_rows, tile_cols = np.nonzero(candidates)
+
+    # Pixel diff of all candidate tiles as one (candidates, tile, tile, channels) batch
+    batch_baseline = _tiles(padded_baseline, tile)[tile_rows, tile_cols].astype(np.int16)
+    batch_actual = _tiles(padded_actual, tile)[tile_rows, tile_cols]
+    changed = np.abs(batch_actual - batch_baseline).max(axis=-1) > pixel_threshold
+    counts = changed.sum(axis=(1, 2))
+
+    changed_mask = np.zeros((rows * tile, cols * tile), dtype=bool)
+    _tiles(changed_mask[..., None], tile)[tile_rows, tile_cols] = changed[..., None]
+    changed_pixels = int(counts.sum())
+    diff_ratio = changed_pixels / max(1, height * width - masked)
+    result.update(
+        status="passed" if diff_ratio <= max_diff_ratio else "failed",
+        passed=diff_ratio <= max_diff_ratio,
+        candidate_tiles=len(tile_rows),
+        changed_pixels=changed_pixels,
+        diff_ratio=round(diff_ratio, 6),
+        changed_regions=[[int(col) * tile, int(row) * tile, tile, tile]
+                         for row, col in zip(tile_rows[counts > 0], tile_cols[counts > 0])][:MAX_REGIONS],
+    )
+    return result, changed_mask[:height, :width]
+
+
+def diff_image(actual, changed_mask, regions=()):
+    """Faded copy of ``actual`` with changed pixels in red and masked regions in grey."""
+    image = ((actual.astype(np.uint16) + 2 * 255) // 3).astype(np.uint8)
+    for x, y, w, h in regions:
+        image[max(0, int(y)):max(0, int(y + h)), max(0, int(x)):max(0, int(x + w))] = 160
+    image[changed_mask] = (255, 0, 0)
+    return image
+
+
+def _load(path):
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def _regions(png_path):
+    try:
+        with open(os.path.splitext(png_path)[0] + ".json") as f:
+            return json.load(f).get("regions", [])
+    except (OSError, ValueError):
+        return []
+
+
+def compare_files(baseline_path, actual_path, diff_path, options):
+    """Process-pool entry point: compare two PNGs, masking both images' recorded regions."""
+    with open(baseline_path, "rb") as f:
+        baseline_raw = f.read()
+    with open(actual_path, "rb") as f:
+        actual_raw = f.read()
+    regions = _regions(baseline_path) + _regions(actual_path)
+    if baseline_raw == actual_raw:
+        return {"status": "identical", "passed": True, "diff": None}
+    actual = _load(actual_path)
+    result, changed_mask = compare_arrays(_load(baseline_path), actual, regions, **options)
+    result["diff"] = None
+    if changed_mask is not None and result["changed_pixels"]:
+        os.makedirs(os.path.dirname(diff_path), exist_ok=True)
+        Image.fromarray(diff_image(actual, changed_mask, regions)).save(diff_path)
+        result["diff"] = diff_path
+    return result
+
+
+def screenshot_key(nodeid, name):
+    return f"{nodeid}::{name}"
+
+
+def _filename(key):
+    slug = re.sub(r"[^\w.-]+", "_", key).strip("_")[:120]
+    return f"{slug}-{hashlib.sha1(key.encode()).hexdigest()[:8]}.png"
+
+
+def _write(path, data, mode="wb"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, mode) as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def promote(actual_path, baseline_path):
+    """Make a captured screenshot (and its sidecar) the baseline."""
+    os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+    for extension in (".png", ".json"):
+        source = os.path.splitext(actual_path)[0] + extension
+        if os.path.exists(source):
+            shutil.copyfile(source, os.path.splitext(baseline_path)[0] + extension)
+
+
+class VisualRegression:
+    def __init__(self, mode=None, baseline_dir=None, run_dir=None, masks_file=None, update=None, workers=None,
+                 options=None):
+        self.mode = mode or Config.VISUAL_MODE
+        self.baseline_dir = baseline_dir or Config.VISUAL_BASELINE_DIR
+        self.run_dir = run_dir or Config.VISUAL_RUN_DIR
+        self.masks_file = masks_file or Config.VISUAL_MASKS_FILE
+        self.update = Config.VISUAL_UPDATE if update is None else update
+        self.workers = workers or Config.VISUAL_WORKERS or os.cpu_count()
+        self.options = options or options_from_config()
+        if self.mode != "off" and (np is None or Image is None):
+            logger.warning("numpy and Pillow are needed for visual regression; VISUAL_MODE=%s ignored", self.mode)
+            self.mode = "off"
+        self._masks = None
+        self._executor = None
+        self._pending = []
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    @property
+    def masks(self):
+        if self._masks is None:
+            try:
+                with open(self.masks_file) as f:
+                    self._masks = json.load(f)
+            except (OSError, ValueError):
+                self._masks = {}
+        return self._masks
+
+    def masks_for(self, key):
+        """Selectors and regions of every masks-file pattern matching ``key``."""
+        selectors, regions = [], []
+        for pattern, mask in self.masks.items():
+            if fnmatch.fnmatchcase(key, pattern):
+                selectors += mask.get("selectors", [])
+                regions += mask.get("regions", [])
+        return selectors, regions
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            # spawn: the test process runs Playwright's driver threads, which must not be forked
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def start_test(self):
+        self._pending = []
+
+    def variant(self, page):
+        """Baselines are kept per browser engine and viewport."""
+        browser = page.context.browser
+        viewport = page.viewport_size or {"width": 0, "height": 0}
+        return f"{browser.browser_type.name if browser else 'browser'}-{viewport['width']}x{viewport['height']}"
+
+    def check(self, page, name, nodeid=None):
+        """Capture ``page`` and queue its comparison with the baseline for ``name``."""
+        if not self.enabled:
+            return
+        nodeid = nodeid or os.environ.get("PYTEST_CURRENT_TEST", "adhoc").rsplit(" ", 1)[0]
+        key = screenshot_key(nodeid, name)
+        selectors, regions = self.masks_for(key)
+        try:
+            masks = [page.locator(selector) for selector in selectors]
+            for locator in masks:
+                for element in locator.all():
+                    box = element.bounding_box()
+                    if box:
+                        regions.append([box["x"], box["y"], box["width"], box["height"]])
+            raw = page.screenshot(type="png", scale="css", animations="disabled", caret="hide", mask=masks)
+        except Exception as error:  # page already closed or crashed
+            logger.warning("Visual check %r failed: %s", name, error)
+            return
+        variant, filename = self.variant(page), _filename(key)
+        actual_path = os.path.join(self.run_dir, "actual", variant, filename)
+        baseline_path = os.path.join(self.baseline_dir, variant, filename)
+        _write(actual_path, raw)
+        _write(os.path.splitext(actual_path)[0] + ".json", json.dumps({"key": key, "regions": regions}), "w")
+        if self.update or not os.path.exists(baseline_path):
+            promote(actual_path, baseline_path)
+            self._pending.append((name, {"status": "new-baseline", "passed": True, "baseline": baseline_path}))
+            return
+        diff_path = os.path.join(self.run_dir, "diff", variant, filename)
+        self._pending.append((name, self.executor.submit(compare_files, baseline_path, actual_path, diff_path,
+                                                         self.options)))
+
+    def finish_test(self):
+        """Attach every queued comparison to Allure; returns the names that differ from their baseline."""
+        mismatches = []
+        for name, pending in self._pending:
+            result = pending if isinstance(pending, dict) else pending.result()
+            if not result["passed"]:
+                mismatches.append(name)
+            allure.attach(json.dumps(result, indent=2), name=f"Visual: {name}",
+                          attachment_type=allure.attachment_type.JSON)
+            if result.get("diff"):
+                allure.attach.file(result["diff"], name=f"Visual diff: {name}",
+                                   attachment_type=allure.attachment_type.PNG)
+        self.start_test()
+        return mismatches
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+_visual = None
+
+
+def get_visual():
+    global _visual
+    if _visual is None:
+        _visual = VisualRegression()
+    return _visual
+
+
+def compare_run(run_dir=None, baseline_dir=None, workers=None, accept=False):
+    """Compare every screenshot of a run with its baseline across cores; ``{actual path: result}``."""
+    run_dir = run_dir or Config.VISUAL_RUN_DIR
+    baseline_dir = baseline_dir or Config.VISUAL_BASELINE_DIR
+    actual_root = os.path.join(run_dir, "actual")
+    jobs = {}
+    for directory, _, files in os.walk(actual_root):
+        for filename in files:
+            if filename.endswith(".png"):
+                relative = os.path.relpath(os.path.join(directory, filename), actual_root)
+                jobs[os.path.join(actual_root, relative)] = relative
+    results = {}
+    if accept:
+        for actual_path, relative in jobs.items():
+            promote(actual_path, os.path.join(baseline_dir, relative))
+            results[actual_path] = {"status": "new-baseline", "passed": True}
+        return results
+    options = options_from_config()
+    with ProcessPoolExecutor(max_workers=workers or Config.VISUAL_WORKERS or os.cpu_count()) as executor:
+        futures = {}
+        for actual_path, relative in jobs.items():
+            baseline_path = os.path.join(baseline_dir, relative)
+            if not os.path.exists(baseline_path):
+                results[actual_path] = {"status": "no-baseline", "passed": False}
+                continue
+            futures[actual_path] = executor.submit(compare_files, baseline_path, actual_path,
+                                                   os.path.join(run_dir, "diff", relative), options)
+        for actual_path, future in futures.items():
+            results[actual_path] = future.result()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a run's screenshots with the visual baselines")
+    parser.add_argument("--run-dir", default=Config.VISUAL_RUN_DIR)
+    parser.add_argument("--baseline-dir", default=Config.VISUAL_BASELINE_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--accept", action="store_true", help="make the run's screenshots the new baselines")
+    args = parser.parse_args(argv)
+    if np is None or Image is None:
+        parser.error("numpy and Pillow are required")
+    results = compare_run(args.run_dir, args.baseline_dir, args.workers, args.accept)
+    _write(os.path.join(args.run_dir, "report.json"), json.dumps(results, indent=2), "w")
+    failed = {path: result for path, result in results.items() if not result["passed"]}
+    for path, result in sorted(failed.items()):
+        detail = f" ({result['diff_ratio']:.4%} of pixels changed)" if "diff_ratio" in result else ""
+        print(f"  {result['status']}: {path}{detail}")
+    print(f"{len(results)} screenshots, {len(failed)} differ from their baseline")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,254 @@
+import functools
 import pytest
-from playwright.sync_api import sync_playwright
+from common.api_client import ApiClient, extract_token
+from common.async_runner import AsyncRunner, deselect_sync_twins, is_async_smoke
+from common.attachments import get_pipeline
+from common.auth_state import AuthStateCache
+from common.browser_pool import BrowserPool
+from common.checkpoints import Flow, get_store
+from common.config import Config
+from common.downloads import get_cache
+from common.health import HealthGate, target_url
+from common.impact import ImpactIndex, select
+from common.locator_registry import get_registry
+from common.network import HarCache, block_resources
+from common import perf
+from common.results_store import compact_all
+from common.stand_in import ExternalStandIn, StandInServer, default_hosts, route_to_stand_in
+from common.timeouts import get_policy
+from common.tracing import get_tracer
+from common.visual import get_visual
 
 @pytest.fixture(scope="session")
 def browser_context_args(browser_context_args):
     return {**browser_context_args, "viewport": {"width": 1280, "height": 720}}
 
+def pytest_addoption(parser):
+    parser.addoption("--impact-index", action="store_true",
+                     help="save the change-impact index (IMPACT_INDEX_FILE) without selecting tests")
+
+def pytest_configure(config):
+    # STAND_IN=true swaps every portal and the API for the local stand-in server;
+    # started here so module-level Config lookups in the suites already see it
+    config.stand_in = None
+    if Config.STAND_IN_URL:
+        # Shared with the other lanes of a browser matrix run (common.browser_matrix)
+        config.stand_in = ExternalStandIn(Config.STAND_IN_URL)
+        Config.API_BASE_URL = config.stand_in.url
+    elif Config.STAND_IN:
+        config.stand_in = StandInServer(latency=Config.STAND_IN_LATENCY_MS / 1000,
+                                        error_rate=Config.STAND_IN_ERROR_RATE).start()
+        Config.API_BASE_URL = config.stand_in.url
+    # A mistyped TRACE_MODE stops the run here instead of erroring every test
+    try:
+        get_tracer()
+    except ValueError as error:
+        raise pytest.UsageError(str(error)) from None
+    # Before collection, so every test module sees the rewritten locator classes
+    if Config.LOCATOR_REWRITE:
+        get_registry().apply()
+    config.health_gate = None
+    # Replayed HARs are served offline, so there is nothing to probe
+    if Config.HEALTH_CHECK and Config.NETWORK_MODE != "replay":
+        redirects = {host: config.stand_in.url for host in default_hosts()} if config.stand_in else None
+        config.health_gate = HealthGate(redirects=redirects)
+
+def pytest_unconfigure(config):
+    if getattr(config, "stand_in", None) is not None:
+        config.stand_in.stop()
+
+@pytest.fixture(scope="session")
+def stand_in(pytestconfig):
+    if pytestconfig.stand_in is None:
+        pytest.skip("Stand-in server disabled (set STAND_IN=true)")
+    return pytestconfig.stand_in
+
+def _target(item):
+    marker = item.get_closest_marker("target")
+    return target_url(marker.args[0]) if marker else None
+
+def pytest_collection_modifyitems(config, items):
+    # With IMPACT_BASE only affected tests run, last failures first; --impact-index only refreshes the index
+    if Config.IMPACT_BASE or config.getoption("impact_index"):
+        index = ImpactIndex(root=str(config.rootpath))
+        if Config.IMPACT_BASE:
+            cache = getattr(config, "cache", None)
+            last_failed = cache.get("cache/lastfailed", {}) if cache else {}
+            selected, deselected, reason = select(items, index, Config.IMPACT_BASE, last_failed,
+                                                  str(config.rootpath))
+            if deselected:
+                config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+            config.get_terminal_writer().line(f"Impact selection: {reason}")
+        else:
+            for item in items:
+                index.item_deps(item)
+        index.save()
+    if Config.ASYNC_MODE:
+        # Smoke tests whose async twin was collected run in test_react_async.py instead
+        deselect_sync_twins(config, items)
+    # Probe every environment the selected tests need once, before any browser starts
+    gate = config.health_gate
+    if gate is not None:
+        for url, (healthy, detail) in gate.check_targets(filter(None, map(_target, items))).items():
+            if not healthy:
+                config.get_terminal_writer().line(f"Health check: {url} is unreachable ({detail})", yellow=True)
+
+def pytest_runtest_setup(item):
+    get_pipeline().start_test()
+    get_visual().start_test()
+    get_tracer().start_test()
+    # Skip (or fail) straight away while the target's circuit is open
+    gate, url = item.config.health_gate, _target(item)
+    if gate is not None and url:
+        reason = gate.check(url)
+        if reason:
+            if Config.HEALTH_ACTION == "fail":
+                pytest.fail(f"Target unavailable: {reason}", pytrace=False)
+            pytest.skip(f"Target unavailable: {reason}")
+
+# Screenshots are captured/attached once the test body has finished, so the
+# on-failure policy can still reach the page before fixtures tear it down
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    outcome = yield
+    failed = outcome.excinfo is not None and not isinstance(outcome.excinfo[1], pytest.skip.Exception)
+    # The visual check can still fail the test, so it runs before anything that reports the outcome
+    mismatches = get_visual().finish_test()
+    if mismatches and not failed and Config.VISUAL_MODE == "fail":
+        outcome.force_exception(AssertionError(f"Screenshots differ from their baseline: {', '.join(mismatches)}"))
+        failed = True
+    get_pipeline().finish_test(failed)
+    get_tracer().finish_test(item.nodeid, outcome.excinfo[1] if failed else None)
+    if Config.CHECKPOINTS:
+        get_store().record_outcome(item.nodeid, failed)
+
+def pytest_sessionfinish(session):
+    # Fold this worker's save_data() journal into data/stored_data.json
+    compact_all()
+    get_pipeline().close()
+    get_visual().close()
+    perf.write_summary()
+    if Config.ADAPTIVE_TIMEOUTS:
+        get_policy().save()
+    if Config.CHECKPOINTS:
+        get_store().save_outcomes()
+    get_cache().save()
+
+def pytest_terminal_summary(terminalreporter):
+    tracer = get_tracer()
+    if tracer.enabled and tracer.stats["tests"]:
+        stats = tracer.report()
+        terminalreporter.write_line(
+            f"Failure tracing: {stats['tests']} tests, {stats['overhead_ms_per_test']} ms overhead per test, "
+            f"{stats['archives']} trace archives ({stats['archive_bytes'] // 1024} KB) in {tracer.directory}")
+
+@pytest.fixture(scope="session")
+def browser_pool(pytestconfig, browser_type, browser_type_launch_args):
+    pool = BrowserPool(browser_type, browser_type_launch_args,
+                       max_contexts=Config.POOL_MAX_CONTEXTS, max_rss_mb=Config.POOL_MAX_RSS_MB)
+    if pytestconfig.stand_in is not None:
+        pool.context_hooks.append(functools.partial(route_to_stand_in, server=pytestconfig.stand_in))
+    if Config.PERF_METRICS:
+        pool.context_hooks.append(perf.install)
+    if pytestconfig.health_gate is not None:
+        pool.context_hooks.append(pytestconfig.health_gate.install)
+    if Config.NETWORK_MODE == "replay":
+        pool.context_hooks.append(HarCache().replay)
+    if get_tracer().enabled:
+        pool.context_hooks.append(get_tracer().install)
+    # Registered last so blocking and stubbing take precedence over other routes
+    if Config.BLOCK_RESOURCES or Config.STUB_HOSTS:
+        pool.context_hooks.append(block_resources)
+    yield pool
+    pool.close()
+
+# Always the pool's current browser, so pytest-playwright's context/page survive a recycle
+@pytest.fixture(scope="session")
+def browser(browser_pool):
+    return browser_pool.proxy
+
+@pytest.fixture(scope="session")
+def har_cache():
+    return HarCache()
+
+def _record_args(request, har_cache):
+    # NETWORK_MODE=record captures one HAR per portal (named after the test module) and process
+    if Config.NETWORK_MODE != "record":
+        return None, {}
+    portal = request.module.__name__.rpartition(".")[2].removeprefix("test_")
+    return portal, har_cache.record_args(portal)
+
+# Fresh, isolated context and page per test from the shared browser pool
+@pytest.fixture(scope="function")
+def setup_teardown(request, browser_pool, browser_context_args, har_cache):
+    portal, record_args = _record_args(request, har_cache)
+    context = browser_pool.new_context(**browser_context_args, **record_args)
+    page = context.new_page()
+    get_pipeline().track(page)
+    if Config.ADAPTIVE_TIMEOUTS:
+        get_policy().instrument(page)
+    yield page
+    browser_pool.release(context)
+    if portal:
+        har_cache.index_har(portal)
+
+@pytest.fixture(scope="session")
+def auth_state(browser_pool, browser_context_args):
+    return AuthStateCache(browser_pool, browser_context_args)
+
+def _authenticated_page(request, browser_pool, auth_state, har_cache, role):
+    portal, record_args = _record_args(request, har_cache)
+    context, page = auth_state.open_page(role, **record_args)
+    get_pipeline().track(page)
+    if Config.ADAPTIVE_TIMEOUTS:
+        get_policy().instrument(page)
+    yield page
+    browser_pool.release(context)
+    if portal:
+        har_cache.index_har(portal)
+
+# Pages that start on the portal dashboard, already signed in for the role
+@pytest.fixture(scope="function")
+def client_page(request, browser_pool, auth_state, har_cache):
+    yield from _authenticated_page(request, browser_pool, auth_state, har_cache, "client")
+
+@pytest.fixture(scope="function")
+def employee_page(request, browser_pool, auth_state, har_cache):
+    yield from _authenticated_page(request, browser_pool, auth_state, har_cache, "employee")
+
+@pytest.fixture(scope="function")
+def verifier_page(request, browser_pool, auth_state, har_cache):
+    yield from _authenticated_page(request, browser_pool, auth_state, har_cache, "verifier")
+
+# Flow checkpoints for the current test, already resumed where allowed (see common.checkpoints)
+@pytest.fixture(scope="function")
+def checkpoint_flow(request):
+    def make(page, name, steps, *depends_on, until=None):
+        flow = Flow(page, name, steps, depends_on, nodeid=request.node.nodeid)
+        flow.resume(until)
+        return flow
+    return make
+
+# ASYNC_MODE: every selected async scenario runs concurrently on first use (see common.async_runner)
+@pytest.fixture(scope="session")
+def async_smoke(request, auth_state, browser_type, browser_type_launch_args, browser_context_args):
+    gate = request.config.health_gate
+    nodeids = [item.callspec.params["nodeid"] for item in request.session.items
+               if is_async_smoke(item) and (gate is None or gate.check(_target(item)) is None)]
+    runner = AsyncRunner(auth_state, browser_type.name, browser_type_launch_args, browser_context_args,
+                         stand_in=request.config.stand_in)
+    return runner.run_in_thread(nodeids)
+
+# One keep-alive API session per run, authenticated once via api_login
 @pytest.fixture(scope="session")
-def browser():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        yield browser
-        browser.close()
+def api_client():
+    token = Config.API_TOKEN
+    if not token:
+        from common.functions import api_login
+        token = extract_token(api_login(Config.API_BASE_URL, Config.PORTAL_USERNAME, Config.PORTAL_PASSWORD))
+    client = ApiClient(Config.API_BASE_URL, token=token)
+    if Config.API_FAN_OUT:
+        client.prefetch()
+    yield client
+    client.close()
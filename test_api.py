@@ -1,11 +1,17 @@
 import pytest
 import allure
-from common.functions import read_test_data, api_login, save_data
+from common.config import Config
+from common.functions import api_login
+from common.results_store import save_data
+from common.stream_validation import validate_response
+from common.synthetic_data import rows_for
 
-BASE_URL = "http://your-vault-system-api-url"  # Update with your API URL
+BASE_URL = Config.API_BASE_URL
 
+pytestmark = pytest.mark.target("api")
 
-@pytest.mark.parametrize("data", read_test_data("data/test_data.csv"))
+
+@pytest.mark.parametrize("data", rows_for("login", "data/test_data.csv"))
 @allure.severity(allure.severity_level.CRITICAL)
 @allure.feature("API Login Tests")
 @allure.story("API Login Functionality")
@@ -52,13 +58,18 @@ def test_wapi_voi_match(api_client):
 
 @pytest.mark.api
 def test_roster_data(api_client):
-    response = api_client.get("/roster-data")
+    response = api_client.stream("/roster-data")
     assert response.status_code == 200, "Roster data API call successful"
-    allure.attach(response.text, name="Response Body", attachment_type=allure.attachment_type.JSON)
+    report = validate_response(response, "/roster-data")
+    assert report["invalid"] == 0, f"Invalid roster records: {report['error_sample']}"
+    assert report["duplicate_ids"] == 0, f"Duplicate roster ids: {report['duplicate_id_sample']}"
 
 
 @pytest.mark.api
 def test_payroll_data(api_client):
-    response = api_client.get("/payroll-data")
+    response = api_client.stream("/payroll-data")
     assert response.status_code == 200, "Payroll data API call successful"
-    allure.attach(response.text, name="Response Body", attachment_type=allure.attachment_type.JSON)
+    report = validate_response(response, "/payroll-data")
+    assert report["invalid"] == 0, f"Invalid payroll records: {report['error_sample']}"
+    assert report["duplicate_ids"] == 0, f"Duplicate payroll ids: {report['duplicate_id_sample']}"
+    assert report["total_mismatch"] is None, f"Payroll total does not match: {report['total_mismatch']}"
@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from common.api_client import ApiClient, FAN_OUT_ENDPOINTS, extract_token
+from common.stand_in import StandInServer
+from common.stream_validation import validate_response
+
+
+@pytest.fixture(scope="module")
+def stand_in():
+    with StandInServer() as server:
+        yield server
+
+
+@pytest.fixture
+def client(stand_in):
+    client = ApiClient(stand_in.url)
+    login = client.post("/login", json={"username": "valid_username", "password": "valid_password"})
+    client.set_token(extract_token(login))
+    yield client
+    client.close()
+
+
+@pytest.mark.api
+def test_rejects_requests_without_token(stand_in):
+    client = ApiClient(stand_in.url)
+    assert client.get("/wapi/term-ee").status_code == 401
+    client.close()
+
+
+@pytest.mark.api
+def test_prefetched_responses_are_served_once(client):
+    client.prefetch()
+    for path in FAN_OUT_ENDPOINTS:
+        assert client.latencies[path], f"Latency recorded for {path}"
+
+    response = client.get("/wapi/voe-match")
+    assert response.status_code == 200
+    assert len(response.json()["matches"]) == 1
+    client.get("/wapi/voe-match")
+    assert len(client.latencies["/wapi/voe-match"]) == 2, "Second call goes to the server"
+
+
+@pytest.mark.api
+def test_prefetch_works_inside_a_running_event_loop(client):
+    async def fixture_setup():
+        client.prefetch(["/wapi/term-ee"])
+
+    asyncio.run(fixture_setup())
+    assert client.get("/wapi/term-ee").status_code == 200
+    assert len(client.latencies["/wapi/term-ee"]) == 1, "Served from the prefetch"
+
+
+@pytest.mark.api
+def test_streamed_payroll_is_validated(client):
+    report = validate_response(client.stream("/payroll-data"), "/payroll-data")
+    assert report["records"] == 5
+    assert report["invalid"] == 0 and report["duplicate_ids"] == 0
+    assert report["sums"]["gross_pay"] == 15000.0 and report["total_mismatch"] is None
+
+
+def _response(body):
+    def json():
+        if isinstance(body, Exception):
+            raise body
+        return body
+    return SimpleNamespace(json=json, text=str(body))
+
+
+def test_extract_token_accepts_dict_bodies_only():
+    assert extract_token(_response({"access_token": "abc"})) == "abc"
+    for body in ({"token": ""}, ["abc"], "abc", None, ValueError("Expecting value")):
+        with pytest.raises(ValueError, match="No auth token"):
+            extract_token(_response(body))
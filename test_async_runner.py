@@ -0,0 +1,139 @@
+import asyncio
+import sys
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from common import async_runner
+from common.async_runner import SCENARIOS, AsyncRunner, Outcome, SessionRejected, deselect_sync_twins, scenario
+
+
+@pytest.fixture
+def scenarios(monkeypatch):
+    monkeypatch.setattr(async_runner, "SCENARIOS", {})
+    return async_runner.SCENARIOS
+
+
+def test_scenario_takes_node_id_and_role_from_the_sync_test(scenarios, monkeypatch):
+    suite = ModuleType("fake_employee_suite")
+    suite.pytestmark = pytest.mark.target("employee")
+    monkeypatch.setitem(sys.modules, suite.__name__, suite)
+
+    def test_dashboard_display_employee():
+        pass
+
+    test_dashboard_display_employee.__module__ = suite.__name__
+
+    @scenario(test_dashboard_display_employee)
+    async def dashboard(page):
+        return "ok"
+
+    registered = scenarios["test_async_runner.py::test_dashboard_display_employee"]
+    assert (registered.role, registered.func) == ("employee", dashboard)
+    assert SCENARIOS is not scenarios, "The module-level registry is left untouched"
+
+    del suite.pytestmark
+    with pytest.raises(ValueError):
+        scenario(test_dashboard_display_employee)(dashboard)
+
+
+class FakeItem:
+    def __init__(self, nodeid, twin=None):
+        self.nodeid = nodeid
+        if twin is not None:
+            self.originalname = "test_async_smoke"
+            self.callspec = SimpleNamespace(params={"nodeid": twin})
+
+
+def test_sync_twins_of_collected_scenarios_are_deselected():
+    deselected = []
+    config = SimpleNamespace(hook=SimpleNamespace(pytest_deselected=lambda items: deselected.extend(items)))
+    items = [FakeItem("test_react_employee.py::test_new_order_free_voi"),
+             FakeItem("test_react_employee.py::test_logout"),
+             FakeItem("test_react_async.py::test_async_smoke[test_new_order_free_voi]",
+                      twin="test_react_employee.py::test_new_order_free_voi")]
+    deselect_sync_twins(config, items)
+    assert [item.nodeid for item in items] == ["test_react_employee.py::test_logout",
+                                               "test_react_async.py::test_async_smoke[test_new_order_free_voi]"]
+    assert [item.nodeid for item in deselected] == ["test_react_employee.py::test_new_order_free_voi"]
+
+
+class FakeContext:
+    closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePage:
+    async def screenshot(self, **kwargs):
+        return b"jpeg"
+
+
+def _run_one(func, fail_open=False):
+    runner = AsyncRunner(auth=object(), concurrency=1, browsers=1)
+    context = FakeContext()
+
+    async def open_page(role):
+        if fail_open:
+            raise RuntimeError("login failed")
+        return context, FakePage()
+
+    runner.open_page = open_page
+    item = async_runner.Scenario("test_x.py::test_y", "client", func)
+    outcome = asyncio.run(runner._run_one(asyncio.Semaphore(1), item))
+    return outcome, context
+
+
+def test_outcomes_report_value_error_and_screenshot():
+    async def passes(page):
+        return {"valid": True}
+
+    async def fails(page):
+        raise AssertionError("Dashboard loaded")
+
+    outcome, context = _run_one(passes)
+    assert outcome.passed and outcome.value == {"valid": True} and outcome.screenshot is None
+    assert context.closed
+
+    outcome, context = _run_one(fails)
+    assert not outcome.passed and isinstance(outcome.error, AssertionError)
+    assert outcome.screenshot == b"jpeg" and outcome.duration >= 0
+    assert context.closed, "The context is closed after a failure too"
+
+    outcome, _ = _run_one(passes, fail_open=True)
+    assert str(outcome.error) == "login failed" and outcome.screenshot is None
+    assert Outcome("n").passed
+
+
+
+class FakeAuth:
+    def __init__(self):
+        self.calls = []
+
+    def storage_state(self, role):
+        self.calls.append(("login", role))
+
+    def invalidate(self, role):
+        self.calls.append(("invalidate", role))
+
+
+def test_rejected_sessions_log_in_again_and_rerun_once(scenarios):
+    auth = FakeAuth()
+    runner = AsyncRunner(auth)
+    scenarios["a"] = async_runner.Scenario("a", "employee", None)
+    scenarios["b"] = async_runner.Scenario("b", "client", None)
+    runs = []
+
+    def run(nodeids):
+        runs.append(nodeids)
+        if len(runs) == 1:
+            return {"a": Outcome("a", error=SessionRejected("employee")), "b": Outcome("b")}
+        return {nodeid: Outcome(nodeid) for nodeid in nodeids}
+
+    runner._run_in_thread = run
+    outcomes = runner.run_in_thread(["a", "b"])
+    assert runs == [["a", "b"], ["a"]]
+    assert all(outcome.passed for outcome in outcomes.values())
+    assert sorted(auth.calls[:2]) == [("login", "client"), ("login", "employee")]
+    assert auth.calls[2:] == [("invalidate", "employee"), ("login", "employee")]
@@ -0,0 +1,75 @@
+import os
+from common import attachments
+from common.attachments import ScreenshotPipeline
+
+
+class FakePage:
+    def __init__(self, image=b"\xff\xd8 jpeg bytes"):
+        self.image = image
+        self.calls = 0
+
+    def screenshot(self, **kwargs):
+        self.calls += 1
+        self.types = getattr(self, "types", []) + [kwargs["type"]]
+        return self.image
+
+
+def _pipeline(tmp_path, policy, keep_steps=False):
+    return ScreenshotPipeline(policy=policy, image_format="jpeg", spool_dir=str(tmp_path), workers=1,
+                              keep_steps=keep_steps)
+
+
+def test_on_failure_policy_captures_once_at_failure(tmp_path):
+    pipeline, page = _pipeline(tmp_path, "on-failure"), FakePage()
+    pipeline.start_test()
+    pipeline.capture(page, "Step one")
+    pipeline.capture(page, "Step two")
+    pipeline.finish_test(failed=False)
+    assert page.calls == 0, "Nothing captured for a passing test"
+
+    pipeline.start_test()
+    pipeline.capture(page, "Step one")
+    pipeline.capture(page, "Step two")
+    pipeline.finish_test(failed=True)
+    assert page.calls == 1 and page.types == ["jpeg"]
+    assert len(os.listdir(tmp_path)) == 1
+    pipeline.close()
+
+
+def test_keep_steps_keeps_the_capture_time_image(tmp_path, monkeypatch):
+    monkeypatch.setattr(attachments, "Image", None)  # PNG attached as captured
+    pipeline, page = _pipeline(tmp_path, "on-failure", keep_steps=True), FakePage(b"\x89PNG step one")
+    pipeline.start_test()
+    pipeline.capture(page, "Success Screenshot")
+    pipeline.finish_test(failed=False)
+    assert page.calls == 1 and page.types == ["png"], "Raw PNG taken when requested"
+    assert os.listdir(tmp_path) == [], "Nothing encoded or spooled for a passing test"
+
+    pipeline.start_test()
+    pipeline.capture(page, "Step one")
+    page.image = b"\x89PNG later state"
+    pipeline.finish_test(failed=True)
+    assert page.calls == 2, "No new capture at the end of the test"
+    [spooled] = os.listdir(tmp_path)
+    assert (tmp_path / spooled).read_bytes() == b"\x89PNG step one"
+    pipeline.close()
+
+
+def test_failure_without_request_captures_tracked_page(tmp_path):
+    pipeline, page = _pipeline(tmp_path, "on-failure"), FakePage()
+    pipeline.start_test()
+    pipeline.track(page)
+    pipeline.finish_test(failed=True)
+    assert page.calls == 1
+    pipeline.close()
+
+
+def test_identical_screenshots_are_spooled_once(tmp_path):
+    pipeline = _pipeline(tmp_path, "always")
+    pipeline.start_test()
+    pipeline.capture(FakePage(), "First")
+    pipeline.capture(FakePage(), "Second")
+    pipeline.capture(FakePage(b"other"), "Third")
+    pipeline.finish_test(failed=False)
+    assert len(os.listdir(tmp_path)) == 2
+    pipeline.close()
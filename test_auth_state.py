@@ -0,0 +1,141 @@
+import json
+import os
+import sys
+import time
+import types
+
+import pytest
+
+from common import auth_state
+from common.auth_state import AuthStateCache
+
+URL = "https://portal.example.com"
+
+
+class FakeLocators:
+    DASHBOARD = "#dashboard"
+    USERNAME_INPUT = "#username"
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+
+    def goto(self, url):
+        self.context.pool.visits.append(url)
+
+    def wait_for_selector(self, selector):
+        if self.context.pool.fail_waits:
+            raise TimeoutError(selector)
+
+    def query_selector(self, selector):
+        # The first signed-in pages land on the login form while the pool says so
+        pool = self.context.pool
+        if pool.rejections:
+            pool.rejections -= 1
+            return None
+        return object()
+
+
+class FakeContext:
+    def __init__(self, pool, storage_state=None):
+        self.pool = pool
+        self.storage_state_path = storage_state
+
+    def new_page(self):
+        return FakePage(self)
+
+    def storage_state(self, path):
+        with open(path, "w") as f:
+            json.dump({"cookies": self.pool.cookies, "origins": []}, f)
+
+
+class FakePool:
+    def __init__(self, cookies=(), rejections=0, fail_waits=False):
+        self.cookies = list(cookies)
+        self.rejections = rejections
+        self.fail_waits = fail_waits
+        self.visits, self.contexts, self.released = [], [], []
+
+    def new_context(self, **kwargs):
+        context = FakeContext(self, kwargs.get("storage_state"))
+        self.contexts.append(context)
+        return context
+
+    def release(self, context):
+        self.released.append(context)
+
+
+@pytest.fixture
+def portal(monkeypatch):
+    logins = []
+    functions = types.ModuleType("common.functions")
+    functions.login = lambda page, username, password: logins.append(username)
+    monkeypatch.setitem(sys.modules, "common.functions", functions)
+    monkeypatch.setattr(auth_state, "portal_for", lambda role: (URL, FakeLocators))
+    return logins
+
+
+def _write_state(cache, role, cookies, age=0):
+    os.makedirs(cache.state_dir, exist_ok=True)
+    with open(cache.path(role), "w") as f:
+        json.dump({"cookies": cookies, "origins": []}, f)
+    mtime = time.time() - age
+    os.utime(cache.path(role), (mtime, mtime))
+
+
+def test_state_goes_stale_after_its_ttl(tmp_path):
+    cache = AuthStateCache(FakePool(), state_dir=str(tmp_path), ttl=60)
+    assert not cache.is_fresh("employee"), "No state file yet"
+    _write_state(cache, "employee", [], age=30)
+    assert cache.is_fresh("employee")
+    _write_state(cache, "employee", [], age=90)
+    assert not cache.is_fresh("employee")
+
+
+def test_state_with_an_expired_cookie_is_stale(tmp_path):
+    cache = AuthStateCache(FakePool(), state_dir=str(tmp_path), ttl=0)
+    _write_state(cache, "employee", [{"name": "session", "expires": -1},
+                                     {"name": "token", "expires": time.time() + 60}])
+    assert cache.is_fresh("employee"), "Session cookies and future expiries are fine"
+    _write_state(cache, "employee", [{"name": "token", "expires": time.time() - 1}])
+    assert not cache.is_fresh("employee")
+
+
+def test_stale_state_is_refreshed_by_logging_in_once(tmp_path, portal):
+    pool = FakePool(cookies=[{"name": "session", "expires": -1}])
+    cache = AuthStateCache(pool, state_dir=str(tmp_path), ttl=60, username="employee1")
+    _write_state(cache, "employee", [], age=90)
+
+    path = cache.storage_state("employee")
+    assert portal == ["employee1"]
+    assert pool.released == pool.contexts[:1], "The login context goes back to the pool"
+    with open(path) as f:
+        assert json.load(f)["cookies"] == pool.cookies
+    assert cache.storage_state("employee") == path and portal == ["employee1"], "Fresh state is reused"
+
+
+def test_open_page_logs_in_again_once_when_the_session_is_rejected(tmp_path, portal):
+    pool = FakePool(rejections=1)
+    cache = AuthStateCache(pool, state_dir=str(tmp_path), ttl=60)
+    _write_state(cache, "employee", [])
+
+    context, page = cache.open_page("employee")
+    assert len(portal) == 1, "Invalidated, then refreshed once"
+    assert pool.released == pool.contexts[:2], "Rejected context and login context released"
+    assert context is pool.contexts[2] and context not in pool.released
+
+    pool.rejections = 2
+    os.remove(cache.path("employee"))
+    with pytest.raises(RuntimeError):
+        cache.open_page("employee")
+    assert pool.contexts[-1] in pool.released, "Gives up after one retry without leaking contexts"
+
+
+def test_open_page_releases_the_context_when_the_page_fails(tmp_path, portal):
+    pool = FakePool(fail_waits=True)
+    cache = AuthStateCache(pool, state_dir=str(tmp_path), ttl=60)
+    _write_state(cache, "employee", [])
+    with pytest.raises(TimeoutError):
+        cache.open_page("employee")
+    assert pool.released == pool.contexts
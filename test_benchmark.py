@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from common import benchmark
+from common.benchmark import compare, measure
+
+
+class FakeClock:
+    """perf_counter() that advances by the next duration each time fn runs."""
+
+    def __init__(self, durations_ms):
+        self.now = 0.0
+        self.durations = list(durations_ms)
+
+    def perf_counter(self):
+        return self.now
+
+    def run(self, *state):
+        self.now += self.durations.pop(0) / 1000
+
+
+def test_measure_reports_median_p95_and_min(monkeypatch):
+    clock = FakeClock([5, 1, 4, 2, 3, 100, 6, 7, 8, 9])
+    monkeypatch.setattr(benchmark.time, "perf_counter", clock.perf_counter)
+    result = measure(clock.run, 10)
+    assert result["runs"] == 10
+    assert result["median_ms"] == pytest.approx(5.5)
+    assert result["min_ms"] == pytest.approx(1)
+    assert result["p95_ms"] == pytest.approx(9), "p95 of 10 samples is the 9th smallest"
+
+
+def test_measure_passes_setup_state_and_tears_down(monkeypatch):
+    clock = FakeClock([2, 2, 2])
+    monkeypatch.setattr(benchmark.time, "perf_counter", clock.perf_counter)
+    states = iter(["a", "b", "c"])
+    seen, torn_down = [], []
+
+    def fn(state):
+        seen.append(state)
+        clock.run()
+
+    result = measure(fn, 3, setup=lambda: next(states), teardown=torn_down.append)
+    assert seen == torn_down == ["a", "b", "c"]
+    assert result["median_ms"] == pytest.approx(2)
+
+
+def test_compare_flags_only_medians_past_the_threshold():
+    baseline = {"data.parse": {"median_ms": 10.0}, "save.append": {"median_ms": 1.0},
+                "attach.png": {"median_ms": 4.0}}
+    results = {"data.parse": {"median_ms": 12.0}, "save.append": {"median_ms": 1.3},
+               "attach.png": {"median_ms": 2.0}, "selectors.new": {"median_ms": 99.0}}
+    assert compare(results, baseline, 0.2) == [("save.append", 1.0, 1.3)]
+    assert compare(results, baseline, 0.1) == [("data.parse", 10.0, 12.0), ("save.append", 1.0, 1.3)]
+    assert compare(results, {}, 0.2) == []
+
+
+def test_missing_baseline_fails_the_comparison(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(benchmark, "run", lambda *args: {"data.parse": {"median_ms": 3.0, "p95_ms": 4.0}})
+    path = tmp_path / "baseline.json"
+    assert benchmark.main(["--only", "data", "--baseline", str(path)]) == 2
+    assert "No baseline" in capsys.readouterr().out
+
+    assert benchmark.main(["--only", "data", "--baseline", str(path), "--save-baseline"]) == 0
+    assert json.loads(path.read_text())["data.parse"]["median_ms"] == 3.0
+    assert benchmark.main(["--only", "data", "--baseline", str(path)]) == 0
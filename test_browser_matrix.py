@@ -0,0 +1,62 @@
+import os
+
+from common import browser_matrix
+from common.browser_matrix import _junit_cases, lane, summarize
+
+JUNIT = """<?xml version="1.0" encoding="utf-8"?>
+<testsuites><testsuite name="pytest">
+  <testcase classname="test_login" name="test_login_page[{engine}]" time="{login}"/>
+  <testcase classname="test_login" name="test_login[{engine}-valid_user]" time="1.0"/>
+  <testcase classname="test_login" name="test_login[invalid-user-{engine}]" time="1.0">{failure}</testcase>
+  <testcase classname="test_api" name="test_health" time="0.1"><skipped message="no API"/></testcase>
+  <testcase classname="test_visual" name="test_layout[{engine}-row-{engine}x]" time="0.5"><error message="boom"/></testcase>
+</testsuite></testsuites>
+"""
+
+
+def _write(tmp_path, engine, login, failure=""):
+    path = tmp_path / f"{engine}.xml"
+    path.write_text(JUNIT.format(engine=engine, login=login, failure=failure))
+    return str(path)
+
+
+def test_junit_ids_drop_the_engine_parameter(tmp_path):
+    cases = _junit_cases(_write(tmp_path, "firefox", 2.5), "firefox")
+    assert cases == {
+        "test_login::test_login_page": ("passed", 2.5),
+        "test_login::test_login[valid_user]": ("passed", 1.0),
+        "test_login::test_login[invalid-user]": ("passed", 1.0),
+        "test_api::test_health": ("skipped", 0.1),
+        "test_visual::test_layout[row-firefoxx]": ("error", 0.5),
+    }
+    assert _junit_cases(str(tmp_path / "missing.xml"), "webkit") == {}
+
+
+def test_summary_reports_differing_outcomes_and_slowdowns(tmp_path):
+    chromium = _junit_cases(_write(tmp_path, "chromium", 1.0), "chromium")
+    webkit = _junit_cases(_write(tmp_path, "webkit", 3.0, '<failure message="Expected LOGIN"/>'), "webkit")
+    summary = summarize({"chromium": chromium, "webkit": webkit}, {"chromium": 10.0, "webkit": 12.345})
+
+    assert summary["engines"]["chromium"] == {"passed": 3, "failed": 0, "error": 1, "skipped": 1,
+                                              "test_seconds": 3.6, "wall_seconds": 10.0}
+    assert summary["engines"]["webkit"]["failed"] == 1
+    assert summary["engines"]["webkit"]["wall_seconds"] == 12.35
+    assert summary["differing_outcomes"] == ["test_login::test_login[invalid-user]"]
+    assert summary["tests"]["test_login::test_login[invalid-user]"]["webkit"] == {"outcome": "failed",
+                                                                                  "seconds": 1.0}
+    assert summary["slowest_relative"][0] == {"test": "test_login::test_login_page", "fastest": "chromium",
+                                              "slowest": "webkit", "ratio": 3.0}
+    assert [spread["ratio"] for spread in summary["slowest_relative"]] == [3.0, 1.0]
+
+
+def test_lanes_get_their_own_state_directories(tmp_path):
+    results = str(tmp_path)
+    command, env = lane("firefox", results, ["-m", "smoke"], {"API_TOKEN": "t"})
+    assert command[-2:] == ["-m", "smoke"]
+    assert f"--alluredir={os.path.join(results, 'firefox', 'allure-results')}" in command
+    assert f"--junitxml={os.path.join(results, 'firefox.xml')}" in command
+    assert env["API_TOKEN"] == "t" and env["TEST_ENV"].endswith("-firefox")
+    other = lane("webkit", results, [])[1]
+    for name in browser_matrix.LANE_STATE:
+        assert env[name].startswith(os.path.join(results, "firefox"))
+        assert env[name] != other[name]
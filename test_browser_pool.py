@@ -0,0 +1,120 @@
+from common import browser_pool
+from common.browser_pool import BrowserPool
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.handlers = {}
+        self.closed = False
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def close(self):
+        self.closed = True
+        if "close" in self.handlers:
+            self.handlers["close"](self)
+
+
+class FakeBrowser:
+    def __init__(self, number):
+        self.number = number
+        self.connected = True
+        self.version = f"v{number}"
+
+    def is_connected(self):
+        return self.connected
+
+    def new_context(self, **context_args):
+        return FakeContext(self)
+
+    def close(self):
+        self.connected = False
+
+
+class FakeBrowserType:
+    name = "chromium"
+
+    def __init__(self):
+        self.launched = []
+
+    def launch(self, **launch_args):
+        self.launched.append(FakeBrowser(len(self.launched)))
+        return self.launched[-1]
+
+
+def test_browser_is_recycled_after_max_contexts_and_closed_once_released():
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, max_contexts=2)
+    hooked = []
+    pool.context_hooks.append(hooked.append)
+
+    first, second = pool.new_context(), pool.new_context()
+    third = pool.new_context()
+    assert pool.launches == 2 and third.browser is browser_type.launched[1]
+    assert hooked == [first, second, third]
+
+    old = browser_type.launched[0]
+    pool.release(first)
+    assert old.connected, "Retired browser stays open while a context is in use"
+    pool.release(second)
+    assert not old.connected and second.closed
+    pool.release(third)
+    assert browser_type.launched[1].connected, "The current browser is kept"
+
+    pool.close()
+    assert not browser_type.launched[1].connected
+
+
+def test_disconnected_browser_is_relaunched():
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, max_contexts=0)
+    pool.release(pool.new_context())
+    browser_type.launched[0].connected = False
+    assert pool.new_context().browser is browser_type.launched[1]
+
+
+def test_proxy_follows_recycling_and_counts_contexts_closed_directly():
+    browser_type = FakeBrowserType()
+    pool = BrowserPool(browser_type, max_contexts=1)
+    proxy = pool.proxy
+    assert proxy.version == "v0"
+
+    context = proxy.new_context()
+    pool.new_context()
+    assert proxy.version == "v1", "The proxy resolves to the replacement browser"
+    old = browser_type.launched[0]
+    assert old.connected
+    context.close()  # as pytest-playwright does, without release()
+    assert not old.connected
+    context.close()
+    assert pool._open == {browser_type.launched[1]: 1}
+
+
+def test_memory_is_measured_on_the_browser_tree_only(monkeypatch):
+    class FakeProcess:
+        def __init__(self, pid, ppid, mb, children=()):
+            self.pid, self._ppid, self.mb, self._children = pid, ppid, mb, list(children)
+
+        def ppid(self):
+            return self._ppid
+
+        def children(self, recursive=False):
+            return self._children
+
+        def memory_info(self):
+            return type("Memory", (), {"rss": self.mb * 1024 * 1024})
+
+    driver = FakeProcess(10, 1, 100)
+    renderer = FakeProcess(12, 11, 300)
+    browser = FakeProcess(11, 10, 200, [renderer])
+    processes = [[driver], [driver, browser, renderer]]
+    monkeypatch.setattr(browser_pool, "psutil", object())
+    monkeypatch.setattr(browser_pool, "_children", lambda: processes.pop(0) if len(processes) > 1 else processes[0])
+
+    pool = BrowserPool(FakeBrowserType(), max_rss_mb=400)
+    pool.new_context()
+    assert pool._rss_mb() == 500, "Driver process excluded"
+    pool.new_context()
+    assert pool.launches == 2, "Recycled once the browser tree passes max_rss_mb"
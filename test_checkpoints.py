@@ -0,0 +1,93 @@
+import json
+
+from common.checkpoints import CheckpointStore, Flow
+
+STEPS = ["Open the login page", "Open the registration page"]
+
+
+class FakeLocators:
+    HEADER = "h1"
+
+
+class FakeContext:
+    def __init__(self):
+        self.cookies, self.scripts = [], []
+
+    def storage_state(self):
+        return {"cookies": [{"name": "session", "value": "abc", "domain": "example.com", "path": "/"}],
+                "origins": [{"origin": "https://example.com", "localStorage": [{"name": "k", "value": "v"}]}]}
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def add_init_script(self, script):
+        self.scripts.append(script)
+
+
+class FakePage:
+    def __init__(self, url="about:blank"):
+        self.context = FakeContext()
+        self.url = url
+        self.visited = []
+
+    def goto(self, url):
+        self.visited.append(url)
+        self.url = url
+
+
+def _flow(store, nodeid, page=None, row=None, locators=FakeLocators):
+    return Flow(page or FakePage(), "signup", STEPS, (locators, row or {"user": "a"}), store=store,
+                nodeid=nodeid, enabled=True)
+
+
+def test_only_a_test_whose_last_attempt_failed_resumes_from_its_checkpoints(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    first = _flow(store, "test_a", FakePage("https://example.com/login"))
+    first.checkpoint(STEPS[0])
+    first.page.url = "https://example.com/register"
+    first.checkpoint(STEPS[1])
+
+    assert _flow(store, "test_a").resume() is None, "A passing test replays its own flow"
+    store.record_outcome("test_b", failed=True)
+    assert _flow(store, "test_b").resume() is None, "Never from another test's checkpoints"
+    store.record_outcome("test_a", failed=True)
+    retry = _flow(store, "test_a")
+    assert retry.resume() == STEPS[1]
+    assert retry.page.visited == ["https://example.com/register"]
+    assert retry.page.context.cookies[0]["value"] == "abc"
+    assert "https://example.com" in retry.page.context.scripts[0]
+    assert not retry.pending(STEPS[0]) and not retry.pending(STEPS[1])
+    assert _flow(store, "test_a").resume(until=STEPS[0]) == STEPS[0]
+
+    store.save_outcomes()
+    next_run = CheckpointStore(str(tmp_path))
+    assert _flow(next_run, "test_a").resume() == STEPS[1], "failed.json carries over to the next run"
+    next_run.record_outcome("test_a", failed=False)
+    assert _flow(next_run, "test_a").resume() is None, "Not once it has passed again"
+    assert _flow(CheckpointStore(str(tmp_path), ttl=-1), "test_a").resume() is None, "Expired"
+
+
+def test_changed_locators_or_data_rows_invalidate_checkpoints(tmp_path):
+    store = CheckpointStore(str(tmp_path))
+    _flow(store, "test_a", FakePage("https://example.com/login")).checkpoint(STEPS[0])
+    store.record_outcome("test_a", failed=True)
+    assert _flow(store, "test_a").resume() == STEPS[0]
+    assert _flow(store, "test_a", row={"user": "b"}).resume() is None
+
+    class FakeLocators:
+        HEADER = "h1.title"
+
+    assert _flow(store, "test_a", locators=FakeLocators).resume() is None
+
+
+def test_failed_outcomes_are_merged_across_workers(tmp_path):
+    first, second = CheckpointStore(str(tmp_path)), CheckpointStore(str(tmp_path))
+    first.record_outcome("test_a", failed=True)
+    first.record_outcome("test_b", failed=True)
+    second.record_outcome("test_c", failed=True)
+    first.save_outcomes()
+    second.save_outcomes()
+    second.record_outcome("test_b", failed=False)
+    second.save_outcomes()
+    with open(tmp_path / "failed.json") as f:
+        assert json.load(f) == ["test_a", "test_c"]
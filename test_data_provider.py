@@ -0,0 +1,42 @@
+from common import data_provider
+from common.config import Config
+
+
+def _write_csv(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_rows_behave_like_dicts_and_filter(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DATA_CACHE_DIR", str(tmp_path / "cache"))
+    path = _write_csv(tmp_path / "registration_data.csv",
+                      "username,password,expected_result\n"
+                      "new_user,NewPass123,success\n"
+                      "existing_user,ExistingPass123,error\n"
+                      "gov_verifier,Password1!,success\n"
+                      "numeric,123,success\n")
+
+    rows = data_provider.read_test_data(path)
+    assert [row["username"] for row in rows] == ["new_user", "existing_user", "gov_verifier", "numeric"]
+    assert dict(rows[1]) == {"username": "existing_user", "password": "ExistingPass123", "expected_result": "error"}
+
+    successes = data_provider.read_test_data(path, expected_result="success")
+    assert [row.index for row in successes] == [0, 2, 3]
+    assert [row.index for row in data_provider.read_test_data(path, password=123)] == [3]
+
+
+def test_parsed_once_until_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DATA_CACHE_DIR", str(tmp_path / "cache"))
+    path = _write_csv(tmp_path / "onboarding_data.csv", "first_name,last_name\nJohn,Doe\n")
+    parses = []
+    real_parse = data_provider._parse
+    monkeypatch.setattr(data_provider, "_parse", lambda p: parses.append(p) or real_parse(p))
+
+    data_provider.read_test_data(path)
+    data_provider._datasets.clear()  # a fresh collection reuses the on-disk cache
+    assert data_provider.read_test_data(path)[0]["first_name"] == "John"
+    assert len(parses) == 1
+
+    _write_csv(tmp_path / "onboarding_data.csv", "first_name,last_name\nJane,Smith\nJohn,Doe\n")
+    assert data_provider.read_test_data(path)[0]["first_name"] == "Jane"
+    assert len(parses) == 2
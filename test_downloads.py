@@ -0,0 +1,61 @@
+import hashlib
+import re
+
+import pytest
+from common.downloads import DigestCache, PdfScanner, check_pdf, verify_file
+from common.stand_in import SAMPLE_ORDER_PDF
+
+
+def minimal_pdf(pages):
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects = [b"<</Type /Catalog /Pages 2 0 R>>", f"<</Type /Pages /Kids [{kids}] /Count {pages}>>".encode()]
+    objects += [b"<</Type /Page /Parent 2 0 R>>"] * pages
+    body, offsets = b"%PDF-1.7\n", []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    return body + b"trailer\n<</Size %d /Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 63, 64, 65, 1 << 20])
+def test_page_count_is_independent_of_chunking(tmp_path, chunk_size):
+    path = tmp_path / "order.pdf"
+    path.write_bytes(minimal_pdf(3))
+    result = check_pdf(path, chunk_size)
+    assert result == {"version": "1.7", "pages": 3, "xref_offset": result["xref_offset"], "errors": []}
+
+
+def test_sample_order_document_is_valid():
+    result = check_pdf(SAMPLE_ORDER_PDF)
+    assert result["errors"] == [] and result["pages"] == 1
+
+
+def test_structural_errors_are_reported(tmp_path):
+    path = tmp_path / "broken.pdf"
+    broken = re.sub(rb"startxref\n\d+", b"startxref\n3", minimal_pdf(1)).replace(b"%PDF-1.7", b"<html>  ")
+    path.write_bytes(broken)
+    errors = check_pdf(path)["errors"]
+    assert "no %PDF- header in the first 1024 bytes" in errors
+    assert any("does not point at an xref section" in error for error in errors)
+
+    scanner = PdfScanner()
+    scanner.feed(b"%PDF-1.4\n")
+    assert scanner.finish()["errors"] == ["no startxref / %%EOF trailer at the end of the file", "no page objects"]
+
+
+def test_unchanged_documents_reuse_the_cached_verification(tmp_path, monkeypatch):
+    path = tmp_path / "order.pdf"
+    path.write_bytes(minimal_pdf(2))
+    cache = DigestCache(str(tmp_path / "cache.json"))
+    first = verify_file(path, cache, elapsed=0.5)
+    assert first["sha256"] == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert first["valid"] and not first["cached"] and first["pdf"]["pages"] == 2
+    assert first["download_mb_per_s"] == round(first["bytes"] / 0.5 / 1e6, 2)
+    cache.save()
+
+    monkeypatch.setattr("common.downloads.check_pdf", lambda path: pytest.fail("re-verified"))
+    second = verify_file(path, DigestCache(str(tmp_path / "cache.json")))
+    assert second["cached"] and second["pdf"] == first["pdf"]
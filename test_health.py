@@ -0,0 +1,59 @@
+from common.health import CircuitBreaker, HealthGate, host_of
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_after_threshold_and_recovers_via_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=3, cooldown=30, clock=clock)
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    breaker.record_success()
+    breaker.record_failure("timeout")
+    breaker.record_failure("timeout")
+    assert breaker.poll() == CircuitBreaker.CLOSED, "A success resets the consecutive failure count"
+
+    breaker.record_failure("timeout")
+    assert breaker.poll() == CircuitBreaker.OPEN
+    clock.now = 29
+    assert breaker.poll() == CircuitBreaker.OPEN
+    clock.now = 30
+    assert breaker.poll() == CircuitBreaker.HALF_OPEN
+
+    # A failed half-open probe re-opens at once and restarts the cooldown
+    breaker.record_failure("still down")
+    assert breaker.poll() == CircuitBreaker.OPEN
+    clock.now = 60
+    assert breaker.poll() == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.poll() == CircuitBreaker.CLOSED
+
+
+def test_gate_probes_each_host_once_and_rechecks_when_half_open():
+    probed = []
+    healthy = {"up.example": True, "stand-in:8000": True}
+
+    def probe(url, timeout):
+        probed.append(url)
+        up = healthy.get(host_of(url), False)
+        return up, "HTTP 200" if up else "ConnectionError"
+
+    gate = HealthGate(timeout=1, threshold=2, cooldown=0, probe=probe,
+                      redirects={"routed.example": "http://stand-in:8000"})
+    results = gate.check_targets(["http://up.example/a", "http://up.example/b",
+                                  "http://your-react-verifier-portal-url", "http://routed.example/login"])
+    assert sorted(probed) == ["http://stand-in:8000", "http://up.example/a", "http://your-react-verifier-portal-url"]
+    assert results["http://your-react-verifier-portal-url"] == (False, "ConnectionError")
+
+    assert gate.check("http://up.example/c") is None
+    assert gate.check("http://routed.example/") is None
+    # cooldown=0: the open circuit is half-open straight away, re-probed, and stays open
+    assert "unreachable" in gate.check("http://your-react-verifier-portal-url/dashboard")
+    healthy["your-react-verifier-portal-url"] = True
+    assert gate.check("http://your-react-verifier-portal-url/dashboard") is None
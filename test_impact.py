@@ -0,0 +1,120 @@
+import subprocess
+from types import SimpleNamespace
+
+import pytest
+from common import impact
+from common.impact import ImpactIndex, affected, analyze_module, changed_rows, changed_symbols, select
+
+LOCATORS = """class ShopPageLocators:
+    CART = "#cart"
+    CHECKOUT = "#checkout"
+"""
+
+TESTS = """import pytest
+from common.data_provider import read_test_data
+from common.functions import login
+from locators.shop_page import ShopPageLocators
+
+rows = read_test_data("data/shop.csv")
+
+
+def open_cart(page):
+    return page.wait_for_selector(ShopPageLocators.CART)
+
+
+def test_cart(page):
+    open_cart(page)
+
+
+@pytest.mark.parametrize("data", rows)
+def test_checkout(page, data):
+    login(page, data["user"], data["password"])
+    page.click(ShopPageLocators.CHECKOUT)
+
+
+def test_flow(page, checkpoint_flow):
+    checkpoint_flow(page, "shop", ["start"], ShopPageLocators)
+"""
+
+CSV = "user,password\nann,a1\nbob,b2\ncid,c3\n"
+
+
+def git(root, *args):
+    subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "shop_page.py").write_text(LOCATORS)
+    (tmp_path / "test_shop.py").write_text(TESTS)
+    (tmp_path / "data" / "shop.csv").write_text(CSV)
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "base")
+    return tmp_path
+
+
+def items(root):
+    def item(name, index=None):
+        nodeid = f"test_shop.py::{name}" + ("" if index is None else f"[data{index}]")
+        callspec = None if index is None else SimpleNamespace(indices={"data": index})
+        return SimpleNamespace(fspath=root / "test_shop.py", nodeid=nodeid, originalname=name,
+                               name=nodeid.split("::")[1], callspec=callspec)
+    return [item("test_cart"), *(item("test_checkout", i) for i in range(3)), item("test_flow")]
+
+
+def selected(root, last_failed=()):
+    index = ImpactIndex(str(root / "index.json"), root=str(root))
+    chosen, _, reason = select(items(root), index, "HEAD", last_failed, str(root))
+    index.save()
+    return [item.nodeid for item in chosen], reason
+
+
+def test_dependencies_come_from_the_test_module(repo):
+    deps = ImpactIndex(str(repo / "index.json"), root=str(repo)).item_deps(items(repo)[2])
+    assert sorted(deps) == ["common/functions.py::login", "data/shop.csv#1", "shop_page.py::ShopPageLocators.CHECKOUT",
+                            "test_shop.py::test_checkout"]
+
+
+def test_only_affected_items_are_selected(repo):
+    assert selected(repo) == ([], "0 of 5 tests affected by 0 changed files since HEAD")
+
+    (repo / "shop_page.py").write_text(LOCATORS.replace("#cart", "#basket"))
+    assert selected(repo)[0] == ["test_shop.py::test_cart", "test_shop.py::test_flow"]
+
+    (repo / "shop_page.py").write_text(LOCATORS)
+    (repo / "data" / "shop.csv").write_text(CSV.replace("bob,b2", "bob,b3"))
+    assert selected(repo, last_failed={"test_shop.py::test_flow"})[0] == ["test_shop.py::test_checkout[data1]"]
+
+    (repo / "conftest.py").write_text("")
+    nodeids, reason = selected(repo, last_failed={"test_shop.py::test_flow"})
+    assert nodeids[0] == "test_shop.py::test_flow" and len(nodeids) == 5
+    assert reason == "conftest.py changed; running everything"
+
+
+def test_filtered_or_synthetic_rows_depend_on_the_whole_csv(repo, monkeypatch):
+    filtered = TESTS.replace('read_test_data("data/shop.csv")', 'read_test_data("data/shop.csv", user="bob")')
+    functions = analyze_module(filtered, "test_shop.py", str(repo))
+    assert functions["test_checkout"]["csv_params"] == {}
+    assert "data/shop.csv" in functions["test_checkout"]["deps"]
+    assert analyze_module(TESTS, "test_shop.py", str(repo))["test_checkout"]["csv_params"] == {"data": "data/shop.csv"}
+
+    monkeypatch.setattr(impact.Config, "SYNTH_ROWS", 100)
+    deps = ImpactIndex(str(repo / "index.json"), root=str(repo)).item_deps(items(repo)[2])
+    assert "data/shop.csv" in deps and "data/shop.csv#1" not in deps
+
+
+def test_index_only_reparses_changed_modules(repo, monkeypatch):
+    selected(repo)
+    monkeypatch.setattr("common.impact.analyze_module", lambda *args: pytest.fail("re-parsed"))
+    selected(repo)
+
+
+def test_symbol_and_row_diffs():
+    assert changed_symbols(LOCATORS, LOCATORS.replace("#cart", "#basket")) == {"ShopPageLocators.CART"}
+    assert changed_symbols(LOCATORS, "import os\n" + LOCATORS) == {"<module>"}
+    assert changed_rows(CSV, CSV + "dan,d4\n") == {"3"}
+    assert changed_rows(CSV, CSV.replace("user,", "name,")) is None
+    assert affected(["a.py::Cls.*"], {"a.py": {"Cls.X"}})
+    assert not affected(["a.py::Cls.Y", "b.csv#2"], {"a.py": {"Cls.X"}, "b.csv": {"1"}})
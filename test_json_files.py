@@ -0,0 +1,19 @@
+import multiprocessing
+
+from common.json_files import load_json, update_json
+
+
+def _increment(path, times=50):
+    for _ in range(times):
+        update_json(path, lambda data: {**data, "count": data.get("count", 0) + 1})
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    path = str(tmp_path / "shared.json")
+    workers = [multiprocessing.Process(target=_increment, args=(path,)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert load_json(path) == {"count": 200}
+    assert load_json(str(tmp_path / "missing.json"), list) == []
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import pytest
+
+from common.load import NO_STEP, LatencyHistogram, LoadStats, VirtualUser, _user, schedule
+
+
+def test_histogram_percentiles_are_within_bucket_error():
+    histogram = LatencyHistogram()
+    for ms in range(1, 1001):
+        histogram.record(ms)
+    summary = histogram.summary()
+    assert summary["count"] == 1000
+    assert summary["mean_ms"] == pytest.approx(500.5)
+    assert summary["max_ms"] == 1000
+    for p in (50, 95, 99):
+        assert summary[f"p{p}_ms"] == pytest.approx(p * 10, rel=LatencyHistogram.GROWTH - 1)
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_histogram_never_reports_more_than_the_max():
+    histogram = LatencyHistogram()
+    histogram.record(0)
+    histogram.record(123.4)
+    assert histogram.percentile(100) == 123.4
+    assert histogram.percentile(1) <= 0.01 * LatencyHistogram.GROWTH
+
+
+def test_schedule_assigns_flows_round_robin_on_a_linear_ramp():
+    plan = schedule(["api_login", "login"], 4, ramp_up=8, now=100)
+    assert plan == [("api_login", 0, 100), ("login", 1, 102), ("api_login", 2, 104), ("login", 3, 106)]
+    assert schedule(["login"], 3, ramp_up=0, now=5) == [("login", 0, 5), ("login", 1, 5), ("login", 2, 5)]
+    assert schedule(["login"], 0, ramp_up=10, now=0) == []
+
+
+def test_failures_are_counted_per_step_with_type_and_message():
+    stats = LoadStats()
+    calls = []
+
+    async def run_once(vu):
+        calls.append(vu.index)
+        if len(calls) > 4:  # idle until the deadline
+            await asyncio.sleep(1)
+            return
+        with vu.step("open portal"):
+            pass
+        if len(calls) == 2:
+            raise RuntimeError("no step")
+        with vu.step("login"):
+            if len(calls) % 2:
+                raise TimeoutError("Timeout 30000ms exceeded\nwaiting for #dashboard")
+
+    now = time.monotonic()
+    asyncio.run(_user(stats, VirtualUser(stats, "login", 7), now, now + 0.5, run_once))
+    report = stats.report(elapsed=1)["login"]
+    assert report["iterations"] == 5
+    assert report["error_rate"] == 3 / 5
+    assert report["failures"]["login"] == {"TimeoutError: Timeout 30000ms exceeded": 2}
+    assert report["failures"][NO_STEP] == {"RuntimeError: no step": 1}
+    assert report["steps"]["open portal"]["count"] == 4
@@ -0,0 +1,105 @@
+import pytest
+from playwright.sync_api import Error as PlaywrightError
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from common.locator_batch import compile_locator, locator_attributes, missing, wait_for_locators
+
+
+class PortalLocators:
+    HEADER = "h1.title"
+    MENU = "xpath=//nav"
+    LOGOUT = "text=Log out"
+    TIMEOUT = 5000
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+    def is_visible(self):
+        return True
+
+    def inner_text(self):
+        return self.text
+
+
+class FakePage:
+    """Answers the in-page probe from ``dom`` and wait_for_selector from ``playwright``."""
+
+    def __init__(self, dom, playwright=None, destroyed=0):
+        self.dom = dom
+        self.playwright = playwright or {}
+        self.destroyed = destroyed
+        self.evaluations = []
+        self.waits = []
+
+    def evaluate(self, script, args):
+        specs, require_visible, _ = args
+        self.evaluations.append(specs)
+        if self.destroyed:
+            self.destroyed -= 1
+            raise PlaywrightError("Execution context was destroyed, most likely because of a navigation")
+        return {name: self.dom.get(expr, {"present": False, "visible": False, "text": None})
+                for name, _, expr in specs}
+
+    def wait_for_load_state(self, state):
+        pass
+
+    def wait_for_selector(self, selector, timeout, state):
+        self.waits.append((selector, state))
+        if selector not in self.playwright:
+            raise PlaywrightTimeoutError(f"Timeout {timeout}ms exceeded")
+        return FakeElement(self.playwright[selector])
+
+
+@pytest.mark.parametrize("selector, expected", [
+    ("#dashboard", ("css", "#dashboard")),
+    ("css=div.card > h2", ("css", "div.card > h2")),
+    ("xpath=//h1", ("xpath", "//h1")),
+    ("(//a)[2]", ("xpath", "(//a)[2]")),
+    ("text=Log out", None),
+    ("role=button[name='Save']", None),
+    ("h1 >> internal:has-text=/login/i", None),
+    ("h1:has-text('Login')", None),
+    ("css=span:text-is('Employer')", None),
+    ("button:visible", None),
+])
+def test_compile_locator(selector, expected):
+    assert compile_locator(selector) == expected
+
+
+def test_locator_attributes_prefers_original_selectors():
+    class Rewritten(PortalLocators):
+        HEADER = "h1 >> internal:has-text=/^\\s*Login\\s*$/"
+        _original_selectors = {"HEADER": "//h1[text()='Login']"}
+
+    assert locator_attributes(PortalLocators) == {"HEADER": "h1.title", "MENU": "xpath=//nav",
+                                                  "LOGOUT": "text=Log out"}
+    assert locator_attributes(Rewritten, ["HEADER"]) == {"HEADER": "//h1[text()='Login']"}
+
+
+def test_one_probe_for_dom_selectors_and_playwright_for_the_rest():
+    page = FakePage({"h1.title": {"present": True, "visible": True, "text": "Login"}},
+                    playwright={"text=Log out": "Log out"})
+    found = wait_for_locators(page, PortalLocators, timeout=100)
+
+    assert len(page.evaluations) == 1
+    assert [name for name, _, _ in page.evaluations[0]] == ["HEADER", "MENU"]
+    assert page.waits == [("text=Log out", "attached")]
+    assert found["HEADER"]["text"] == "Login"
+    assert found["LOGOUT"] == {"present": True, "visible": True, "text": "Log out"}
+    assert missing(found) == ["MENU"]
+
+
+def test_hidden_elements_are_missing_when_visibility_is_required():
+    page = FakePage({"#a": {"present": True, "visible": False, "text": ""}})
+    found = wait_for_locators(page, {"A": "#a", "B": "b:visible"}, timeout=50, require_visible=True)
+    assert page.waits == [("b:visible", "visible")]
+    assert missing(found) == ["B"]
+    assert missing(found, require_visible=True) == ["A", "B"]
+
+
+def test_probe_is_retried_after_a_navigation():
+    page = FakePage({"#a": {"present": True, "visible": True, "text": "ok"}}, destroyed=1)
+    assert wait_for_locators(page, {"A": "#a"}, timeout=1000)["A"]["text"] == "ok"
+    assert len(page.evaluations) == 2
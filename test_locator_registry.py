@@ -0,0 +1,49 @@
+from common.locator_batch import locator_attributes
+from common.locator_registry import LocatorRegistry, rewrite
+
+FOLDED = 'translate(normalize-space(), "ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")'
+
+
+class SampleLocators:
+    HEADER = f'xpath=//h1[{FOLDED}="employee registration"]'
+    SECTION = 'xpath=//h2[normalize-space()="Commercial Verifier"]'
+    LINK = 'xpath=//a[@id="lnkRegister"]//span[normalize-space()="Register Now"]'
+    CONTAINS = 'xpath=//h1[contains(., "Login")]'
+    BUTTON = "button[type='submit']"
+
+
+def test_translate_and_normalize_space_are_rewritten_to_has_text():
+    assert rewrite(SampleLocators.HEADER) == r"h1 >> internal:has-text=/^\s*employee\s+registration\s*$/i"
+    assert rewrite(SampleLocators.SECTION) == r"h2 >> internal:has-text=/^\s*Commercial\s+Verifier\s*$/"
+    assert rewrite(SampleLocators.LINK) == r"a#lnkRegister span >> internal:has-text=/^\s*Register\s+Now\s*$/"
+    assert rewrite('xpath=//div/span[@class="a b"]') == 'div > span[class="a b"]'
+
+
+def test_patterns_without_an_exact_equivalent_are_left_alone():
+    assert rewrite(SampleLocators.CONTAINS) == SampleLocators.CONTAINS
+    assert rewrite(SampleLocators.BUTTON) == SampleLocators.BUTTON
+    # A folded comparison against capitals can never match, so it is not "fixed"
+    assert rewrite(f'xpath=//h1[{FOLDED}="LOGIN"]') == f'xpath=//h1[{FOLDED}="LOGIN"]'
+    assert rewrite('xpath=//h1[normalize-space()=" padded"]') == 'xpath=//h1[normalize-space()=" padded"]'
+    assert rewrite('xpath=//h1[normalize-space()="a"]/span') == 'xpath=//h1[normalize-space()="a"]/span'
+
+
+def test_apply_and_restore_keep_originals_for_in_page_batching():
+    registry = LocatorRegistry(classes=[])
+    registry.add(SampleLocators)
+    assert set(name for _, name in registry.rewrites()) == {"HEADER", "SECTION", "LINK"}
+
+    registry.apply(skip={("SampleLocators", "LINK")})
+    try:
+        assert SampleLocators.SECTION.startswith("h2 >> internal:has-text=")
+        assert SampleLocators.LINK.startswith("xpath=")
+        assert locator_attributes(SampleLocators, ["SECTION"]) == {
+            "SECTION": 'xpath=//h2[normalize-space()="Commercial Verifier"]'}
+        # Re-reading an already rewritten class still sees the original selectors
+        again = LocatorRegistry(classes=[])
+        again.add(SampleLocators)
+        assert again.entries[("SampleLocators", "SECTION")]["original"].startswith("xpath=")
+    finally:
+        registry.restore()
+    assert SampleLocators.SECTION == 'xpath=//h2[normalize-space()="Commercial Verifier"]'
+    assert "_original_selectors" not in vars(SampleLocators)
@@ -2,24 +2,22 @@
 
 import pytest
 import allure
-from playwright.sync_api import sync_playwright
-from common.functions import read_test_data
+from common.attachments import attach_screenshot
+from common.data_provider import read_test_data
+from common.locator_batch import wait_for_locators
+from common.perf import perf_step
 from locators.login_page import LoginPageLocators
 
-# Fixture for setting up and tearing down the browser and page
-@pytest.fixture(scope="function")
-def setup_teardown():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)  # Run with UI for debugging
-        context = browser.new_context()
-        page = context.new_page()
-        yield page
-        context.close()
-        browser.close()
+pytestmark = pytest.mark.target("landing")
 
 # Read the test data
 test_data = read_test_data("data/test_data.csv")
 
+# Checkpoints of the landing -> login -> Employee Registration flow
+LOGIN_PAGE_VERIFIED = "Verify the presence of required sections"
+REGISTRATION_PAGE_REACHED = "Verify redirection to Employee Registration page"
+FLOW_STEPS = [LOGIN_PAGE_VERIFIED, REGISTRATION_PAGE_REACHED]
+
 # Test function using the setup_teardown fixture and test data
 @allure.severity(allure.severity_level.NORMAL)
 @allure.feature("Login Page Navigation")
@@ -28,8 +26,9 @@ test_data = read_test_data("data/test_data.csv")
 @pytest.mark.gui
 @pytest.mark.debug
 @pytest.mark.parametrize("data", test_data)
-def test_login_page_header(setup_teardown, data):
+def test_login_page_header(setup_teardown, checkpoint_flow, data):
     page = setup_teardown
+    flow = checkpoint_flow(page, "login_page_header", FLOW_STEPS, LoginPageLocators, data)
 
     # Retrieve URLs from test data
     initial_url = data['initial_url']
@@ -37,64 +36,69 @@ def test_login_page_header(setup_teardown, data):
     employee_registration_url = data['employee_registration_url']
 
 
-    # Navigate to the initial URL
-    page.goto(initial_url)
+    # Resumes after the last checkpoint only if this test's last attempt failed
+    if flow.pending(LOGIN_PAGE_VERIFIED):
+        # Navigate to the initial URL
+        page.goto(initial_url)
 
-    # Find the login link and click it
-    with allure.step("Find and click the login link"):
-        login_link = page.wait_for_selector(LoginPageLocators.LOGIN_LINK)
-        assert login_link is not None, "Login link found"
-        login_link.click()
+        # Find the login link and click it
+        with perf_step(page, "Find and click the login link"):
+            login_link = page.wait_for_selector(LoginPageLocators.LOGIN_LINK)
+            assert login_link is not None, "Login link found"
+            login_link.click()
 
-    # Verify redirection to the login page
-    with allure.step("Verify redirection to the login page"):
-        page.wait_for_url(login_page_url)
-        assert page.url.startswith(login_page_url), f"Redirected to the login page: {page.url}"
+        # Verify redirection to the login page
+        with perf_step(page, "Verify redirection to the login page"):
+            page.wait_for_url(login_page_url)
+            assert page.url.startswith(login_page_url), f"Redirected to the login page: {page.url}"
 
-    # Verify the login page header is displayed
-    with allure.step("Verify the login page header"):
-        login_page_header = page.wait_for_selector(LoginPageLocators.LOGIN_PAGE_HEADER)
-        assert login_page_header is not None, "Login page header found"
-        header_text = login_page_header.inner_text().strip()
-        assert header_text == "LOGIN", f"Expected header text 'LOGIN', got '{header_text}'"
-        allure.attach(page.screenshot(), name="Login Page Screenshot", attachment_type=allure.attachment_type.PNG)
+        # Verify the login page header is displayed
+        with perf_step(page, "Verify the login page header"):
+            login_page_header = page.wait_for_selector(LoginPageLocators.LOGIN_PAGE_HEADER)
+            assert login_page_header is not None, "Login page header found"
+            header_text = login_page_header.inner_text().strip()
+            assert header_text == "LOGIN", f"Expected header text 'LOGIN', got '{header_text}'"
+            attach_screenshot(page, "Login Page Screenshot")
 ## Added
-    # Verify the presence of required sections
-    with allure.step("Verify the presence of required sections"):
-        sections = [
-            ("Commercial Verifier", LoginPageLocators.COMMERCIAL_VERIFIER_HEADING),
-            ("Government Verifier", LoginPageLocators.GOVERNMENT_VERIFIER_HEADING),
-            ("Employer", LoginPageLocators.EMPLOYER_HEADING),
-            ("Employee", LoginPageLocators.EMPLOYEE_HEADING)
-        ]
-        for section_name, locator in sections:
-            try:
-                element = page.wait_for_selector(locator, timeout=5000)
-                element_text = element.inner_text().strip()
+        # Verify the presence of required sections
+        with perf_step(page, "Verify the presence of required sections"):
+            sections = {
+                "COMMERCIAL_VERIFIER_HEADING": "Commercial Verifier",
+                "GOVERNMENT_VERIFIER_HEADING": "Government Verifier",
+                "EMPLOYER_HEADING": "Employer",
+                "EMPLOYEE_HEADING": "Employee",
+            }
+            # One in-page wait for all four headings instead of a round trip per heading
+            found = wait_for_locators(page, LoginPageLocators, sections, timeout=5000, require_visible=True)
+            for name, section_name in sections.items():
+                if not found[name]["visible"]:
+                    pytest.fail(f"Section '{section_name}' not found")
+                element_text = found[name]["text"]
                 assert element_text == section_name, f"Expected section heading '{section_name}', got '{element_text}'"
-            except TimeoutError:
-                pytest.fail(f"Section '{section_name}' not found")
+        flow.checkpoint(LOGIN_PAGE_VERIFIED)
 
-    # Validate 'Register Now' link for Employee and click
-    with allure.step("Validate 'Register Now' link for Employee and click"):
-        try:
-            register_now_link = page.wait_for_selector(LoginPageLocators.EMPLOYEE_REGISTER_NOW_LINK, timeout=5000)
-            register_now_link.click()
-        except TimeoutError:
-            pytest.fail("'Register Now' link for Employee not found")
+    if flow.pending(REGISTRATION_PAGE_REACHED):
+        # Validate 'Register Now' link for Employee and click
+        with perf_step(page, "Validate 'Register Now' link for Employee and click"):
+            try:
+                register_now_link = page.wait_for_selector(LoginPageLocators.EMPLOYEE_REGISTER_NOW_LINK, timeout=5000)
+                register_now_link.click()
+            except TimeoutError:
+                pytest.fail("'Register Now' link for Employee not found")
 
-    # Verify redirection to Employee Registration page
-    ##employee_registration_url = "https://app.vaultverify.com/vvapp/Registration_EP.aspx"
-    with allure.step("Verify redirection to Employee Registration page"):
-        try:
-            page.wait_for_url(employee_registration_url, timeout=5000)
-            assert page.url.startswith(
-                employee_registration_url), f"Expected URL to start with {employee_registration_url}, but got {page.url}"
-        except TimeoutError:
-            pytest.fail("Did not navigate to the Employee Registration page")
+        # Verify redirection to Employee Registration page
+        ##employee_registration_url = "https://app.vaultverify.com/vvapp/Registration_EP.aspx"
+        with perf_step(page, "Verify redirection to Employee Registration page"):
+            try:
+                page.wait_for_url(employee_registration_url, timeout=5000)
+                assert page.url.startswith(
+                    employee_registration_url), f"Expected URL to start with {employee_registration_url}, but got {page.url}"
+            except TimeoutError:
+                pytest.fail("Did not navigate to the Employee Registration page")
+        flow.checkpoint(REGISTRATION_PAGE_REACHED)
 
     # Verify 'Employee Registration' header is present
-    with allure.step("Verify 'Employee Registration' header is present"):
+    with perf_step(page, "Verify 'Employee Registration' header is present"):
         try:
             registration_header = page.wait_for_selector(LoginPageLocators.EMPLOYEE_REGISTRATION_HEADER,
                                                          timeout=5000)
@@ -102,8 +106,7 @@ def test_login_page_header(setup_teardown, data):
             print(f"Employee Registration header text: '{header_text}'")
             # Perform case-insensitive comparison
             assert header_text.lower() == "employee registration", f"Expected header text 'Employee Registration', got '{header_text}'"
-            allure.attach(page.screenshot(), name="Employee Registration Page Screenshot",
-                          attachment_type=allure.attachment_type.PNG)
+            attach_screenshot(page, "Employee Registration Page Screenshot")
         except TimeoutError:
             page.screenshot(path="error_employee_registration_header.png")
             pytest.fail("'Employee Registration' header not found")
\ No newline at end of file
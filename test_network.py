@@ -0,0 +1,44 @@
+import json
+from types import SimpleNamespace
+from common.network import ABORT, HarCache, blocking_routes, request_key
+
+
+def _entry(method, url, status, body, post_data=None):
+    request = {"method": method, "url": url, "headers": []}
+    if post_data is not None:
+        request["postData"] = {"mimeType": "application/x-www-form-urlencoded", "text": post_data}
+    return {"request": request,
+            "response": {"status": status, "headers": [{"name": "Content-Type", "value": "text/html"},
+                                                       {"name": "Content-Length", "value": str(len(body))}],
+                         "content": {"text": body}}}
+
+
+def test_har_entries_are_indexed_by_method_url_and_body(tmp_path):
+    cache = HarCache(str(tmp_path))
+    har = {"log": {"entries": [
+        _entry("GET", "https://app.vaultverify.com/VVApp/", 200, "<h1>LOGIN</h1>"),
+        _entry("POST", "http://your-react-client-portal-url/login", 303, "", post_data="username=a"),
+        _entry("POST", "http://your-react-client-portal-url/login", 401, "denied", post_data="username=b"),
+        _entry("GET", "https://www.google-analytics.com/collect", 0, ""),
+    ]}}
+    with open(cache.har_path("login"), "w") as f:
+        json.dump(har, f)
+
+    assert cache.index_har("login") == 4
+    reloaded = HarCache(str(tmp_path)).index
+    assert len(reloaded) == 3, "Aborted requests are not cached"
+    denied = reloaded[request_key("POST", "http://your-react-client-portal-url/login", b"username=b")]
+    assert denied["status"] == 401
+    assert ["Content-Length", "6"] not in denied["headers"]
+    assert (tmp_path / "bodies" / denied["body"]).read_bytes() == b"denied"
+
+
+def test_blocking_routes_abort_by_resource_type_and_stub_third_party_hosts():
+    (assets, block), (hosts, stub) = blocking_routes(["image"], ["google-analytics.com"])
+    assert assets == "**/*"
+    assert block(SimpleNamespace(resource_type="image")) is ABORT, "Whatever the URL looks like"
+    assert block(SimpleNamespace(resource_type="fetch")) is None, "Falls back to the other routes"
+    assert hosts.match("https://www.google-analytics.com/collect")
+    assert stub(SimpleNamespace(resource_type="script")) == {"status": 200, "body": ""}
+    assert stub(SimpleNamespace(resource_type="image")) is ABORT
+    assert blocking_routes([], []) == []
@@ -0,0 +1,26 @@
+from common.parallel_runner import DEFAULT_DURATION, load_durations, plan, save_durations
+
+
+def test_longest_tests_are_spread_first():
+    durations = {"a": 8.0, "b": 7.0, "c": 6.0, "d": 5.0, "e": 4.0}
+    shards = plan(list(durations), durations, 2)
+    assert shards == [(17.0, ["a", "d", "e"]), (13.0, ["b", "c"])]
+    assert sorted(nodeid for _, tests in shards for nodeid in tests) == sorted(durations)
+
+
+def test_unknown_tests_are_estimated_at_the_median():
+    shards = plan(["slow", "x", "y", "fast"], {"slow": 10.0, "fast": 2.0}, 2)
+    assert shards == [(12.0, ["slow", "fast"]), (12.0, ["x", "y"])], "x and y count 6s each"
+    assert plan(["x", "y"], {}, 1) == [(2 * DEFAULT_DURATION, ["x", "y"])]
+
+
+def test_empty_workers_are_dropped_and_ties_are_stable():
+    assert plan(["b", "a"], {}, 4) == [(DEFAULT_DURATION, ["a"]), (DEFAULT_DURATION, ["b"])]
+    assert plan(["a"], {"a": 1.0}, 0) == [(1.0, ["a"])]
+
+
+def test_durations_round_trip(tmp_path):
+    path = str(tmp_path / "durations.json")
+    assert load_durations(path) == {}
+    save_durations({"a": 1.5}, path)
+    assert load_durations(path) == {"a": 1.5}
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from common import perf
+from common.perf import check_budget, load_budgets, perf_step
+
+BUDGETS = {"https://app.vaultverify.com/*": {"ttfb": 1500, "lcp": 4000}, "*": {"wall": 30000}}
+
+
+class FakePage:
+    def __init__(self, metrics, closed=False):
+        self.metrics = metrics
+        self.closed = closed
+        self.evaluations = 0
+
+    def is_closed(self):
+        return self.closed
+
+    def evaluate(self, script, since_ms):
+        self.evaluations += 1
+        return dict(self.metrics)
+
+
+@pytest.fixture(autouse=True)
+def budgets(monkeypatch):
+    monkeypatch.setattr(perf, "_budgets", BUDGETS)
+    monkeypatch.setattr(perf, "_results", [])
+    monkeypatch.setattr(perf.Config, "PERF_METRICS", True)
+    monkeypatch.setattr(perf.Config, "PERF_BUDGET_MODE", "warn")
+
+
+def test_violations_name_the_step_metric_and_pattern():
+    metrics = {"step": "Login", "url": "https://app.vaultverify.com/VVApp/", "ttfb": 1800.4, "lcp": 3900,
+               "wall": 31000, "load": None}
+    assert check_budget(metrics) == ["Login: ttfb 1800 > 1500 (https://app.vaultverify.com/*)",
+                                     "Login: wall 31000 > 30000 (*)"]
+    assert check_budget({**metrics, "url": "https://www.vaultverify.com/"}, {"https://app.*": {"ttfb": 1}}) == []
+    assert check_budget({"step": "Blank", "ttfb": 5000}, BUDGETS) == [], "No URL: only the catch-all applies"
+
+
+def test_budgets_are_loaded_once_and_reloaded_for_an_explicit_path(tmp_path):
+    path = tmp_path / "budgets.json"
+    path.write_text(json.dumps({"*": {"load": 100}}))
+    assert load_budgets() is BUDGETS
+    assert load_budgets(str(path)) == {"*": {"load": 100}}
+    assert load_budgets() == {"*": {"load": 100}}, "Cached after loading"
+    assert load_budgets(str(tmp_path / "missing.json")) == {}
+
+
+def test_step_reads_metrics_in_one_evaluate_and_warns_over_budget():
+    page = FakePage({"url": "https://app.vaultverify.com/VVApp/", "navigated": True, "ttfb": 2000})
+    with pytest.warns(UserWarning, match="Performance budget exceeded: Open: ttfb 2000 > 1500"):
+        with perf_step(page, "Open"):
+            pass
+    assert page.evaluations == 1
+    assert perf._results[0]["step"] == "Open" and perf._results[0]["ttfb"] == 2000
+
+
+def test_budget_mode_fail_fails_the_test(monkeypatch):
+    monkeypatch.setattr(perf.Config, "PERF_BUDGET_MODE", "fail")
+    with pytest.raises(pytest.fail.Exception, match="ttfb 2000 > 1500"):
+        with perf_step(FakePage({"url": "https://app.vaultverify.com/", "ttfb": 2000}), "Open"):
+            pass
+
+
+def test_no_round_trip_without_metrics_or_page(monkeypatch):
+    closed = FakePage({}, closed=True)
+    with perf_step(closed, "After logout"):
+        pass
+    monkeypatch.setattr(perf.Config, "PERF_METRICS", False)
+    page = FakePage({})
+    with perf_step(page, "Wall time only"):
+        pass
+    assert closed.evaluations == page.evaluations == 0
+    assert [set(result) for result in perf._results] == [{"test", "step", "wall"}] * 2
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+import allure
+import test_react_client
+import test_react_employee
+import test_react_verifier
+from common.async_runner import SCENARIOS, scenario
+from common.config import Config
+from common.downloads import download_and_verify_async
+from locators.react_client_page import ReactClientPageLocators
+from locators.react_employee_page import ReactEmployeePageLocators
+from locators.react_verifier_page import ReactVerifierPageLocators
+
+# Async twins of the independent React smoke tests: same locators and steps,
+# run concurrently by common.async_runner when ASYNC_MODE=true. Each twin is
+# registered against its sync test, which gives it its node id and role.
+pytestmark = pytest.mark.skipif(not Config.ASYNC_MODE, reason="Async mode disabled (set ASYNC_MODE=true)")
+
+
+# React Client Portal
+@scenario(test_react_client.test_dashboard_defaults)
+async def dashboard_defaults(page):
+    dashboard = await page.wait_for_selector(ReactClientPageLocators.DASHBOARD)
+    assert dashboard is not None, "Dashboard loaded"
+
+
+@scenario(test_react_client.test_dashboard_charts)
+async def dashboard_charts(page):
+    orders_by_category_chart = await page.wait_for_selector("#orders-by-category-chart")
+    assert orders_by_category_chart is not None, "Orders by Category chart displays as expected"
+
+
+@scenario(test_react_client.test_dashboard_search)
+async def dashboard_search(page):
+    search_bar = await page.wait_for_selector(ReactClientPageLocators.SEARCH)
+    assert search_bar is not None, "Search bar displays"
+    await search_bar.fill("search_term")
+    await search_bar.press("Enter")
+
+    search_results = await page.wait_for_selector("#search-results")
+    assert search_results is not None, "Search results display as expected"
+
+
+async def _view_and_download_order(page, locators):
+    order_id_link = await page.wait_for_selector(locators.ORDER_ID_LINK)
+    assert order_id_link is not None, "Order ID link displays"
+    await order_id_link.click()
+    order_details = await page.wait_for_selector(locators.ORDER_DETAILS)
+    assert order_details is not None, "Order details display as expected"
+    download_button = await page.wait_for_selector(locators.DOWNLOAD_BUTTON)
+    assert download_button is not None, "Download button displays"
+    report = await download_and_verify_async(page, download_button.click)
+    assert report["valid"], f"Downloaded order document is valid: {report['errors']}"
+    return report
+
+
+@scenario(test_react_client.test_view_and_download_order_client)
+async def view_and_download_order_client(page):
+    return await _view_and_download_order(page, ReactClientPageLocators)
+
+
+# React Employee Portal
+@scenario(test_react_employee.test_dashboard_display_employee)
+async def dashboard_display_employee(page):
+    dashboard = await page.wait_for_selector(ReactEmployeePageLocators.DASHBOARD)
+    assert dashboard is not None, "Dashboard loaded"
+
+
+@scenario(test_react_employee.test_avatar_menu_employee)
+async def avatar_menu_employee(page):
+    avatar_menu = await page.wait_for_selector(ReactEmployeePageLocators.AVATAR_MENU)
+    assert avatar_menu is not None, "Avatar menu displays as expected"
+
+
+async def _new_order(page, order_type):
+    new_order_button = await page.wait_for_selector(ReactEmployeePageLocators.NEW_ORDER_BUTTON)
+    assert new_order_button is not None, "New Order button displays"
+    await new_order_button.click()
+    await page.wait_for_selector("select[name='order_type']")
+    await page.select_option("select[name='order_type']", order_type)
+    await page.click("button[type='submit']")
+    success_message = await page.wait_for_selector("#order-success-message")
+    assert success_message is not None, f"{order_type.replace('_', ' ')} Order created successfully"
+
+
+@scenario(test_react_employee.test_new_order_free_voi)
+async def new_order_free_voi(page):
+    await _new_order(page, "FREE_VOI")
+
+
+@scenario(test_react_employee.test_new_order_paid_voi)
+async def new_order_paid_voi(page):
+    await _new_order(page, "PAID_VOI")
+
+
+@scenario(test_react_employee.test_view_and_download_order)
+async def view_and_download_order(page):
+    return await _view_and_download_order(page, ReactEmployeePageLocators)
+
+
+# React Verifier Portal
+@scenario(test_react_verifier.test_dashboard_default_verifier)
+async def dashboard_default_verifier(page):
+    dashboard = await page.wait_for_selector(ReactVerifierPageLocators.DASHBOARD)
+    assert dashboard is not None, "Dashboard loaded"
+
+
+@scenario(test_react_verifier.test_grid_view_verifier)
+async def grid_view_verifier(page):
+    grid_view = await page.wait_for_selector(ReactVerifierPageLocators.GRID_VIEW)
+    assert grid_view is not None, "Grid view displays as expected"
+
+
+@scenario(test_react_verifier.test_add_cc_verifier)
+async def add_cc_verifier(page):
+    add_cc_button = await page.wait_for_selector(ReactVerifierPageLocators.ADD_CC_BUTTON)
+    assert add_cc_button is not None, "Add CC button displays"
+    await add_cc_button.click()
+    await page.fill("input[name='cc_number']", "4111111111111111")
+    await page.fill("input[name='cc_expiry']", "12/25")
+    await page.fill("input[name='cc_cvc']", "123")
+    await page.click("button[type='submit']")
+    success_message = await page.wait_for_selector("#cc-success-message")
+    assert success_message is not None, "CC added successfully"
+
+
+@scenario(test_react_verifier.test_view_and_download_order_verifier)
+async def view_and_download_order_verifier(page):
+    return await _view_and_download_order(page, ReactVerifierPageLocators)
+
+
+@pytest.mark.smoke
+@pytest.mark.gui
+@pytest.mark.parametrize("nodeid", [
+    pytest.param(nodeid, marks=pytest.mark.target(item.role), id=nodeid.rpartition("::")[2])
+    for nodeid, item in SCENARIOS.items()
+])
+def test_async_smoke(async_smoke, nodeid):
+    outcome = async_smoke[nodeid]
+    allure.dynamic.title(nodeid.rpartition("::")[2])
+    if outcome.value is not None:
+        allure.attach(json.dumps(outcome.value, indent=2), name="Result", attachment_type=allure.attachment_type.JSON)
+    if outcome.screenshot is not None:
+        allure.attach(outcome.screenshot, name="Failure Screenshot", attachment_type=allure.attachment_type.JPG)
+    if not outcome.passed:
+        raise outcome.error
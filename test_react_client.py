@@ -1,44 +1,37 @@
 import pytest
-import allure
-from playwright.sync_api import sync_playwright
-from common.functions import read_test_data, login, save_data
+from common.attachments import attach_screenshot
+from common.config import Config
+from common.perf import perf_step
+from common.functions import login
+from common.downloads import download_and_verify
+from common.results_store import save_data
 from locators.react_client_page import ReactClientPageLocators
 
-
-@pytest.fixture(scope="function")
-def setup_teardown():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-        yield page
-        context.close()
-        browser.close()
+pytestmark = pytest.mark.target("client")
 
 
 @pytest.mark.smoke
 @pytest.mark.gui
 def test_login_react_client(setup_teardown):
     page = setup_teardown
-    page.goto("http://your-react-client-portal-url")  # Update with your client portal URL
+    page.goto(Config.CLIENT_PORTAL_URL)
 
     username = "valid_username"
     password = "valid_password"
 
-    with allure.step("Login with username and password"):
+    with perf_step(page, "Login with username and password"):
         login(page, username, password)
 
     success_message = page.wait_for_selector(ReactClientPageLocators.DASHBOARD)
     assert success_message is not None, "Login successful"
-    allure.attach(page.screenshot(), name="Success Screenshot", attachment_type=allure.attachment_type.PNG)
+    attach_screenshot(page, "Success Screenshot")
     save_data('data/stored_data.json', {"login_status": "success", "username": username})
 
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_dashboard_defaults(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-client-portal-url")  # Update with your client portal URL
+def test_dashboard_defaults(client_page):
+    page = client_page
 
     dashboard = page.wait_for_selector(ReactClientPageLocators.DASHBOARD)
     assert dashboard is not None, "Dashboard loaded"
@@ -46,9 +39,8 @@ def test_dashboard_defaults(setup_teardown):
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_dashboard_charts(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-client-portal-url")  # Update with your client portal URL
+def test_dashboard_charts(client_page):
+    page = client_page
 
     orders_by_category_chart = page.wait_for_selector("#orders-by-category-chart")
     assert orders_by_category_chart is not None, "Orders by Category chart displays as expected"
@@ -57,9 +49,8 @@ def test_dashboard_charts(setup_teardown):
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_dashboard_search(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-client-portal-url")  # Update with your client portal URL
+def test_dashboard_search(client_page):
+    page = client_page
 
     search_bar = page.wait_for_selector(ReactClientPageLocators.SEARCH)
     assert search_bar is not None, "Search bar displays"
@@ -68,3 +59,19 @@ def test_dashboard_search(setup_teardown):
 
     search_results = page.wait_for_selector("#search-results")
     assert search_results is not None, "Search results display as expected"
+
+
+@pytest.mark.smoke
+@pytest.mark.gui
+def test_view_and_download_order_client(client_page):
+    page = client_page
+
+    order_id_link = page.wait_for_selector(ReactClientPageLocators.ORDER_ID_LINK)
+    assert order_id_link is not None, "Order ID link displays"
+    order_id_link.click()
+    order_details = page.wait_for_selector(ReactClientPageLocators.ORDER_DETAILS)
+    assert order_details is not None, "Order details display as expected"
+    download_button = page.wait_for_selector(ReactClientPageLocators.DOWNLOAD_BUTTON)
+    assert download_button is not None, "Download button displays"
+    report = download_and_verify(page, download_button.click)
+    assert report["valid"], f"Downloaded order document is valid: {report['errors']}"
@@ -1,45 +1,41 @@
 import pytest
-import allure
-from playwright.sync_api import sync_playwright
-from common.functions import read_test_data, login, save_data
+from common.attachments import attach_screenshot
+from common.config import Config
+from common.perf import perf_step
+from common.functions import login
+from common.downloads import download_and_verify
+from common.results_store import save_data
 from locators.react_employee_page import ReactEmployeePageLocators
 
+pytestmark = pytest.mark.target("employee")
 
-@pytest.fixture(scope="function")
-def setup_teardown():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-        yield page
-        context.close()
-        browser.close()
+# Checkpointed by both new-order tests, each under its own flow name
+NEW_ORDER_FORM = "Open the new order form"
 
 
 @pytest.mark.smoke
 @pytest.mark.gui
 def test_login_react_employee(setup_teardown):
     page = setup_teardown
-    page.goto("http://your-react-employee-portal-url")  # Update with your employee portal URL
+    page.goto(Config.EMPLOYEE_PORTAL_URL)
 
     username = "valid_username"
     password = "valid_password"
 
-    with allure.step("Login with username and password"):
+    with perf_step(page, "Login with username and password"):
         login(page, username, password)
 
     success_message = page.wait_for_selector(ReactEmployeePageLocators.DASHBOARD)
     assert success_message is not None, "Login successful"
-    allure.attach(page.screenshot(), name="Success Screenshot", attachment_type=allure.attachment_type.PNG)
+    attach_screenshot(page, "Success Screenshot")
     save_data('data/stored_data.json', {"login_status": "success", "username": username})
 
 
 # Additional tests for React Employee Portal
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_dashboard_display_employee(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-employee-portal-url")  # Update with your employee portal URL
+def test_dashboard_display_employee(employee_page):
+    page = employee_page
 
     # Ensure the dashboard displays the employee as active
     dashboard = page.wait_for_selector(ReactEmployeePageLocators.DASHBOARD)
@@ -48,9 +44,8 @@ def test_dashboard_display_employee(setup_teardown):
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_avatar_menu_employee(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-employee-portal-url")  # Update with your employee portal URL
+def test_avatar_menu_employee(employee_page):
+    page = employee_page
 
     # Ensure the avatar menu displays sign-in data as expected
     avatar_menu = page.wait_for_selector(ReactEmployeePageLocators.AVATAR_MENU)
@@ -59,14 +54,17 @@ def test_avatar_menu_employee(setup_teardown):
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_new_order_free_voi(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-employee-portal-url")  # Update with your employee portal URL
+def test_new_order_free_voi(employee_page, checkpoint_flow):
+    page = employee_page
+    flow = checkpoint_flow(page, "employee_new_order_free_voi", [NEW_ORDER_FORM], ReactEmployeePageLocators)
 
     # Ensure new order for FREE VOI can be created successfully
-    new_order_button = page.wait_for_selector(ReactEmployeePageLocators.NEW_ORDER_BUTTON)
-    assert new_order_button is not None, "New Order button displays"
-    new_order_button.click()
+    if flow.pending(NEW_ORDER_FORM):
+        new_order_button = page.wait_for_selector(ReactEmployeePageLocators.NEW_ORDER_BUTTON)
+        assert new_order_button is not None, "New Order button displays"
+        new_order_button.click()
+        page.wait_for_selector("select[name='order_type']")
+        flow.checkpoint(NEW_ORDER_FORM)
     # Fill in order details (assuming there are input fields with names 'order_type' and others)
     page.select_option("select[name='order_type']", "FREE_VOI")
     page.click("button[type='submit']")
@@ -77,14 +75,17 @@ def test_new_order_free_voi(setup_teardown):
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_new_order_paid_voi(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-employee-portal-url")  # Update with your employee portal URL
+def test_new_order_paid_voi(employee_page, checkpoint_flow):
+    page = employee_page
+    flow = checkpoint_flow(page, "employee_new_order_paid_voi", [NEW_ORDER_FORM], ReactEmployeePageLocators)
 
     # Ensure new order for PAID VOI can be created successfully
-    new_order_button = page.wait_for_selector(ReactEmployeePageLocators.NEW_ORDER_BUTTON)
-    assert new_order_button is not None, "New Order button displays"
-    new_order_button.click()
+    if flow.pending(NEW_ORDER_FORM):
+        new_order_button = page.wait_for_selector(ReactEmployeePageLocators.NEW_ORDER_BUTTON)
+        assert new_order_button is not None, "New Order button displays"
+        new_order_button.click()
+        page.wait_for_selector("select[name='order_type']")
+        flow.checkpoint(NEW_ORDER_FORM)
     # Fill in order details (assuming there are input fields with names 'order_type' and others)
     page.select_option("select[name='order_type']", "PAID_VOI")
     page.click("button[type='submit']")
@@ -95,9 +96,8 @@ def test_new_order_paid_voi(setup_teardown):
 
 @pytest.mark.smoke
 @pytest.mark.gui
-def test_view_and_download_order(setup_teardown):
-    page = setup_teardown
-    page.goto("http://your-react-employee-portal-url")  # Update with your employee portal URL
+def test_view_and_download_order(employee_page):
+    page = employee_page
 
     # Ensure view and download order links work as expected
     order_id_link = page.wait_for_selector(ReactEmployeePageLocators.ORDER_ID_LINK)
@@ -108,4 +108,6 @@ def test_view_and_download_order(setup_teardown):
     assert order_details is not None, "Order details display as expected"
     # Verify download button (assuming there's a download button with id 'download-button')
     download_button = page.wait_for_selector(ReactEmployeePageLocators.DOWNLOAD_BUTTON)
-    assert download_button is not None, "Download button displays and works"
+    assert download_button is not None, "Download button displays"
+    report = download_and_verify(page, download_button.click)
+    assert report["valid"], f"Downloaded order document is valid: {report['errors']}"
@@ -1,22 +1,16 @@
 import pytest
 import allure
-from playwright.sync_api import sync_playwright
-from common.functions import read_test_data, register, save_data
+from common.attachments import attach_screenshot
+from common.config import Config
+from common.functions import register
+from common.results_store import save_data
+from common.synthetic_data import rows_for
 from locators.registration_page import RegistrationPageLocators
 
+pytestmark = pytest.mark.target("registration")
 
-@pytest.fixture(scope="function")
-def setup_teardown():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
-        page = context.new_page()
-        yield page
-        context.close()
-        browser.close()
 
-
-@pytest.mark.parametrize("data", read_test_data("data/registration_data.csv"))
+@pytest.mark.parametrize("data", rows_for("registration", "data/registration_data.csv"))
 @allure.severity(allure.severity_level.CRITICAL)
 @allure.feature("Registration Tests")
 @allure.story("User Registration Functionality")
@@ -24,7 +18,7 @@ def setup_teardown():
 @pytest.mark.gui
 def test_registration(setup_teardown, data):
     page = setup_teardown
-    page.goto("http://your-vault-system-registration-url")  # Update with your registration URL
+    page.goto(Config.REGISTRATION_URL)
 
     username = data['username']
     password = data['password']
@@ -38,12 +32,12 @@ def test_registration(setup_teardown, data):
     if expected_result == 'success':
         success_message = page.wait_for_selector(RegistrationPageLocators.SUCCESS_MESSAGE)
         assert success_message is not None, "Registration successful"
-        allure.attach(page.screenshot(), name="Success Screenshot", attachment_type=allure.attachment_type.PNG)
+        attach_screenshot(page, "Success Screenshot")
         save_data('data/stored_data.json', {"registration_status": "success", "username": username})
     else:
         error_message = page.wait_for_selector(RegistrationPageLocators.ERROR_MESSAGE)
         assert error_message is not None, "Error message displayed"
-        allure.attach(page.screenshot(), name="Error Screenshot", attachment_type=allure.attachment_type.PNG)
+        attach_screenshot(page, "Error Screenshot")
         save_data('data/stored_data.json', {"registration_status": "failure", "username": username})
 
 
@@ -52,7 +46,7 @@ def test_registration(setup_teardown, data):
 @pytest.mark.gui
 def test_register_commercial_verifier(setup_teardown):
     page = setup_teardown
-    page.goto("http://your-vault-system-registration-url/commercial-verifier")  # Update with your URL
+    page.goto(f"{Config.REGISTRATION_URL}/commercial-verifier")
 
     username = "commercial_verifier"
     password = "password"
@@ -64,7 +58,7 @@ def test_register_commercial_verifier(setup_teardown):
 
     success_message = page.wait_for_selector(RegistrationPageLocators.SUCCESS_MESSAGE)
     assert success_message is not None, "Commercial Verifier Registration successful"
-    allure.attach(page.screenshot(), name="Success Screenshot", attachment_type=allure.attachment_type.PNG)
+    attach_screenshot(page, "Success Screenshot")
     save_data('data/stored_data.json', {"registration_status": "success", "username": username})
 
 
@@ -72,7 +66,7 @@ def test_register_commercial_verifier(setup_teardown):
 @pytest.mark.gui
 def test_register_government_verifier(setup_teardown):
     page = setup_teardown
-    page.goto("http://your-vault-system-registration-url/government-verifier")  # Update with your URL
+    page.goto(f"{Config.REGISTRATION_URL}/government-verifier")
 
     username = "government_verifier"
     password = "password"
@@ -84,5 +78,5 @@ def test_register_government_verifier(setup_teardown):
 
     success_message = page.wait_for_selector(RegistrationPageLocators.SUCCESS_MESSAGE)
     assert success_message is not None, "Government Verifier Registration successful"
-    allure.attach(page.screenshot(), name="Success Screenshot", attachment_type=allure.attachment_type.PNG)
+    attach_screenshot(page, "Success Screenshot")
     save_data('data/stored_data.json', {"registration_status": "success", "username": username})
@@ -0,0 +1,68 @@
+import json
+from common import results_store
+from common.results_store import ResultJournal, compact, latest_status, read_records
+
+
+def test_batches_are_appended_and_compacted(tmp_path):
+    path = str(tmp_path / "stored_data.json")
+    with open(path, "w") as f:
+        json.dump({"example_key": "example_value", "login_status": ""}, f)
+
+    first, second = ResultJournal(path, batch_size=2), ResultJournal(path, batch_size=2)
+    first.append({"login_status": "success", "username": "alice"})
+    assert read_records(path) == [], "Records stay buffered until the batch is full"
+    second.append({"registration_status": "failure", "username": "bob"})
+    first.append({"login_status": "failure", "username": "alice"})
+    first.flush()
+    second.flush()
+
+    stored = compact(path)
+    assert stored["example_key"] == "example_value"
+    assert stored["registration_status"] == "failure"
+    with open(path) as f:
+        assert json.load(f) == stored
+
+
+def test_latest_status_per_username(tmp_path):
+    path = str(tmp_path / "stored_data.json")
+    journal = ResultJournal(path, batch_size=1)
+    journal.append({"login_status": "success", "username": "alice"})
+    journal.append({"registration_status": "success", "username": "bob"})
+    journal.append({"login_status": "failure", "username": "alice"})
+
+    assert latest_status(path, "alice") == {"login_status": "failure", "username": "alice"}
+    assert latest_status(path, "bob")["registration_status"] == "success"
+    assert latest_status(path, "carol") == {}
+
+
+def test_pruning_folds_segments_and_keeps_latest_fields(tmp_path):
+    path = str(tmp_path / "stored_data.json")
+    for run in range(3):  # three sessions, one segment each
+        journal = ResultJournal(path, batch_size=1)
+        journal.append({"login_status": f"run{run}", "username": "alice"})
+        journal.append({"registration_status": "success", "username": "bob"})
+        compact(path, prune=True)
+    assert len(list((tmp_path / "stored_data.journal").iterdir())) == 1
+    assert len(read_records(path)) == 2
+
+    journal = ResultJournal(path, batch_size=1)
+    journal.append({"login_status": "failure", "username": "bob"})
+    stored = compact(path, prune=True)
+    assert stored["login_status"] == "failure"
+    assert latest_status(path, "alice") == {"login_status": "run2", "username": "alice"}
+    assert latest_status(path, "bob") == {"registration_status": "success", "username": "bob",
+                                          "login_status": "failure"}
+
+
+def test_pruning_leaves_segments_of_live_processes_alone(tmp_path, monkeypatch):
+    path = str(tmp_path / "stored_data.json")
+    journal_path = tmp_path / "stored_data.journal"
+    journal_path.mkdir()
+    live, dead = journal_path / "111-aaaaaaaa.jsonl", journal_path / "222-bbbbbbbb.jsonl"
+    for segment, status in ((live, "live"), (dead, "dead")):
+        segment.write_text(json.dumps({"ts": 1.0, "seq": 1, "data": {"login_status": status}}) + "\n")
+    monkeypatch.setattr(results_store, "_alive", lambda pid: pid == 111)
+
+    stored = compact(path, prune=True)
+    assert stored == {"login_status": "dead"}
+    assert live.exists() and not dead.exists()
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+import requests
+from common.stand_in import SITE_HEADER, StandInServer, stand_in_pattern, stand_in_request
+
+
+def _get(server, site, path="/", session=requests):
+    return session.get(server.url + path, headers={SITE_HEADER: site})
+
+
+def test_pages_carry_page_locators():
+    with StandInServer() as server:
+        assert "ctl00_ContentPlaceHolder1_lnkRegister_EP" in _get(server, "vvapp", "/VVApp/").text
+        session = requests.Session()
+        assert "name='username'" in _get(server, "verifier", session=session).text
+        response = session.post(server.url + "/login", headers={SITE_HEADER: "verifier"},
+                                data={"username": "valid_username", "password": "valid_password"})
+        assert "id='grid-view'" in response.text, "Login redirects to the dashboard"
+        assert _get(server, "verifier", "/orders/1001/document.pdf", session).content.startswith(b"%PDF")
+
+
+def test_registration_rules():
+    with StandInServer() as server:
+        def register(**form):
+            return requests.post(server.url + "/", headers={SITE_HEADER: "registration"}, data=form).text
+        valid = dict(username="new_user", password="NewPass123", confirm_password="NewPass123",
+                     email="new_user@example.com")
+        assert "success-message-id" in register(**valid)
+        assert "error-message-id" in register(**{**valid, "username": "existing_user"})
+        assert "error-message-id" in register(**{**valid, "confirm_password": "Pass321"})
+        assert "error-message-id" in register(**{**valid, "email": "not-an-email"})
+
+
+def test_latency_and_error_injection():
+    with StandInServer(latency=0.05) as server:
+        assert _get(server, "landing").elapsed.total_seconds() >= 0.05
+        server.fail("/VVApp", 502)
+        assert _get(server, "vvapp", "/VVApp/").status_code == 502
+        server.clear_failures()
+
+        # An injected answer to a POST must not leave its body on the kept-alive connection
+        session = requests.Session()
+        server.fail("/api/login", 500)
+        assert session.post(server.url + "/api/login", json={"username": "u", "password": "p"}).status_code == 500
+        server.clear_failures()
+        assert session.get(server.url + "/roster-data").status_code == 401
+        server.error_rate = 1.0
+        assert _get(server, "landing").status_code == 503
+
+
+def test_stand_in_request_maps_the_host_to_its_site():
+    server = SimpleNamespace(url="http://127.0.0.1:8000")
+    hosts = {"app.vaultverify.com": "vvapp"}
+    assert stand_in_pattern(hosts).match("https://app.vaultverify.com/VVApp/")
+    assert not stand_in_pattern(hosts).match("https://app.vaultverify.com.evil/")
+    url, headers = stand_in_request(server, hosts, "https://app.vaultverify.com/VVApp/?a=1",
+                                    {"host": "app.vaultverify.com", "cookie": "s=1"})
+    assert url == "http://127.0.0.1:8000/VVApp/?a=1"
+    assert headers == {"cookie": "s=1", SITE_HEADER: "vvapp"}
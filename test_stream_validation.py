@@ -0,0 +1,84 @@
+import json
+import tracemalloc
+
+import pytest
+from common.stream_validation import StreamError, iter_records, validate_stream
+
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def payroll_body(rows, total=None):
+    body = {"count": rows, "records": [{"id": i, "employee_id": i, "gross_pay": 1000.5 + i} for i in range(rows)]}
+    if total is not None:
+        body["total"] = total
+    return json.dumps(body).encode()
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_records_parse_across_any_chunk_boundary(size):
+    body = json.dumps({"meta": {"page": 1}, "records": [{"id": 1, "name": "Zoë"}, 12345, [1, 2]], "total": 3.25})
+    extras = {}
+    records = list(iter_records(chunked(body.encode(), size), extras=extras))
+    assert records == [{"id": 1, "name": "Zoë"}, 12345, [1, 2]]
+    assert extras["meta"] == {"page": 1} and extras["total"] == 3.25
+
+
+def test_top_level_array_and_errors():
+    assert list(iter_records([b"[1, ", b"2]"])) == [1, 2]
+    assert list(iter_records([b'{"records": []}'])) == []
+    with pytest.raises(StreamError):
+        list(iter_records([b'{"records": [1, 2'], "records"))
+    with pytest.raises(StreamError):
+        list(iter_records([b"[1] x"]))
+
+
+def test_malformed_value_fails_without_reading_the_rest():
+    consumed = []
+
+    def chunks():
+        yield b'{"records": [{"id": 1, "gross_pay": x}, '
+        for i in range(2, 10_000):
+            consumed.append(i)
+            yield json.dumps({"id": i, "gross_pay": 1.0}).encode() + b", "
+
+    with pytest.raises(StreamError):
+        list(iter_records(chunks()))
+    assert len(consumed) <= 1
+
+
+def test_validation_counts_errors_duplicates_and_sums():
+    rows = [{"id": 1, "employee_id": 1, "gross_pay": 100.0},
+            {"id": 2, "employee_id": "2", "gross_pay": 50},
+            {"id": 1, "employee_id": 3, "gross_pay": True},
+            {"id": "x", "employee_id": 4}]
+    body = json.dumps({"records": rows, "total": 150.0}).encode()
+    report = validate_stream(chunked(body, 5), "/payroll-data")
+    assert report["records"] == 4
+    assert report["invalid"] == 3
+    assert report["error_sample"][0]["errors"] == ["employee_id is str"]
+    assert report["error_sample"][1]["errors"] == ["gross_pay is bool"]
+    assert report["error_sample"][2]["errors"] == ["id is str", "missing gross_pay"]
+    assert report["duplicate_ids"] == 1 and report["duplicate_id_sample"] == [1]
+    assert report["sums"] == {"gross_pay": 150.0} and report["total_mismatch"] is None
+
+
+def test_declared_total_and_count_are_checked():
+    report = validate_stream([payroll_body(3, total=1.0)], "/payroll-data")
+    assert report["total_mismatch"] == {"declared": 1.0, "actual": 3004.5}
+    report = validate_stream([json.dumps({"count": 9, "records": []}).encode()], "/payroll-data")
+    assert report["count_mismatch"] == {"declared": 9, "actual": 0}
+
+
+def test_memory_stays_bounded_for_large_payloads():
+    rows = 100_000
+    total = sum(1000.5 + i for i in range(rows))
+    body = payroll_body(rows, total=total)
+    tracemalloc.start()
+    report = validate_stream(chunked(body, 1 << 16), "/payroll-data")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert report["records"] == rows and report["invalid"] == 0 and report["duplicate_ids"] == 0
+    assert report["total_mismatch"] is None and len(report["sample"]) == 20
+    assert peak < len(body) / 4, f"peak {peak} bytes for a {len(body)} byte body"
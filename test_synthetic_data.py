@@ -0,0 +1,56 @@
+import csv
+import io
+import tracemalloc
+from collections import Counter
+from contextlib import redirect_stdout
+
+from common import synthetic_data
+from common.synthetic_data import SyntheticData, parse_mix
+
+
+def test_rows_are_deterministic_and_independent_of_order():
+    data = SyntheticData("registration", 1000, seed=7)
+    forwards = [data.row(i) for i in range(1000)]
+    assert [data.row(i) for i in reversed(range(1000))] == forwards[::-1]
+    assert SyntheticData("registration", 1000, seed=7).row(500) == forwards[500]
+    assert SyntheticData("registration", 1000, seed=8).row(500) != forwards[500]
+
+
+def test_categories_follow_the_mix():
+    mix = parse_mix("valid=0.5,duplicate=0.2,mismatch=0.2,malformed_email=0.1")
+    data = SyntheticData("registration", 20000, seed=1, mix=mix)
+    kinds = Counter()
+    for username, password, confirm, email, expected in data:
+        if expected == "success":
+            kinds["valid"] += 1
+            assert password == confirm and email == f"{username}@example.com"
+        elif username == "existing_user":
+            kinds["duplicate"] += 1
+        elif password != confirm:
+            kinds["mismatch"] += 1
+        else:
+            kinds["malformed_email"] += 1
+            assert email != f"{username}@example.com"
+    for kind, share in mix.items():
+        assert abs(kinds[kind] / 20000 - share) < 0.02, kinds
+
+
+def test_shards_partition_the_set_lazily():
+    data = SyntheticData("onboarding", 10_000_000, seed=3)
+    tracemalloc.start()
+    shards = [data.shard(k, 4) for k in range(4)]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert peak < 100_000, "Sharding does not materialise rows"
+    assert sum(len(shard) for shard in shards) == 10_000_000
+    assert shards[1][2].index == 9
+    assert dict(shards[1][2]) == dict(zip(data.columns, data.row(9)))
+
+
+def test_cli_streams_csv(monkeypatch):
+    out = io.StringIO()
+    with redirect_stdout(out):
+        synthetic_data.main(["login", "--rows", "10", "--seed", "2", "--shard", "1/2"])
+    rows = list(csv.reader(io.StringIO(out.getvalue())))
+    assert rows[0] == ["username", "password", "expected_result"]
+    assert [tuple(row) for row in rows[1:]] == [SyntheticData("login", 10, seed=2).row(i) for i in range(1, 10, 2)]
@@ -0,0 +1,60 @@
+import json
+
+from common import timeouts
+from common.locator_registry import LocatorRegistry
+from common.timeouts import TimeoutPolicy
+
+
+class PortalLocators:
+    DASHBOARD = "#dashboard"
+
+
+def _policy(tmp_path, **kwargs):
+    return TimeoutPolicy(history_file=str(tmp_path / "history.json"), environment="ci", factor=2,
+                         floor_ms=1000, ceiling_ms=20000, min_samples=5,
+                         overrides_file=str(tmp_path / "overrides.json"), **kwargs)
+
+
+def test_timeouts_are_learned_from_p99_and_clamped(tmp_path):
+    policy = _policy(tmp_path)
+    for ms in (100, 120, 150, 130):
+        policy.record("portal", "#dashboard", ms)
+    policy.record("portal", "#slow", 15000)
+    policy.record("portal", "#dashboard", 0, found=False)
+    policy.save()
+
+    policy = _policy(tmp_path)
+    assert policy.timeout_for("portal", "#dashboard", 5000) == 5000, "Too few samples: call-site value kept"
+    policy.record("portal", "#dashboard", 400)
+    for _ in range(5):
+        policy.record("portal", "#slow", 15000)
+    policy.save()
+
+    policy = _policy(tmp_path)
+    assert policy.learned("portal", "#dashboard") == 1000, "2 x p99 (400ms) is below the floor"
+    assert policy.timeout_for("portal", "#dashboard") == 1000
+    assert policy.timeout_for("portal", "#dashboard", 5000) == 5000, "An explicit call-site timeout is kept"
+    assert policy.learned("portal", "#slow") == 20000, "Capped at the ceiling"
+    assert policy.learned("other-host", "#dashboard") is None, "History is per host"
+    assert TimeoutPolicy(history_file=str(tmp_path / "history.json"), environment="prod").learned(
+        "portal", "#dashboard") is None, "History is per environment"
+    with open(tmp_path / "history.json") as f:
+        assert json.load(f)["ci"]["portal"]["#dashboard"]["timeouts"] == 1
+
+
+def test_overrides_by_attribute_or_selector_win(tmp_path, monkeypatch):
+    registry = LocatorRegistry(classes=[])
+    registry.add(PortalLocators)
+    monkeypatch.setattr(timeouts, "get_registry", lambda: registry)
+    with open(tmp_path / "overrides.json", "w") as f:
+        json.dump({"PortalLocators.DASHBOARD": 12000, "#order-success-message": 8000}, f)
+
+    policy = _policy(tmp_path)
+    for _ in range(10):
+        policy.record("portal", "#dashboard", 100)
+    policy.save()
+    policy = _policy(tmp_path)
+    assert policy.timeout_for("portal", "#dashboard") == 12000
+    assert policy.timeout_for("portal", "#order-success-message", 5000) == 8000
+    [row] = policy.report()
+    assert row["locators"] == ["PortalLocators.DASHBOARD"] and row["learned_ms"] == 1000
@@ -0,0 +1,95 @@
+import json
+import zipfile
+
+import pytest
+from common.tracing import FailureTracer, TraceRing
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+        self.main_frame = object()
+        self.url = "http://portal/login"
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def emit(self, event, arg):
+        self.handlers[event](arg)
+
+    def __getattr__(self, name):  # the other page actions
+        return lambda *args, **kwargs: None
+
+    def click(self, selector):
+        if selector == "#missing":
+            raise TimeoutError(f"waiting for {selector}")
+
+    def content(self):
+        return "<html>login</html>"
+
+    def screenshot(self, **kwargs):
+        return b"png"
+
+    def is_closed(self):
+        return False
+
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def new_page(self):
+        page = FakePage()
+        self.handlers["page"](page)
+        return page
+
+
+def test_ring_drops_events_past_its_size_and_age():
+    ring = TraceRing(max_age=60, max_bytes=200)
+    for index in range(10):
+        ring.record("console", text="x" * 40, index=index)
+    assert ring.bytes <= 200 and ring.dropped == 10 - len(ring.events)
+    assert ring.events[-1][2]["index"] == 9
+
+    ring = TraceRing(max_age=0, max_bytes=10_000)
+    ring.record("console", text="old")
+    ring.record("console", text="new")
+    assert [event[2]["text"] for event in ring.events] == ["new"]
+
+
+def test_actions_and_dom_snapshots_are_buffered():
+    ring, context = TraceRing(max_age=60, max_bytes=10_000), FakeContext()
+    ring.install(context)
+    page = context.new_page()
+    page.emit("load", page)
+    page.click("#submit")
+    with pytest.raises(TimeoutError):
+        page.click("#missing")
+    kinds = [(kind, data.get("args")) for _, kind, data, _ in ring.events]
+    assert kinds == [("dom", None), ("action", "'#submit'"), ("action", "'#missing'")]
+    assert ring.events[2][2]["error"] == "TimeoutError: waiting for #missing"
+
+
+def test_archive_is_written_only_for_failures(tmp_path):
+    tracer = FailureTracer(mode="on-failure", directory=str(tmp_path), max_age=60, max_mb=1)
+    for error in (None, TimeoutError("waiting for #missing")):
+        tracer.start_test()
+        context = FakeContext()
+        tracer.install(context)
+        context.new_page().click("#submit")
+        path = tracer.finish_test("test_login.py::test_login_page_header[data0]", error)
+    assert tracer.stats["tests"] == 2 and tracer.stats["archives"] == 1
+    with zipfile.ZipFile(path) as archive:
+        summary = json.loads(archive.read("summary.json"))
+        assert summary["timed_out"] and summary["contexts"][0]["events"] == 1
+        assert archive.read("context-0/page-0/final.html") == b"<html>login</html>"
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="on-failure, off"):
+        FailureTracer(mode="always")
+    assert not FailureTracer(mode="off").enabled
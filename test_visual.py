@@ -0,0 +1,67 @@
+import pytest
+from common.visual import VisualRegression, compare_arrays, diff_image
+
+np = pytest.importorskip("numpy")
+
+
+def page_image(height=96, width=128):
+    image = np.full((height, width, 3), 240, dtype=np.uint8)
+    image[10:20, 10:60] = 30  # a line of "text"
+    return image
+
+
+def test_identical_images_skip_the_pixel_diff():
+    result, changed = compare_arrays(page_image(), page_image())
+    assert result["status"] == "identical" and changed is None
+
+
+def test_only_candidate_tiles_are_diffed():
+    baseline, actual = page_image(), page_image()
+    actual[70:74, 100:110] = 0  # one small change in the bottom-right tile
+    result, changed = compare_arrays(baseline, actual, tile=32)
+    assert result["candidate_tiles"] == 1
+    assert result["changed_pixels"] == 40 and changed.sum() == 40
+    assert result["changed_regions"] == [[96, 64, 32, 32]]
+    assert result["status"] == "failed"
+    assert compare_arrays(baseline, actual, max_diff_ratio=0.01)[0]["status"] == "passed"
+
+
+def test_content_moved_by_one_pixel_is_caught():
+    baseline, actual = page_image(), page_image()
+    baseline[40:48, 41] = 0  # a 1 px stroke...
+    actual[40:48, 42] = 0  # ...shifted right by one pixel, inside the same 4x4 blocks
+    result, _ = compare_arrays(baseline, actual, max_diff_ratio=0)
+    assert result["changed_pixels"] == 16 and result["status"] == "failed"
+
+
+def test_small_deltas_stay_below_the_thresholds():
+    actual = page_image()
+    actual[40:44, 40:44] += 8  # anti-aliasing noise
+    result, _ = compare_arrays(page_image(), actual, pixel_threshold=16)
+    assert result["passed"] and result["changed_pixels"] == 0
+
+
+def test_masked_regions_are_ignored():
+    actual = page_image()
+    actual[10:20, 10:60] = 200  # e.g. today's date
+    assert not compare_arrays(page_image(), actual)[0]["passed"]
+    result, _ = compare_arrays(page_image(), actual, regions=[[8, 8, 60, 16]])
+    assert result["status"] == "identical" and result["masked_pixels"] == 60 * 16
+
+
+def test_size_mismatch_and_diff_image():
+    assert compare_arrays(page_image(), page_image(100, 128))[0]["status"] == "size-mismatch"
+    actual = page_image()
+    actual[0:2, 0:2] = 0
+    _, changed = compare_arrays(page_image(), actual)
+    assert diff_image(actual, changed)[0, 0].tolist() == [255, 0, 0]
+
+
+def test_masks_are_merged_from_matching_patterns(tmp_path):
+    masks = tmp_path / "masks.json"
+    masks.write_text('{"test_react_verifier.py::*": {"selectors": [".requested-date"]},'
+                     ' "*::Success Screenshot": {"regions": [[0, 0, 10, 10]]}}')
+    visual = VisualRegression(mode="off", masks_file=str(masks))
+    assert visual.masks_for("test_react_verifier.py::test_login_react_verifier::Success Screenshot") == (
+        [".requested-date"], [[0, 0, 10, 10]])
+    assert visual.masks_for("test_login.py::test_login::Login Page Screenshot") == ([], [])